@@ -0,0 +1,80 @@
+"""
+Measure page archive writes, random access and parallel re-extraction of archived pages.
+
+    python -m benchmarks.bench_archive_replay --pages 2000 --processes 1 4
+
+Pages are generated like the stand-in server's articles, with a varying number of
+paragraphs.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.run_benchmarks import percentile
+from benchmarks.stand_in_server import render_article
+from classes.services.archive_replay import ArchiveReplay
+from classes.services.article_parsers import ARTICLE_PARSERS
+from classes.services.page_archive import PageArchive
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--pages", type=int, default=2000)
+    arg_parser.add_argument(
+        "--processes", type=int, nargs="+", default=[1, os.cpu_count() or 1]
+    )
+    arg_parser.add_argument("--parser", choices=sorted(ARTICLE_PARSERS), default="newspaper")
+    arg_parser.add_argument("--lookups", type=int, default=500)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = PageArchive(directory)
+        links = [f"https://news.test/story/{index}" for index in range(args.pages)]
+        pages = [render_article(str(index), rng.randint(4, 30)) for index in range(args.pages)]
+        raw_bytes = sum(len(page.encode("utf-8")) for page in pages)
+
+        start = time.perf_counter()
+        for link, page in zip(links, pages):
+            archive.append(link, page)
+        elapsed = time.perf_counter() - start
+        archived_bytes = sum(
+            path.stat().st_size for path in archive.directory.glob("pages-*.warc.gz")
+        )
+        print(
+            f"append: {args.pages / elapsed:,.0f} pages/s, "
+            f"{raw_bytes / 1e6:.1f} MB -> {archived_bytes / 1e6:.1f} MB "
+            f"({raw_bytes / archived_bytes:.1f}x)"
+        )
+
+        latencies = []
+        for link in rng.sample(links, min(args.lookups, len(links))):
+            start = time.perf_counter()
+            archive.get(link)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"random access: p50 {percentile(latencies, 0.5):.2f}ms "
+            f"p99 {percentile(latencies, 0.99):.2f}ms"
+        )
+
+        baseline = None
+        for processes in args.processes:
+            replay = ArchiveReplay(archive, parser_name=args.parser, processes=processes)
+            start = time.perf_counter()
+            extracted = sum(1 for _ in replay.run())
+            elapsed = time.perf_counter() - start
+            assert extracted == args.pages, f"expected {args.pages}, got {extracted}"
+            baseline = baseline or elapsed
+            print(
+                f"replay {args.parser} processes={processes}: {elapsed:.1f}s "
+                f"({args.pages / elapsed:,.0f} pages/s, {baseline / elapsed:.1f}x)"
+            )
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare sequential and concurrent article extraction against the local stand-in server.
+
+    python -m benchmarks.bench_concurrent_extraction --articles 40 --latency 0.2
+"""
+
+import argparse
+import time
+
+from benchmarks.stand_in_server import StandInServer
+from classes.models.entries import CategoryByBaseUrl, Entries, EntriesByCategory
+from classes.services.article_parsers import GooseArticleParser, NewspaperArticleParser
+from classes.services.article_pipeline import PipelinedArticleParser
+from classes.services.orchestrator import Orchestrator
+from classes.services.news_providers import NewsProviders
+
+PARSERS = {
+    "newspaper": NewspaperArticleParser,
+    "goose": GooseArticleParser,
+    "pipelined-newspaper": lambda: PipelinedArticleParser(NewspaperArticleParser),
+    "pipelined-goose": lambda: PipelinedArticleParser(GooseArticleParser),
+}
+
+
+def build_orchestrator(parser_name: str, max_workers: int, max_per_host: int):
+    return Orchestrator(
+        article_parser=PARSERS[parser_name](),
+        feed_service=None,
+        news_providers=NewsProviders(),
+        max_workers=max_workers,
+        max_per_host=max_per_host,
+    )
+
+
+def run(orchestrator: Orchestrator, base_url: str, articles: int) -> float:
+    entries = [
+        {"title": f"Story {i}", "link": f"{base_url}/articles/{i}"}
+        for i in range(articles)
+    ]
+    orchestrator.providers_by_categories = CategoryByBaseUrl(
+        provider={base_url: EntriesByCategory(category={"HOME": Entries(entries=entries)})}
+    )
+    start = time.perf_counter()
+    parsed = orchestrator._parse_articles(limit=None)
+    elapsed = time.perf_counter() - start
+    assert len(parsed) == articles, f"expected {articles} articles, got {len(parsed)}"
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--articles", type=int, default=40)
+    arg_parser.add_argument("--latency", type=float, default=0.2)
+    arg_parser.add_argument("--workers", type=int, default=16)
+    arg_parser.add_argument("--max-per-host", type=int, default=8)
+    arg_parser.add_argument("--parser", choices=sorted(PARSERS), default="newspaper")
+    args = arg_parser.parse_args()
+
+    with StandInServer(latency=args.latency) as server:
+        sequential = run(
+            build_orchestrator(args.parser, 1, None), server.base_url, args.articles
+        )
+        concurrent = run(
+            build_orchestrator(args.parser, args.workers, args.max_per_host),
+            server.base_url,
+            args.articles,
+        )
+
+    print(f"parser={args.parser} articles={args.articles} latency={args.latency}s")
+    print(f"sequential: {sequential:.2f}s")
+    print(
+        f"concurrent (workers={args.workers}, max_per_host={args.max_per_host}): "
+        f"{concurrent:.2f}s ({sequential / concurrent:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
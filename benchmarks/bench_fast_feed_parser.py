@@ -0,0 +1,66 @@
+"""
+Compare CPU time and allocations of feedparser and the streaming fast path on recorded feeds.
+
+    python -m benchmarks.bench_fast_feed_parser --iterations 200 --limit 5
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import feedparser
+
+from benchmarks.stand_in_server import FIXTURES_DIRECTORY
+from classes.services.feed_parsers import FastFeedParser, FeedParser
+
+
+def measure(parse: Callable[[], object], iterations: int) -> Tuple[float, int]:
+    """CPU seconds per parse, and peak traced bytes for a single parse."""
+    start = time.process_time()
+    for _ in range(iterations):
+        parse()
+    cpu_seconds = (time.process_time() - start) / iterations
+
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cpu_seconds, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--iterations", type=int, default=200)
+    arg_parser.add_argument("--limit", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    fast_parser = FastFeedParser()
+    chunk_size = FastFeedParser.CHUNK_SIZE
+    for path in sorted((FIXTURES_DIRECTORY / "feeds").rglob("*.xml")):
+        document = path.read_bytes().replace(b"{base_url}", b"http://127.0.0.1")
+        chunks = [
+            document[start : start + chunk_size]
+            for start in range(0, len(document), chunk_size)
+        ]
+        name = path.relative_to(FIXTURES_DIRECTORY / "feeds")
+        print(f"{name} ({len(document) / 1024:.0f} KiB)")
+
+        for limit in (args.limit, None):
+            baseline = measure(
+                lambda: FeedParser._to_entries(feedparser.parse(document), limit),
+                args.iterations,
+            )
+            fast = measure(
+                lambda: fast_parser.parse_chunks(chunks, limit), args.iterations
+            )
+            print(
+                f"  limit={limit}: feedparser {baseline[0] * 1000:.2f}ms / {baseline[1] / 1024:.0f} KiB, "
+                f"fast path {fast[0] * 1000:.2f}ms / {fast[1] / 1024:.0f} KiB "
+                f"({baseline[0] / fast[0]:.1f}x CPU, {baseline[1] / fast[1]:.1f}x memory)"
+            )
+    fast_parser.close()
+
+
+if __name__ == "__main__":
+    main()
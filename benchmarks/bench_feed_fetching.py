@@ -0,0 +1,66 @@
+"""
+Compare the sequential and asyncio feed-fetching pipelines against the local stand-in server.
+
+    python -m benchmarks.bench_feed_fetching --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.stand_in_server import StandInServer
+from classes.models.news_provider import NewsProvider
+from classes.services.feed_parsers import AsyncFeedParser, FeedParser
+from classes.services.feed_service import FeedService
+from classes.services.news_providers import NewsProviders
+
+CATEGORIES = {
+    "sky_news": ["home", "uk", "world", "us", "business", "politics", "technology", "entertainment", "strange"],
+    "bbc_news": ["top_stories", "uk", "world", "us", "business", "politics", "technology", "entertainment"],
+}
+
+
+def build_providers(base_url: str) -> NewsProviders:
+    news_providers = NewsProviders()
+    for key, categories in CATEGORIES.items():
+        news_providers.register_provider(
+            key,
+            NewsProvider(
+                base_url=f"{base_url}/feeds",
+                categories={
+                    category.upper(): f"/{key}-{category}.xml" for category in categories
+                },
+            ),
+        )
+    return news_providers
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--latency", type=float, default=0.2)
+    args = arg_parser.parse_args()
+
+    with StandInServer(latency=args.latency) as server:
+        news_providers = build_providers(server.base_url)
+
+        feed_service = FeedService(FeedParser())
+        start = time.perf_counter()
+        for news_provider in news_providers.providers:
+            feed_service.parse_all_categories(news_provider=news_provider)
+        sequential = time.perf_counter() - start
+
+        async_parser = AsyncFeedParser()
+        feed_service = FeedService(async_parser)
+        start = time.perf_counter()
+        asyncio.run(feed_service.aparse_all_providers(news_providers))
+        concurrent = time.perf_counter() - start
+        async_parser.close()
+
+    feeds = sum(len(categories) for categories in CATEGORIES.values())
+    print(f"feeds={feeds} latency={args.latency}s")
+    print(f"sequential: {sequential:.2f}s")
+    print(f"asyncio:    {concurrent:.2f}s ({sequential / concurrent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare full pydantic validation with the trusted-input fast path for the feed models.
+
+    python -m benchmarks.bench_model_construction --feeds 1000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import feedparser
+
+from benchmarks.stand_in_server import FIXTURES_DIRECTORY
+from classes.models.entries import (
+    CategoryByBaseUrl,
+    CompactEntry,
+    Entries,
+    EntriesByCategory,
+)
+
+
+def validated(feed_entries, feeds: int) -> CategoryByBaseUrl:
+    categories = {f"CATEGORY_{index}": Entries(entries=feed_entries) for index in range(feeds)}
+    return CategoryByBaseUrl(
+        provider={"https://feeds.example.com/": EntriesByCategory(category=categories)}
+    )
+
+
+def fast_path(feed_entries, feeds: int) -> CategoryByBaseUrl:
+    categories = {
+        f"CATEGORY_{index}": Entries.from_feed_entries(feed_entries) for index in range(feeds)
+    }
+    return CategoryByBaseUrl.model_construct(
+        provider={
+            "https://feeds.example.com/": EntriesByCategory.model_construct(category=categories)
+        }
+    )
+
+
+def compact(feed_entries, feeds: int) -> CategoryByBaseUrl:
+    compact_entries = [CompactEntry(entry["title"], entry["link"]) for entry in feed_entries]
+    categories = {
+        f"CATEGORY_{index}": Entries.from_compact(compact_entries) for index in range(feeds)
+    }
+    return CategoryByBaseUrl.model_construct(
+        provider={
+            "https://feeds.example.com/": EntriesByCategory.model_construct(category=categories)
+        }
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--feeds", type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    document = (FIXTURES_DIRECTORY / "feeds" / "sky_news" / "home.xml").read_bytes()
+    feed_entries = feedparser.parse(document)["entries"]
+    print(f"{args.feeds} feeds x {len(feed_entries)} feedparser entries")
+
+    for name, build in (
+        ("full validation", validated),
+        ("projected batch validation", fast_path),
+        ("compact trusted entries", compact),
+    ):
+        start = time.process_time()
+        build(feed_entries, args.feeds)
+        cpu_seconds = time.process_time() - start
+
+        tracemalloc.start()
+        tree = build(feed_entries, args.feeds)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del tree
+        print(f"  {name:<28} {cpu_seconds * 1000:8.1f}ms CPU {peak / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
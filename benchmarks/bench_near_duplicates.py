@@ -0,0 +1,59 @@
+"""
+Measure near-duplicate clustering throughput and accuracy on a synthetic stream.
+
+    python -m benchmarks.bench_near_duplicates --articles 30000
+
+A share of the stream are re-published copies of earlier articles under a new URL, each
+with a sentence added, standing in for syndicated or updated stories.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_search_index import synthetic_articles, vocabulary
+from classes.services.near_duplicates import NearDuplicateDetector
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--articles", type=int, default=30_000)
+    arg_parser.add_argument("--duplicate-share", type=float, default=0.1)
+    arg_parser.add_argument("--body-words", type=int, default=400)
+    arg_parser.add_argument("--max-distance", type=int, default=6)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(0)
+    originals = list(
+        synthetic_articles(args.articles, vocabulary(50_000), args.body_words)
+    )
+    stream = []
+    planted = set()
+    for parsed_article in originals:
+        stream.append(parsed_article)
+        if rng.random() < args.duplicate_share:
+            copy = parsed_article.model_copy(
+                update={
+                    "url": parsed_article.url + "?syndicated",
+                    "body": parsed_article.body + " Additional reporting by agencies.",
+                }
+            )
+            planted.add(copy.url)
+            stream.append(copy)
+
+    detector = NearDuplicateDetector(max_distance=args.max_distance)
+    start = time.perf_counter()
+    flagged = {
+        parsed_article.url for parsed_article in stream if detector.assign(parsed_article)
+    }
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(stream)} articles in {elapsed:.1f}s ({len(stream) / elapsed:,.0f} articles/s)"
+    )
+    print(f"planted duplicates found: {len(planted & flagged)}/{len(planted)}")
+    print(f"false positives:          {len(flagged - planted)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measure search index build throughput and query latency on a synthetic corpus.
+
+    python -m benchmarks.bench_search_index --articles 100000
+
+Word frequencies follow a Zipf distribution over a fixed vocabulary, so common query
+terms have long posting lists as they would in real news text.
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+
+from benchmarks.run_benchmarks import percentile
+from classes.models.parsed_article import ParsedArticle
+from classes.services.search_index import SearchIndex
+
+PROVIDERS = ["https://feeds.skynews.com/feeds/rss", "https://feeds.bbci.co.uk/news"]
+CATEGORIES = ["HOME", "UK", "WORLD", "BUSINESS", "POLITICS", "TECH", "SPORT", "HEALTH"]
+
+
+def vocabulary(size: int) -> List[str]:
+    letters = "bcdfghjklmnpqrstvwxz"
+    vowels = "aeiou"
+    words = []
+    for index in range(size):
+        word = ""
+        while True:
+            index, consonant = divmod(index, len(letters))
+            index, vowel = divmod(index, len(vowels))
+            word += letters[consonant] + vowels[vowel]
+            if not index:
+                break
+        words.append(word + "n")
+    return words
+
+
+def synthetic_articles(
+    count: int, words: List[str], body_words: int, seed: int = 0
+) -> Iterator[ParsedArticle]:
+    rng = np.random.default_rng(seed)
+    vocabulary_array = np.array(words)
+    for index in range(count):
+        ranks = np.minimum(rng.zipf(1.15, size=body_words + 8), len(words)) - 1
+        text = vocabulary_array[ranks]
+        yield ParsedArticle(
+            title=" ".join(text[:8]),
+            url=f"https://news.example.com/story/{index}",
+            authors=[f"Reporter {index % 200}"],
+            body=" ".join(text[8:]),
+            provider=PROVIDERS[index % len(PROVIDERS)],
+            categories=[CATEGORIES[index % len(CATEGORIES)]],
+        )
+
+
+def directory_size(path: Path) -> int:
+    return sum(child.stat().st_size for child in path.iterdir() if child.is_file())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--articles", type=int, default=100_000)
+    arg_parser.add_argument("--body-words", type=int, default=250)
+    arg_parser.add_argument("--vocabulary", type=int, default=50_000)
+    arg_parser.add_argument("--segment-size", type=int, default=20_000)
+    arg_parser.add_argument("--queries", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    words = vocabulary(args.vocabulary)
+    articles = list(synthetic_articles(args.articles, words, args.body_words))
+    directory = Path(tempfile.mkdtemp(prefix="search-index-"))
+    try:
+        index = SearchIndex(directory, segment_size=args.segment_size)
+        start = time.perf_counter()
+        for parsed_article in articles:
+            index.add(parsed_article)
+        index.commit()
+        build = time.perf_counter() - start
+        print(
+            f"build: {args.articles} articles in {build:.1f}s "
+            f"({args.articles / build:,.0f} articles/s), {len(index.segments)} segments, "
+            f"{directory_size(directory) / 2**20:.1f} MiB on disk"
+        )
+
+        start = time.perf_counter()
+        index.merge()
+        print(f"merge: {time.perf_counter() - start:.1f}s")
+
+        rng = np.random.default_rng(1)
+        for label, terms, filters in (
+            ("1 common term", 1, {}),
+            ("1 rare term", 1, {}),
+            ("3 terms", 3, {}),
+            ("3 terms + category", 3, {"category": "politics"}),
+        ):
+            low, high = (1000, 10_000) if label == "1 rare term" else (5, 500)
+            samples = []
+            for _ in range(args.queries):
+                query = " ".join(words[rank] for rank in rng.integers(low, high, terms))
+                start = time.perf_counter()
+                index.search(query, limit=10, **filters)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(
+                f"query {label:<20} p50 {percentile(samples, 0.5):6.2f}ms  "
+                f"p95 {percentile(samples, 0.95):6.2f}ms  "
+                f"mean {statistics.fmean(samples):6.2f}ms"
+            )
+        index.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
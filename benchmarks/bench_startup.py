@@ -0,0 +1,67 @@
+"""
+Measure cold-start import cost with python -X importtime, each module in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPOSITORY_ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "classes.services.feed_service",
+    "classes.services.orchestrator",
+    "classes.services.article_parsers",
+]
+
+# Extraction libraries that should only be imported once an article parser is used, and
+# numpy, which only near-duplicate detection and the search index need.
+HEAVY_MODULES = frozenset({"newspaper", "goose3", "nltk", "PIL", "numpy"})
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """
+    Run statement in a fresh interpreter and return the cumulative import time of every
+    module it loaded, in microseconds.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPOSITORY_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_modules(times: Dict[str, int]) -> List[str]:
+    return sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    for module in MODULES:
+        samples = [import_times(f"import {module}")[module] / 1000 for _ in range(args.repeat)]
+        loaded = heavy_modules(import_times(f"import {module}"))
+        print(
+            f"{module:<36} median {statistics.median(samples):8.1f}ms"
+            f"  min {min(samples):8.1f}ms  heavy: {', '.join(loaded) or 'none'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure how article throughput scales with the number of worker processes sharing one
+SQLite work queue, against the local stand-in server.
+
+    python -m benchmarks.bench_work_queue --articles 200 --processes 1 2 4 --latency 0.2
+
+Each process extracts with its own parser and connection pool. Workers import and warm up
+before the clock starts, so the numbers exclude interpreter start-up.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stand_in_server import StandInServer
+from classes.models.article_job import ArticleJob
+from classes.services.article_parsers import ARTICLE_PARSERS, get_article_parser
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.queue_workers import ARTICLE_QUEUE, ArticleWorker
+from classes.services.transport import HttpTransport
+from classes.services.work_queue import SQLiteWorkQueue
+
+
+def work(path: str, parser_name: str, threads: int, base_url: str, barrier):
+    orchestrator = Orchestrator(
+        article_parser=get_article_parser(parser_name, transport=HttpTransport()),
+        feed_service=None,
+        news_providers=NewsProviders(),
+        max_workers=threads,
+    )
+    # Pay for the parser's lazy imports before timing starts.
+    orchestrator.article_parser.article_parse(f"{base_url}/articles/warmup-{os.getpid()}")
+    queue = SQLiteWorkQueue(path)
+    barrier.wait()
+    ArticleWorker(queue, orchestrator, poll_interval=0.05).run(stop_when_idle=True)
+    queue.close()
+
+
+def run(processes: int, articles: int, parser_name: str, threads: int, base_url: str) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "queue.sqlite3")
+        queue = SQLiteWorkQueue(path)
+        queue.put_many(
+            ARTICLE_QUEUE,
+            (
+                (
+                    str(index),
+                    ArticleJob(
+                        url=f"{base_url}/articles/bench-{index}",
+                        link=f"{base_url}/articles/bench-{index}",
+                        provider=base_url,
+                        categories=["HOME"],
+                    ).model_dump(),
+                )
+                for index in range(articles)
+            ),
+        )
+
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(processes + 1)
+        workers = [
+            context.Process(
+                target=work, args=(path, parser_name, threads, base_url, barrier)
+            )
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        done = queue.counts(ARTICLE_QUEUE)["done"]
+        assert done == articles, f"expected {articles} articles, got {done}"
+        queue.close()
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--articles", type=int, default=200)
+    arg_parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    arg_parser.add_argument("--threads", type=int, default=1, help="Workers per process.")
+    arg_parser.add_argument("--latency", type=float, default=0.2)
+    arg_parser.add_argument("--parser", choices=sorted(ARTICLE_PARSERS), default="newspaper")
+    args = arg_parser.parse_args()
+
+    print(
+        f"parser={args.parser} articles={args.articles} latency={args.latency}s "
+        f"threads per process={args.threads}"
+    )
+    with StandInServer(latency=args.latency) as server:
+        baseline = None
+        for processes in args.processes:
+            elapsed = run(
+                processes, args.articles, args.parser, args.threads, server.base_url
+            )
+            baseline = baseline or elapsed
+            print(
+                f"processes={processes}: {elapsed:.2f}s "
+                f"({args.articles / elapsed:.1f} articles/s, {baseline / elapsed:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
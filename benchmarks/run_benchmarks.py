@@ -0,0 +1,402 @@
+"""
+Offline end-to-end benchmark suite.
+
+Runs every stage of the pipeline against the local stand-in server and prints a JSON report
+with throughput, p50/p95/p99 latency and memory per stage. Each stage runs in a fresh Python
+process with its own stand-in server, so its peak RSS is its own and not whatever an earlier
+stage left behind. --trace-memory also records the stage's peak Python allocations with
+tracemalloc, at a large cost to the timings.
+
+A stage's errors are the operations that failed plus the feeds that were skipped because
+they couldn't be fetched. http_errors counts every error response the stand-in server
+injected, including ones that a retry recovered from:
+
+    python -m benchmarks.run_benchmarks --latency 0.05 --error-rate 0.01 --output bench.json
+
+Pass --baseline with an earlier report to fail when a stage regressed beyond --tolerance:
+
+    python -m benchmarks.run_benchmarks --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Type
+
+from benchmarks.stand_in_server import StandInServer
+from classes.models.news_provider import NewsProvider
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import (
+    GooseArticleParser,
+    NewsArticleParserInterface,
+    NewspaperArticleParser,
+)
+from classes.services.feed_parsers import AsyncFeedParser, FastFeedParser, FeedParser
+from classes.services.feed_service import FeedService
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.utils.load_config import load_config
+from classes.utils.metrics import InMemoryMetrics, set_metrics
+from classes.utils.url_normaliser import host_of
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "news_providers.json"
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class StageResult:
+    name: str
+    operations: int = 0
+    errors: int = 0
+    http_errors: int = 0
+    seconds: float = 0.0
+    throughput: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    peak_rss_bytes: int = 0
+    peak_traced_bytes: Optional[int] = None
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    def report(self) -> Dict:
+        report = asdict(self)
+        del report["latencies"]
+        return report
+
+
+def start_stage(trace_memory: bool) -> float:
+    if trace_memory:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    return time.perf_counter()
+
+
+def run_stage(
+    name: str, operations: Iterable[Callable[[], object]], trace_memory: bool = False
+) -> StageResult:
+    """
+    Run each operation once, timing it and counting the ones that raise.
+    """
+    result = StageResult(name=name)
+    start = start_stage(trace_memory)
+    for operation in operations:
+        operation_start = time.perf_counter()
+        try:
+            operation()
+        except Exception:
+            result.errors += 1
+        result.latencies.append(time.perf_counter() - operation_start)
+    return finish_stage(result, start)
+
+
+def finish_stage(result: StageResult, start: float) -> StageResult:
+    result.seconds = time.perf_counter() - start
+    if tracemalloc.is_tracing():
+        result.peak_traced_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    result.operations = len(result.latencies)
+    result.throughput = result.operations / result.seconds if result.seconds else 0.0
+    result.p50_ms = percentile(result.latencies, 0.50) * 1000
+    result.p95_ms = percentile(result.latencies, 0.95) * 1000
+    result.p99_ms = percentile(result.latencies, 0.99) * 1000
+    return result
+
+
+class TimedArticleParser(NewsArticleParserInterface):
+    """Records the latency of every call made through the wrapped parser."""
+
+    def __init__(self, article_parser: NewsArticleParserInterface):
+        self.article_parser = article_parser
+        self.latencies: List[float] = []
+
+    def article_parse(self, article_url: str) -> ParsedArticle:
+        start = time.perf_counter()
+        try:
+            return self.article_parser.article_parse(article_url)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def stand_in_providers(base_url: str) -> NewsProviders:
+    """
+    The configured providers, with every feed pointed at the stand-in server.
+    """
+    news_providers = NewsProviders()
+    for key, news_provider in load_config(CONFIG_PATH).providers.items():
+        news_providers.register_provider(
+            key,
+            NewsProvider(
+                base_url=f"{base_url}/feeds/{key}",
+                categories={
+                    category.name: f"/{category.name.lower()}.xml"
+                    for category in news_provider.categories
+                },
+            ),
+        )
+    return news_providers
+
+
+def feed_urls(news_providers: NewsProviders) -> List[str]:
+    return [
+        f"{news_provider.base_url}{category.value}"
+        for news_provider in news_providers.providers
+        for category in news_provider.categories
+    ]
+
+
+def article_urls(base_url: str, count: int) -> List[str]:
+    prefixes = ("sky/story/stand-in", "bbc/news/articles/c0standin")
+    return [
+        f"{base_url}/articles/{prefixes[index % 2]}-{index}" for index in range(count)
+    ]
+
+
+def bench_feed_parser(server: StandInServer, news_providers: NewsProviders, args) -> StageResult:
+    parser = FeedParser()
+    urls = feed_urls(news_providers) * args.repeat
+    return run_stage(
+        "feed_parser", (lambda url=url: parser.parse(url) for url in urls), args.trace_memory
+    )
+
+
+def bench_feed_parser_fast(
+    server: StandInServer, news_providers: NewsProviders, args
+) -> StageResult:
+    fast_parser = FastFeedParser()
+    urls = feed_urls(news_providers) * args.repeat
+    try:
+        return run_stage(
+            "feed_parser_fast",
+            (lambda url=url: fast_parser.parse(url, limit=args.limit) for url in urls),
+            args.trace_memory,
+        )
+    finally:
+        fast_parser.close()
+
+
+def bench_feed_service(server: StandInServer, news_providers: NewsProviders, args) -> StageResult:
+    feed_service = FeedService(FeedParser())
+    return run_stage(
+        "feed_service",
+        (
+            lambda news_provider=news_provider: feed_service.parse_all_categories(news_provider)
+            for news_provider in news_providers.providers * args.repeat
+        ),
+        args.trace_memory,
+    )
+
+
+def bench_feed_service_async(
+    server: StandInServer, news_providers: NewsProviders, args
+) -> StageResult:
+    async_parser = AsyncFeedParser()
+    async_feed_service = FeedService(async_parser)
+    try:
+        return run_stage(
+            "feed_service_async",
+            (
+                lambda: asyncio.run(async_feed_service.aparse_all_providers(news_providers))
+                for _ in range(args.repeat)
+            ),
+            args.trace_memory,
+        )
+    finally:
+        async_parser.close()
+
+
+def bench_article_parser(parser_class: Type[NewsArticleParserInterface], name: str) -> Callable:
+    def bench(server: StandInServer, news_providers: NewsProviders, args) -> StageResult:
+        article_parser = parser_class()
+        articles = article_urls(server.base_url, args.articles)
+        return run_stage(
+            name,
+            (lambda url=url: article_parser.article_parse(url) for url in articles),
+            args.trace_memory,
+        )
+
+    return bench
+
+
+def bench_orchestrator(server: StandInServer, news_providers: NewsProviders, args) -> StageResult:
+    timed_parser = TimedArticleParser(NewspaperArticleParser())
+    orchestrator = Orchestrator(
+        article_parser=timed_parser,
+        feed_service=FeedService(FeedParser()),
+        news_providers=news_providers,
+        max_workers=args.workers,
+        max_per_host=args.max_per_host,
+    )
+    start = start_stage(args.trace_memory)
+    orchestrator.process(limit=args.limit)
+    result = StageResult(name="orchestrator_process", latencies=timed_parser.latencies)
+    result = finish_stage(result, start)
+    result.errors = len(timed_parser.latencies) - len(orchestrator.parsed_articles)
+    return result
+
+
+STAGES: Dict[str, Callable[[StandInServer, NewsProviders, argparse.Namespace], StageResult]] = {
+    "feed_parser": bench_feed_parser,
+    "feed_parser_fast": bench_feed_parser_fast,
+    "feed_service": bench_feed_service,
+    "feed_service_async": bench_feed_service_async,
+    "newspaper_article_parser": bench_article_parser(
+        NewspaperArticleParser, "newspaper_article_parser"
+    ),
+    "goose_article_parser": bench_article_parser(GooseArticleParser, "goose_article_parser"),
+    "orchestrator_process": bench_orchestrator,
+}
+
+# Options passed on to the process that runs each stage.
+STAGE_OPTIONS = (
+    "latency",
+    "latency_jitter",
+    "error_rate",
+    "repeat",
+    "articles",
+    "limit",
+    "workers",
+    "max_per_host",
+)
+
+
+def run_stage_here(name: str, args) -> Dict:
+    """
+    Run one stage in this process against a stand-in server of its own.
+    """
+    metrics = InMemoryMetrics()
+    set_metrics(metrics)
+    with StandInServer(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+    ) as server:
+        result = STAGES[name](server, stand_in_providers(server.base_url), args)
+        # FeedService logs and skips feeds it can't fetch instead of raising.
+        result.errors += int(
+            metrics.counter_value("feeds_skipped_total", host=host_of(server.base_url))
+        )
+        result.http_errors = server.errors
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result.peak_rss_bytes = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return result.report()
+
+
+def run_stage_in_subprocess(name: str, args) -> Dict:
+    command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--stage", name]
+    for option in STAGE_OPTIONS:
+        command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+    if args.trace_memory:
+        command.append("--trace-memory")
+    completed = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    return json.loads(completed.stdout)
+
+
+def run_suite(args) -> Dict:
+    return {
+        "metadata": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": vars(args) | {"baseline": None, "output": None, "stage": None},
+        },
+        "stages": {name: run_stage_in_subprocess(name, args) for name in STAGES},
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Stages whose p95 latency or throughput got worse than the baseline by more than tolerance.
+    """
+    found = []
+    for name, stage in report["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and stage["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append(f"{name}: p95 {previous['p95_ms']:.1f}ms -> {stage['p95_ms']:.1f}ms")
+        if previous["throughput"] and stage["throughput"] < previous["throughput"] * (1 - tolerance):
+            found.append(
+                f"{name}: throughput {previous['throughput']:.1f}/s -> {stage['throughput']:.1f}/s"
+            )
+    return found
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument("--latency", type=float, default=0.02)
+    arg_parser.add_argument("--latency-jitter", type=float, default=0.0)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Passes over every feed")
+    arg_parser.add_argument("--articles", type=int, default=20)
+    arg_parser.add_argument("--limit", type=int, default=5)
+    arg_parser.add_argument("--workers", type=int, default=8)
+    arg_parser.add_argument("--max-per-host", type=int, default=4)
+    arg_parser.add_argument("--trace-memory", action="store_true")
+    arg_parser.add_argument("--output", type=Path)
+    arg_parser.add_argument("--baseline", type=Path)
+    arg_parser.add_argument("--tolerance", type=float, default=0.2)
+    arg_parser.add_argument(
+        "--stage", choices=sorted(STAGES), help="Run only this stage, in this process"
+    )
+    args = arg_parser.parse_args()
+
+    if args.stage is not None:
+        print(json.dumps(run_stage_here(args.stage, args), default=str))
+        return
+
+    report = run_suite(args)
+    serialised = json.dumps(report, indent=2, default=str)
+    if args.output:
+        args.output.write_text(serialised + "\n", encoding="utf-8")
+    print(serialised)
+
+    if args.baseline:
+        found = regressions(
+            report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance
+        )
+        for regression in found:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
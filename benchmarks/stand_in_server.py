@@ -0,0 +1,231 @@
+"""
+A local HTTP stand-in for the news hosts, used by the benchmarks to exercise the pipeline offline.
+
+Feeds are replayed from fixtures/feeds/<provider>/<category>.xml and article pages from
+fixtures/articles/<prefix>.html, where <prefix> is the first path segment after /articles/.
+Any path under /redirect/ redirects to the same path without that prefix.
+Recorded files can be dropped into those directories; "{base_url}" in a feed and "{story}"
+in an article are substituted when served. Anything without a recording is generated.
+"""
+
+import gzip
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+FIXTURES_DIRECTORY = Path(__file__).parent / "fixtures"
+
+ARTICLE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<title>{title}</title>
+<meta property="og:title" content="{title}">
+<meta name="author" content="Stand In Reporter">
+</head>
+<body>
+<article>
+<h1>{title}</h1>
+{paragraphs}
+</article>
+</body>
+</html>
+"""
+
+PARAGRAPH = (
+    "<p>Paragraph {index} of story {story}. Ministers met on Tuesday to discuss the latest figures, "
+    "which showed a rise in demand across the country. Officials said more detail would follow "
+    "later in the week as the review continues.</p>"
+)
+
+
+FEED_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>{name}</title>
+<link>{base_url}</link>
+<description>Stand-in feed {name}</description>
+{items}
+</channel>
+</rss>
+"""
+
+FEED_ITEM = """<item>
+<title>Stand-in story {story}</title>
+<link>{base_url}/articles/{story}</link>
+<description>Summary of story {story}.</description>
+<guid isPermaLink="false">{story}</guid>
+</item>"""
+
+
+def render_feed(name: str, base_url: str, items: int = 20) -> str:
+    return FEED_XML.format(
+        name=name,
+        base_url=base_url,
+        items="\n".join(
+            FEED_ITEM.format(story=f"{name}-{index}", base_url=base_url)
+            for index in range(items)
+        ),
+    )
+
+
+def render_article(story: str, paragraphs: int = 12) -> str:
+    return ARTICLE_HTML.format(
+        title=f"Stand-in story {story}",
+        paragraphs="\n".join(
+            PARAGRAPH.format(index=index, story=story) for index in range(paragraphs)
+        ),
+    )
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInServer"
+
+    def do_GET(self):
+        self.server.count_request()
+        delay = self.server.latency + random.uniform(0, self.server.latency_jitter)
+        if delay:
+            time.sleep(delay)
+
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self.server.count_error()
+            headers = {}
+            if self.server.retry_after is not None:
+                headers["Retry-After"] = str(self.server.retry_after)
+            self._send(self.server.error_status, "Unavailable", "text/plain", headers)
+            return
+
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/redirect/"):
+            # Like a short link or moved story: /redirect/<path> moves permanently to /<path>.
+            self._send(301, "Moved", "text/plain", {"Location": path[len("/redirect") :]})
+        elif path.startswith("/articles/"):
+            self._send(200, self.server.article(path), "text/html; charset=utf-8")
+        elif path.startswith("/feeds/") and path.endswith(".xml"):
+            feed = self.server.feed(path[len("/feeds/") : -len(".xml")])
+            etag = f'"{zlib.crc32(feed.encode("utf-8")):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self._send(200, feed, "application/rss+xml; charset=utf-8", {"ETag": etag})
+        else:
+            self._send(404, "Not Found", "text/plain")
+
+    def _send(
+        self,
+        status: int,
+        body: str,
+        content_type: str,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        if self.server.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        feed_items: int = 20,
+        fixtures_directory: Optional[Path] = FIXTURES_DIRECTORY,
+        compress: bool = False,
+        error_status: int = 503,
+        retry_after: Optional[int] = None,
+    ):
+        """
+        Args:
+            latency (float): Seconds added to every response.
+            latency_jitter (float): Upper bound of extra random seconds added to every response.
+            error_rate (float): Probability of answering any request with error_status.
+            feed_items (int): Number of items in generated feeds.
+            fixtures_directory (Optional[Path]): Directory of recorded feeds and articles to replay.
+            compress (bool): Gzip response bodies for clients that accept it.
+            error_status (int): Status of injected errors, e.g. 503 or 429.
+            retry_after (Optional[int]): Retry-After seconds sent with injected errors.
+        """
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.feed_items = feed_items
+        self.compress = compress
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self._requests_lock = threading.Lock()
+        self._fixtures: Dict[Path, Optional[str]] = {}
+        self.fixtures_directory = fixtures_directory
+        self._thread: Optional[threading.Thread] = None
+
+    def count_request(self):
+        with self._requests_lock:
+            self.requests += 1
+
+    def count_error(self):
+        with self._requests_lock:
+            self.errors += 1
+
+    def _fixture(self, *parts: str) -> Optional[str]:
+        if self.fixtures_directory is None:
+            return None
+        path = self.fixtures_directory.joinpath(*parts)
+        if path not in self._fixtures:
+            self._fixtures[path] = (
+                path.read_text(encoding="utf-8") if path.is_file() else None
+            )
+        return self._fixtures[path]
+
+    def feed(self, name: str) -> str:
+        recorded = self._fixture("feeds", f"{name}.xml")
+        if recorded is not None:
+            return recorded.replace("{base_url}", self.base_url)
+        return render_feed(name, self.base_url, self.feed_items)
+
+    def article(self, path: str) -> str:
+        parts = path[len("/articles/") :].strip("/").split("/")
+        story = parts[-1]
+        recorded = self._fixture("articles", f"{parts[0]}.html") if len(parts) > 1 else None
+        if recorded is not None:
+            return recorded.replace("{story}", story)
+        return render_article(story)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
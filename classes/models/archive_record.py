@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ArchiveRecord(BaseModel):
+    url: str = Field(..., description="Normalised link used to look the page up")
+    link: str = Field(..., description="Link the page was fetched from")
+    final_url: Optional[str] = Field(
+        None, description="URL the page was served from after redirects, if it differs"
+    )
+    fetched_at: float = Field(..., description="Unix time the page was fetched")
+    segment: str = Field(..., description="Name of the archive file holding the record")
+    offset: int = Field(..., description="Byte offset of the record's gzip member in the segment")
+    length: int = Field(..., description="Compressed length of the record in bytes")
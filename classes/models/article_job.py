@@ -0,0 +1,27 @@
+from typing import List
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class ArticleJob(BaseModel):
+    url: str = Field(..., description="Normalised link used to identify the article")
+    link: str = Field(..., description="Link as it first appeared in a feed")
+    provider: str = Field(..., description="Base URL of the provider the link was first found in")
+    providers: List[str] = Field(
+        default_factory=list, description="Every provider the article appeared in"
+    )
+    categories: List[str] = Field(
+        default_factory=list, description="Every category the article appeared in"
+    )
+    priority: float = Field(
+        1.0, description="Highest priority of the categories the article appeared in"
+    )
+    rank: int = Field(
+        0, description="Best position of the article in any of its feeds, 0 being the top"
+    )
+
+    @model_validator(mode="after")
+    def include_provider(self):
+        if self.provider not in self.providers:
+            self.providers.insert(0, self.provider)
+        return self
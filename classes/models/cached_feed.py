@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from classes.models.entries import Entries
+
+
+class CachedFeed(BaseModel):
+    etag: Optional[str] = Field(None, description="ETag header of the cached response")
+    modified: Optional[str] = Field(
+        None, description="Last-Modified header of the cached response"
+    )
+    entries: Entries
+
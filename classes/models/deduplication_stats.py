@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class DeduplicationStats(BaseModel):
+    entries: int = 0
+    unique_articles: int = 0
+
+    @property
+    def fetches_avoided(self) -> int:
+        return self.entries - self.unique_articles
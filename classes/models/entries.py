@@ -1,5 +1,6 @@
-from typing import Dict, List
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+from pydantic import BaseModel, Field, TypeAdapter
 from pydantic_core import Url
 
 
@@ -8,8 +9,64 @@ class Entry(BaseModel):
     link: str = Field(..., description="Link to the full news article")
 
 
+class CompactEntry(NamedTuple):
+    """
+    Tuple-backed entry for internal use where a full model per item isn't needed.
+    """
+
+    title: str
+    link: str
+
+
+@lru_cache(maxsize=None)
+def entry_list_adapter() -> TypeAdapter:
+    return TypeAdapter(List[Entry | None])
+
+
+def project_entry(entry: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Keep only the keys Entry needs, so validation never walks the rest of a feedparser entry.
+    """
+    if entry is None:
+        return None
+    # FeedParserDict overrides get() with a slow key-aliasing lookup; title and link are plain keys.
+    get = dict.get if isinstance(entry, dict) else type(entry).get
+    return {"title": get(entry, "title"), "link": get(entry, "link")}
+
+
 class Entries(BaseModel):
     entries: List[Entry | None]
+    ttl: Optional[int] = Field(
+        None,
+        description="Refresh interval in seconds suggested by the feed's ttl or Cache-Control max-age",
+    )
+
+    @classmethod
+    def from_feed_entries(
+        cls, feed_entries: Iterable[Optional[Mapping[str, Any]]], ttl: Optional[int] = None
+    ) -> "Entries":
+        """
+        Validate untrusted feed entries as one batch, projecting them to title and link first.
+        """
+        entries = entry_list_adapter().validate_python(
+            [project_entry(entry) for entry in feed_entries]
+        )
+        return cls.model_construct(entries=entries, ttl=ttl)
+
+    @classmethod
+    def from_compact(
+        cls, compact_entries: Iterable[CompactEntry], ttl: Optional[int] = None
+    ) -> "Entries":
+        """
+        Build from entries produced by our own parsers.
+
+        The batch is still run through the cached adapter: pydantic-core builds the models
+        faster than a Python loop of Entry.model_construct calls.
+        """
+        entries = entry_list_adapter().validate_python(
+            [{"title": title, "link": link} for title, link in compact_entries]
+        )
+        return cls.model_construct(entries=entries, ttl=ttl)
 
 
 class EntriesByCategory(BaseModel):
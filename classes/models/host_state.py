@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class HostState(BaseModel):
+    host: str
+    circuit: str = Field(..., description='"closed", "open" or "half_open"')
+    consecutive_failures: int
+    rate: float = Field(..., description="Requests per second currently allowed")
+    available_in: float = Field(
+        ..., description="Seconds until the host accepts requests again, 0 if it does now"
+    )
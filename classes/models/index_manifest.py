@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class IndexManifest(BaseModel):
+    segments: list[str] = Field(default_factory=list)
+    next_doc_id: int = 0
+    next_segment: int = 0
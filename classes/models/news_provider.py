@@ -1,14 +1,27 @@
 from enum import Enum
-from typing import Type
+from typing import Dict, Type
 
-from pydantic import AnyUrl, BaseModel, field_validator
+from pydantic import AnyUrl, BaseModel, Field, field_validator
 
 
 class NewsProvider(BaseModel):
     categories: Type[Enum]
     base_url: AnyUrl
+    priority: float = Field(
+        1.0, ge=0, description="Weight applied to every category of the provider"
+    )
+    priorities: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Weight of each category by name. Unlisted categories weigh 1",
+    )
 
     @field_validator("categories", mode="before")
     @classmethod
     def validate_categories(cls, categories):
         return Enum("BaseNewsCategory", categories, type=str)
+
+    def category_priority(self, category: str) -> float:
+        """
+        Articles from higher priority categories are extracted first.
+        """
+        return self.priority * self.priorities.get(category, 1.0)
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 
 class ParsedArticle(BaseModel):
@@ -6,3 +8,7 @@ class ParsedArticle(BaseModel):
     url: str
     authors: list[str]
     body: str
+    provider: Optional[str] = None
+    providers: list[str] = Field(default_factory=list)
+    categories: list[str] = Field(default_factory=list)
+    cluster_id: Optional[str] = None
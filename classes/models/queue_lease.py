@@ -0,0 +1,12 @@
+from typing import Any, Dict
+
+from pydantic import BaseModel, Field
+
+
+class QueueLease(BaseModel):
+    id: int
+    queue: str
+    key: str = Field(..., description="Identifies the job, so the same work is only queued once")
+    payload: Dict[str, Any]
+    token: str = Field(..., description="Proves the lease is still held when it is acknowledged")
+    attempts: int = Field(..., description="Number of times the job has been leased, this one included")
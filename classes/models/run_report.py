@@ -0,0 +1,25 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from classes.models.article_job import ArticleJob
+
+
+class SkippedArticle(BaseModel):
+    job: ArticleJob
+    reason: str = Field(
+        ...,
+        description='"budget" when the run ran out of time, "deadline" when the article '
+        "took longer than its own deadline",
+    )
+
+
+class RunReport(BaseModel):
+    completed: int = 0
+    failed: int = 0
+    skipped: List[SkippedArticle] = Field(default_factory=list)
+    budget_exhausted: bool = False
+    elapsed_seconds: float = 0.0
+
+    def skip(self, job: ArticleJob, reason: str):
+        self.skipped.append(SkippedArticle(job=job, reason=reason))
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    doc_id: int
+    score: float
+    url: str
+    title: str
+    provider: Optional[str] = None
+    authors: list[str] = Field(default_factory=list)
+    categories: list[str] = Field(default_factory=list)
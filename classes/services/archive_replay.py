@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from classes.models.archive_record import ArchiveRecord
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import HttpArticleParser, get_article_parser
+from classes.services.page_archive import PageArchive, read_record
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+# The parser of a replay worker process, built once by _init_worker.
+_worker_parser: Optional[HttpArticleParser] = None
+
+
+def _build_parser(parser_name: str) -> HttpArticleParser:
+    parser = get_article_parser(parser_name)
+    if not isinstance(parser, HttpArticleParser):
+        raise ValueError(f"Article parser {parser_name!r} can't extract from stored HTML")
+    return parser
+
+
+def _init_worker(parser_name: str):
+    global _worker_parser
+    _worker_parser = _build_parser(parser_name)
+
+
+def _extract_chunk(
+    parser: HttpArticleParser, directory: str, records: List[ArchiveRecord]
+) -> Tuple[List[ParsedArticle], int]:
+    articles = []
+    failed = 0
+    for record in records:
+        try:
+            html = read_record(
+                os.path.join(directory, record.segment), record.offset, record.length
+            )
+            # Extract against the same URL live extraction used.
+            articles.append(parser.article_parse_html(record.final_url or record.link, html))
+        except Exception as e:
+            failed += 1
+            logger.error("Error re-extracting archived %s: %s", record.link, e)
+    return articles, failed
+
+
+def _extract_chunk_in_worker(
+    directory: str, records: List[ArchiveRecord]
+) -> Tuple[List[ParsedArticle], int]:
+    return _extract_chunk(_worker_parser, directory, records)
+
+
+class ArchiveReplay:
+    """
+    Re-runs an article parser over archived pages, without the network.
+
+    Records are read in file order and handed out in chunks to a pool of processes, one per
+    core by default, so extraction isn't held back by the GIL. Worker processes are spawned,
+    so the parser has to be registered when classes.services.article_parsers is imported.
+
+    Articles are yielded as chunks complete, so their order isn't preserved. Provider and
+    categories come from the feeds rather than the page, so they are left unset.
+    """
+
+    def __init__(
+        self,
+        archive: PageArchive,
+        parser_name: str = "newspaper",
+        processes: Optional[int] = None,
+        chunk_size: int = 64,
+    ):
+        """
+        Args:
+            processes (Optional[int]): Worker processes. Defaults to the number of cores; 1
+                extracts in this process.
+            chunk_size (int): Records sent to a worker at a time.
+        """
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be greater than 0")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be greater than 0")
+
+        self.archive = archive
+        self.parser_name = parser_name
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.extracted = 0
+        self.failed = 0
+
+    def _chunks(self, records: List[ArchiveRecord]) -> Iterator[List[ArchiveRecord]]:
+        records = iter(records)
+        while chunk := list(islice(records, self.chunk_size)):
+            yield chunk
+
+    def _finished(self, articles: List[ParsedArticle], failed: int):
+        self.extracted += len(articles)
+        self.failed += failed
+        metrics = get_metrics()
+        metrics.increment("replay_articles_total", len(articles), status="ok")
+        metrics.increment("replay_articles_total", failed, status="error")
+
+    def run(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        latest_only: bool = True,
+    ) -> Iterator[ParsedArticle]:
+        """
+        Re-extract every page fetched within [since, until).
+
+        Args:
+            latest_only (bool): Re-extract only the last fetch of each URL.
+        """
+        self.extracted = 0
+        self.failed = 0
+        records = self.archive.records(since=since, until=until, latest_only=latest_only)
+        directory = str(self.archive.directory)
+        logger.info(
+            "Re-extracting %s archived pages with %s in %s processes",
+            len(records),
+            self.parser_name,
+            self.processes,
+        )
+
+        if self.processes == 1:
+            parser = _build_parser(self.parser_name)
+            for chunk in self._chunks(records):
+                articles, failed = _extract_chunk(parser, directory, chunk)
+                self._finished(articles, failed)
+                yield from articles
+            return
+
+        chunks = self._chunks(records)
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.parser_name,),
+        ) as executor:
+            # Keep two chunks per process queued, so memory stays bounded.
+            in_flight = {
+                executor.submit(_extract_chunk_in_worker, directory, chunk)
+                for chunk in islice(chunks, self.processes * 2)
+            }
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    articles, failed = future.result()
+                    self._finished(articles, failed)
+                    yield from articles
+                    for chunk in islice(chunks, 1):
+                        in_flight.add(
+                            executor.submit(_extract_chunk_in_worker, directory, chunk)
+                        )
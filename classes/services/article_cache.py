@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from classes.models.cache_stats import CacheStats
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import NewsArticleParserInterface
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import normalise_url
+
+
+class ArticleCache:
+    """
+    SQLite-backed store of ParsedArticle results with a TTL and least-recently-used eviction.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl_seconds: Optional[float] = 24 * 60 * 60,
+        max_entries: Optional[int] = 10_000,
+    ):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be greater than 0")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                article TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at)"
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def get(self, url: str) -> Optional[ParsedArticle]:
+        key = normalise_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT article, stored_at FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[1], now):
+                if row is not None:
+                    self._connection.execute("DELETE FROM articles WHERE url = ?", (key,))
+                    self._connection.commit()
+                self.stats.misses += 1
+                get_metrics().increment("article_cache_misses_total")
+                return None
+
+            self._connection.execute(
+                "UPDATE articles SET accessed_at = ? WHERE url = ?", (now, key)
+            )
+            self._connection.commit()
+            self.stats.hits += 1
+        get_metrics().increment("article_cache_hits_total")
+        return ParsedArticle.model_validate_json(row[0])
+
+    def put(self, url: str, article: ParsedArticle):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO articles (url, article, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (normalise_url(url), article.model_dump_json(), now, now),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        if self.ttl_seconds is not None:
+            self._connection.execute(
+                "DELETE FROM articles WHERE stored_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        if self.max_entries is not None:
+            evicted = self._connection.execute(
+                """
+                DELETE FROM articles WHERE url IN (
+                    SELECT url FROM articles ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+            if evicted:
+                logger.debug("Evicted %s articles from the article cache", evicted)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CachedArticleParser(NewsArticleParserInterface):
+    """
+    Wraps another article parser and serves repeat URLs from an ArticleCache.
+    """
+
+    def __init__(self, article_parser: NewsArticleParserInterface, cache: ArticleCache):
+        self.article_parser = article_parser
+        self.cache = cache
+
+    def article_parse(self, article_url: str) -> ParsedArticle:
+        cached_article = self.cache.get(article_url)
+        if cached_article is not None:
+            return cached_article
+
+        parsed_article = self.article_parser.article_parse(article_url)
+        self.cache.put(article_url, parsed_article)
+        return parsed_article
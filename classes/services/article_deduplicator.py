@@ -0,0 +1,74 @@
+from typing import Callable, Dict, List, Optional
+
+from classes.models.article_job import ArticleJob
+from classes.models.deduplication_stats import DeduplicationStats
+from classes.models.entries import CategoryByBaseUrl
+from classes.utils.logger import logger
+from classes.utils.url_normaliser import normalise_url
+
+
+class ArticleDeduplicator:
+    """
+    Collapses feed entries that point at the same story into a single extraction job.
+    """
+
+    def __init__(self):
+        self.stats = DeduplicationStats()
+
+    def deduplicate(
+        self,
+        providers_by_categories: CategoryByBaseUrl,
+        limit: Optional[int] = None,
+        priority: Optional[Callable[[str, str], float]] = None,
+    ) -> List[ArticleJob]:
+        """
+        Build one job per unique normalised link, recording every provider and category it
+        appeared in.
+
+        Args:
+            limit (Optional[int]): Maximum number of entries taken from each category.
+            priority (Optional[Callable[[str, str], float]]): Weight of a provider's category.
+                When given, jobs are ordered by their highest category weight and then by
+                how near the top of a feed they appeared, so the leading stories of every
+                high priority feed come first.
+        """
+        jobs: Dict[str, ArticleJob] = {}
+        entry_count = 0
+
+        for base_url, provider in providers_by_categories.provider.items():
+            for category_name, category in provider.category.items():
+                entries = category.entries
+                weight = 1.0 if priority is None else priority(str(base_url), category_name)
+                for rank, entry in enumerate(entries[:limit] if limit else entries):
+                    if entry is None:
+                        continue
+                    entry_count += 1
+                    url = normalise_url(entry.link)
+                    job = jobs.get(url)
+                    if job is None:
+                        jobs[url] = ArticleJob(
+                            url=url,
+                            link=entry.link,
+                            provider=str(base_url),
+                            categories=[category_name],
+                            priority=weight,
+                            rank=rank,
+                        )
+                        continue
+                    if str(base_url) not in job.providers:
+                        job.providers.append(str(base_url))
+                    if category_name not in job.categories:
+                        job.categories.append(category_name)
+                    job.priority = max(job.priority, weight)
+                    job.rank = min(job.rank, rank)
+
+        self.stats = DeduplicationStats(entries=entry_count, unique_articles=len(jobs))
+        logger.info(
+            "Deduplicated %s feed entries into %s articles, avoiding %s fetches",
+            self.stats.entries,
+            self.stats.unique_articles,
+            self.stats.fetches_avoided,
+        )
+        if priority is None:
+            return list(jobs.values())
+        return sorted(jobs.values(), key=lambda job: (-job.priority, job.rank))
@@ -1,9 +1,20 @@
+import threading
 from abc import ABC, abstractmethod
-from newspaper import Article
-from goose3 import Goose
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Type, Union
+
 from pydantic import AnyUrl, ValidationError
 from classes.models.parsed_article import ParsedArticle
+from classes.services.transport import HttpTransport
 from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import host_of
+
+if TYPE_CHECKING:
+    # newspaper and goose3 pull in nltk, lxml and PIL, so they are imported on first use.
+    from goose3 import Goose
+    from newspaper import Article
+
+    from classes.services.page_archive import PageArchive
 
 
 class NewsArticleParserInterface(ABC):
@@ -20,12 +31,68 @@ class NewsArticleParserInterface(ABC):
             raise
 
 
-class NewspaperArticleParser(NewsArticleParserInterface):
+class HttpArticleParser(NewsArticleParserInterface):
+    """
+    Base for parsers that download through an HttpTransport and extract from the HTML.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        transport: Optional[HttpTransport] = None,
+        archive: Optional["PageArchive"] = None,
+    ):
+        """
+        Args:
+            transport (Optional[HttpTransport]): Shared HTTP client. A private one is created
+                if omitted.
+            archive (Optional[PageArchive]): When set, every downloaded page is stored in it
+                so it can be re-extracted later without the network.
+        """
+        self.transport = transport or HttpTransport()
+        self.archive = archive
+
     def article_parse(self, article_url: str) -> ParsedArticle:
         self.is_article_url_valid(article_url)
-        newspaper_article = Article(url=article_url)
-        newspaper_article.download()
-        newspaper_article.parse()
+        metrics = get_metrics()
+        host = host_of(article_url)
+        with metrics.timer("article_download_seconds", parser=self.name, host=host):
+            final_url, html = self.transport.get_page(article_url)
+        metrics.increment("article_bytes_total", len(html), host=host)
+        if self.archive is not None:
+            self.archive.append(article_url, html, final_url=final_url)
+        # Extract against the URL redirects led to, so the article keeps its canonical URL.
+        return self.article_parse_html(final_url, html)
+
+    @abstractmethod
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        """Parses an article from already downloaded HTML without touching the network."""
+
+    def close(self):
+        self.transport.close()
+
+
+class NewspaperArticleParser(HttpArticleParser):
+    name = "newspaper"
+
+    @staticmethod
+    def _article(article_url: str) -> "Article":
+        from newspaper import Article
+
+        return Article(url=article_url)
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        newspaper_article = self._article(article_url)
+        newspaper_article.download(input_html=html)
+        return self._parse(newspaper_article)
+
+    @staticmethod
+    def _parse(newspaper_article: "Article") -> ParsedArticle:
+        with get_metrics().timer(
+            "article_parse_seconds", parser="newspaper", host=host_of(newspaper_article.url)
+        ):
+            newspaper_article.parse()
         newspaper_article = ParsedArticle(
             title=newspaper_article.title,
             url=newspaper_article.url,
@@ -35,22 +102,161 @@ class NewspaperArticleParser(NewsArticleParserInterface):
         return newspaper_article
 
 
-class GooseArticleParser(NewsArticleParserInterface):
-    def __init__(self):
-        self.goose_extraction_object = Goose()
+class GooseArticleParser(HttpArticleParser):
+    name = "goose"
 
-    def article_parse(self, article_url: str) -> ParsedArticle:
-        self.is_article_url_valid(article_url)
-        goose_article = self.goose_extraction_object.extract(article_url)
+    def __init__(
+        self,
+        transport: Optional[HttpTransport] = None,
+        archive: Optional["PageArchive"] = None,
+    ):
+        super().__init__(transport=transport, archive=archive)
+        # Goose's network fetcher keeps per-request state, so each thread gets its own instance.
+        self._local = threading.local()
+
+    @property
+    def goose_extraction_object(self) -> "Goose":
+        if not hasattr(self._local, "goose"):
+            from goose3 import Goose
+
+            self._local.goose = Goose()
+        return self._local.goose
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        with get_metrics().timer(
+            "article_parse_seconds", parser="goose", host=host_of(article_url)
+        ):
+            goose_article = self.goose_extraction_object.extract(
+                url=article_url, raw_html=html
+            )
         goose_article = ParsedArticle(
             title=goose_article.title,
-            url=goose_article.final_url,
+            url=goose_article.final_url or article_url,
             authors=goose_article.authors,
             body=goose_article.cleaned_text,
         )
         return goose_article
 
 
+class ArticleExtractionError(Exception):
+    """Raised when no extraction backend produced an acceptable article."""
+
+
+class FallbackArticleParser(HttpArticleParser):
+    """
+    Downloads each article once and tries extraction backends on the HTML in order.
+
+    An article is accepted when it has a title and a body of at least min_body_length
+    characters. The backend that succeeded for a host is tried first for that host's
+    later articles.
+    """
+
+    name = "fallback"
+
+    def __init__(
+        self,
+        backends: Sequence[Union[str, HttpArticleParser]] = (
+            "newspaper",
+            "goose",
+        ),
+        transport: Optional[HttpTransport] = None,
+        min_body_length: int = 200,
+        require_title: bool = True,
+        archive: Optional["PageArchive"] = None,
+    ):
+        """
+        Args:
+            backends: Registered parser names or parser instances, in the order to try them.
+                The same parser may be given more than once, e.g. configured differently.
+        """
+        if not backends:
+            raise ValueError("At least one backend is required")
+        super().__init__(transport=transport, archive=archive)
+        # Backends are identified by position, and named for logs and metrics.
+        self.backends: List[Tuple[str, HttpArticleParser]] = []
+        for backend in backends:
+            if isinstance(backend, str):
+                self.backends.append(
+                    (backend, get_article_parser(backend, transport=self.transport))
+                )
+            else:
+                self.backends.append((getattr(backend, "name", type(backend).__name__), backend))
+        for name, backend in self.backends:
+            if not isinstance(backend, HttpArticleParser):
+                raise ValueError(f"Backend {name!r} can't extract from downloaded HTML")
+        self.min_body_length = min_body_length
+        self.require_title = require_title
+        self.preferred_backends: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def is_acceptable(self, article: ParsedArticle) -> bool:
+        if self.require_title and not (article.title or "").strip():
+            return False
+        return len((article.body or "").strip()) >= self.min_body_length
+
+    def _backend_order(self, host: str) -> List[int]:
+        positions = list(range(len(self.backends)))
+        with self._lock:
+            preferred = self.preferred_backends.get(host)
+        if preferred is not None:
+            positions.remove(preferred)
+            positions.insert(0, preferred)
+        return positions
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        metrics = get_metrics()
+        host = host_of(article_url)
+        for position in self._backend_order(host):
+            name, backend = self.backends[position]
+            try:
+                article = backend.article_parse_html(article_url, html)
+            except Exception as e:
+                metrics.increment("article_backend_total", parser=name, status="error")
+                logger.warning("%s failed to extract %s: %s", name, article_url, e)
+                continue
+
+            if not self.is_acceptable(article):
+                metrics.increment("article_backend_total", parser=name, status="rejected")
+                logger.info("%s extracted too little from %s", name, article_url)
+                continue
+
+            metrics.increment("article_backend_total", parser=name, status="ok")
+            with self._lock:
+                self.preferred_backends[host] = position
+            return article
+
+        raise ArticleExtractionError(
+            f"No backend extracted an acceptable article from {article_url}"
+        )
+
+
+ARTICLE_PARSERS: Dict[str, Type[NewsArticleParserInterface]] = {
+    "newspaper": NewspaperArticleParser,
+    "goose": GooseArticleParser,
+    "fallback": FallbackArticleParser,
+}
+
+
+def register_article_parser(name: str, parser_class: Type[NewsArticleParserInterface]):
+    """Make an article parser available to get_article_parser under the given name."""
+    ARTICLE_PARSERS[name] = parser_class
+
+
+def get_article_parser(name: str, **kwargs) -> NewsArticleParserInterface:
+    """
+    Build the article parser registered under name, e.g. from config or the command line.
+
+    The extraction library behind it is only imported once the parser is first used.
+    """
+    try:
+        parser_class = ARTICLE_PARSERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown article parser {name!r}, expected one of {sorted(ARTICLE_PARSERS)}"
+        ) from None
+    return parser_class(**kwargs)
+
+
 if __name__ == "__main__":
     article_parser = NewspaperArticleParser()
     article = article_parser.article_parse(
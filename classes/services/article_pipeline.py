@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Type
+
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import HttpArticleParser, NewspaperArticleParser
+from classes.services.transport import HttpTransport
+
+if TYPE_CHECKING:
+    from classes.services.page_archive import PageArchive
+
+# One parser per worker process, created on first use.
+_worker_parsers: Dict[Type[HttpArticleParser], HttpArticleParser] = {}
+
+
+def _extract_in_worker(
+    parser_class: Type[HttpArticleParser], article_url: str, html: str
+) -> ParsedArticle:
+    parser = _worker_parsers.get(parser_class)
+    if parser is None:
+        parser = _worker_parsers[parser_class] = parser_class()
+    return parser.article_parse_html(article_url, html)
+
+
+class PipelinedArticleParser(HttpArticleParser):
+    """
+    Splits article parsing into an I/O stage and a CPU stage.
+
+    The HTML is downloaded in the calling thread through a shared keep-alive HttpTransport,
+    with the same download metrics and PageArchive as any HttpArticleParser, then extraction
+    runs in a process pool sized to the machine's cores. Called from the Orchestrator's
+    worker threads, the threads keep the network busy while the processes keep every CPU
+    busy.
+
+    The pool's processes are spawned rather than forked: the pool is started from those
+    worker threads, and a child forked while other threads hold locks, such as logging's,
+    can deadlock. The parser is a library option and isn't registered for --parser.
+    """
+
+    name = "pipelined"
+
+    def __init__(
+        self,
+        parser_class: Type[HttpArticleParser] = NewspaperArticleParser,
+        transport: Optional[HttpTransport] = None,
+        max_processes: Optional[int] = None,
+        archive: Optional["PageArchive"] = None,
+    ):
+        if max_processes is not None and max_processes < 1:
+            raise ValueError("max_processes must be greater than 0")
+        super().__init__(transport=transport, archive=archive)
+        self.parser_class = parser_class
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        return self.executor.submit(
+            _extract_in_worker, self.parser_class, article_url, html
+        ).result()
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        super().close()
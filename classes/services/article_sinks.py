@@ -0,0 +1,433 @@
+import gzip
+import os
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from classes.models.parsed_article import ParsedArticle
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class ArticleSinkInterface(ABC):
+    @abstractmethod
+    def write(self, article: ParsedArticle):
+        """Accepts one article. It may be buffered until the next flush."""
+
+    def flush(self):
+        """Writes out anything buffered."""
+
+    def poll(self):
+        """Called periodically by a BackgroundSink, so time-based flushes happen when idle."""
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self) -> "ArticleSinkInterface":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MultiSink(ArticleSinkInterface):
+    """
+    Writes every article to each of several sinks.
+    """
+
+    def __init__(self, *sinks: ArticleSinkInterface):
+        self.sinks = sinks
+
+    def write(self, article: ParsedArticle):
+        for sink in self.sinks:
+            sink.write(article)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def poll(self):
+        for sink in self.sinks:
+            sink.poll()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class BatchingArticleSink(ArticleSinkInterface):
+    """
+    Buffers records and writes them in batches to a series of rotating files.
+
+    A batch is written when it holds batch_size records or batch_bytes bytes, or when
+    flush_interval seconds have passed since the last write. A new file is started once the
+    current one has been given max_file_records records.
+
+    Files are named <prefix>-<run_id>-<number><suffix>. The run_id defaults to the start
+    time and process id, numbering continues after the highest file already in the
+    directory, and files are created exclusively, so later runs and other processes writing
+    to the same directory never overwrite earlier output.
+    """
+
+    suffix = ""
+
+    def __init__(
+        self,
+        directory: Path | str,
+        prefix: str = "articles",
+        batch_size: int = 500,
+        batch_bytes: Optional[int] = None,
+        flush_interval: Optional[float] = 5.0,
+        max_file_records: Optional[int] = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+        run_id: Optional[str] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0")
+        if max_file_records is not None and max_file_records < 1:
+            raise ValueError("max_file_records must be greater than 0")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.max_file_records = max_file_records
+        self.clock = clock
+        self.run_id = run_id or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.paths: List[Path] = []
+        self._next_number = self._first_free_number()
+        self._buffer: List[Any] = []
+        self._buffered_bytes = 0
+        self._file_records = 0
+        self._last_flush = clock()
+
+    @abstractmethod
+    def _record(self, article: ParsedArticle) -> Any:
+        """Converts an article into the record buffered for the next batch."""
+
+    def _record_size(self, record: Any) -> int:
+        return 0
+
+    @abstractmethod
+    def _open(self, path: Path):
+        """Starts a new output file, raising FileExistsError if it already exists."""
+
+    @abstractmethod
+    def _write_batch(self, records: List[Any]):
+        """Appends a batch of records to the current file."""
+
+    @abstractmethod
+    def _close_file(self):
+        """Finishes the current output file, if any."""
+
+    def _first_free_number(self) -> int:
+        pattern = re.compile(rf"{re.escape(self.prefix)}-.*-(\d+){re.escape(self.suffix)}")
+        numbers = [
+            int(match.group(1))
+            for path in self.directory.iterdir()
+            if (match := pattern.fullmatch(path.name))
+        ]
+        return max(numbers, default=-1) + 1
+
+    def _next_path(self) -> Path:
+        name = f"{self.prefix}-{self.run_id}-{self._next_number:05d}{self.suffix}"
+        self._next_number += 1
+        return self.directory / name
+
+    def _open_next(self):
+        # Another process may have taken a name since the directory was read.
+        while True:
+            path = self._next_path()
+            try:
+                self._open(path)
+            except FileExistsError:
+                continue
+            self.paths.append(path)
+            return
+
+    def _is_due(self) -> bool:
+        if len(self._buffer) >= self.batch_size:
+            return True
+        if self.batch_bytes is not None and self._buffered_bytes >= self.batch_bytes:
+            return True
+        return (
+            self.flush_interval is not None
+            and self.clock() - self._last_flush >= self.flush_interval
+        )
+
+    def write(self, article: ParsedArticle):
+        record = self._record(article)
+        self._buffer.append(record)
+        self._buffered_bytes += self._record_size(record)
+        if self._is_due():
+            self.flush()
+
+    def poll(self):
+        if self._buffer and self._is_due():
+            self.flush()
+
+    def flush(self):
+        records, self._buffer, self._buffered_bytes = self._buffer, [], 0
+        self._last_flush = self.clock()
+        while records:
+            if (
+                self.max_file_records is not None
+                and self._file_records >= self.max_file_records
+            ):
+                self._close_file()
+                self._file_records = 0
+            if self._file_records == 0:
+                self._open_next()
+
+            room = len(records)
+            if self.max_file_records is not None:
+                room = self.max_file_records - self._file_records
+            batch, records = records[:room], records[room:]
+            with get_metrics().timer("sink_flush_seconds", sink=type(self).__name__):
+                self._write_batch(batch)
+            self._file_records += len(batch)
+            get_metrics().increment(
+                "sink_articles_total", len(batch), sink=type(self).__name__
+            )
+
+    def close(self):
+        self.flush()
+        self._close_file()
+        self._file_records = 0
+
+
+class JsonlArticleSink(BatchingArticleSink):
+    """
+    Writes one JSON object per line, optionally gzip or zstd compressed.
+
+    Each batch goes to the file in a single write, so readers see whole lines. zstd needs
+    the optional zstandard package.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        compression: Optional[str] = "gzip",
+        compression_level: Optional[int] = None,
+        batch_bytes: Optional[int] = 1024 * 1024,
+        **kwargs,
+    ):
+        """
+        Args:
+            compression (Optional[str]): "gzip", "zstd" or None.
+            compression_level (Optional[int]): Defaults to 6 for gzip and 3 for zstd.
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression {compression!r}")
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as e:
+                raise ImportError(
+                    "zstd compression requires the zstandard package"
+                ) from e
+
+        self.compression = compression
+        self.compression_level = compression_level
+        self.suffix = ".jsonl" + COMPRESSION_SUFFIXES[compression]
+        self._raw: Optional[BinaryIO] = None
+        self._file: Optional[BinaryIO] = None
+        super().__init__(directory, batch_bytes=batch_bytes, **kwargs)
+
+    def _record(self, article: ParsedArticle) -> bytes:
+        return article.model_dump_json().encode("utf-8") + b"\n"
+
+    def _record_size(self, record: bytes) -> int:
+        return len(record)
+
+    def _open(self, path: Path):
+        if self.compression == "gzip":
+            level = 6 if self.compression_level is None else self.compression_level
+            self._file = gzip.open(path, "xb", compresslevel=level)
+        elif self.compression == "zstd":
+            import zstandard
+
+            level = 3 if self.compression_level is None else self.compression_level
+            self._raw = open(path, "xb")
+            self._file = zstandard.ZstdCompressor(level=level).stream_writer(self._raw)
+        else:
+            self._file = open(path, "xb")
+
+    def _write_batch(self, records: List[bytes]):
+        self._file.write(b"".join(records))
+        self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+
+class ParquetArticleSink(BatchingArticleSink):
+    """
+    Writes Parquet files with one row group per batch, for column-oriented bulk reads.
+
+    Needs the optional pyarrow package.
+    """
+
+    suffix = ".parquet"
+
+    def __init__(
+        self,
+        directory: Path | str,
+        compression: Optional[str] = "zstd",
+        batch_size: int = 5000,
+        **kwargs,
+    ):
+        """
+        Args:
+            compression (Optional[str]): Any codec pyarrow supports, or None.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("ParquetArticleSink requires the pyarrow package") from e
+
+        self._pyarrow = pyarrow
+        self._parquet = pyarrow.parquet
+        self.compression = compression
+        self.schema = pyarrow.schema(
+            [
+                ("title", pyarrow.string()),
+                ("url", pyarrow.string()),
+                ("authors", pyarrow.list_(pyarrow.string())),
+                ("body", pyarrow.string()),
+                ("provider", pyarrow.string()),
+                ("providers", pyarrow.list_(pyarrow.string())),
+                ("categories", pyarrow.list_(pyarrow.string())),
+                ("cluster_id", pyarrow.string()),
+            ]
+        )
+        # from_pylist silently drops keys missing from the schema.
+        missing = set(ParsedArticle.model_fields) - set(self.schema.names)
+        if missing:
+            raise ValueError(f"Parquet schema is missing ParsedArticle fields {sorted(missing)}")
+        self._raw: Optional[BinaryIO] = None
+        self._writer = None
+        super().__init__(directory, batch_size=batch_size, **kwargs)
+
+    def _record(self, article: ParsedArticle) -> Dict[str, Any]:
+        return article.model_dump()
+
+    def _open(self, path: Path):
+        self._raw = open(path, "xb")
+        self._writer = self._parquet.ParquetWriter(
+            self._raw, self.schema, compression=self.compression
+        )
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        self._writer.write_table(
+            self._pyarrow.Table.from_pylist(records, schema=self.schema)
+        )
+
+    def _close_file(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+
+class BackgroundSink(ArticleSinkInterface):
+    """
+    Hands articles to another sink on a dedicated thread, so serialisation, compression and
+    disk writes stay off the extraction path.
+
+    write blocks once max_queue articles are waiting, which bounds memory if the disk falls
+    behind. An error on the writer thread is raised from the next write, flush or close.
+    """
+
+    _CLOSE = object()
+    _FLUSH = object()
+
+    def __init__(
+        self,
+        sink: ArticleSinkInterface,
+        max_queue: int = 1000,
+        poll_interval: float = 1.0,
+    ):
+        if max_queue < 1:
+            raise ValueError("max_queue must be greater than 0")
+
+        self.sink = sink
+        self.poll_interval = poll_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name="article-sink", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                item = None
+
+            flushed: Optional[threading.Event] = None
+            if isinstance(item, tuple):
+                item, flushed = item
+            try:
+                if item is self._CLOSE:
+                    self.sink.close()
+                    return
+                if item is self._FLUSH:
+                    self.sink.flush()
+                elif item is None:
+                    self.sink.poll()
+                else:
+                    self.sink.write(item)
+            except BaseException as e:
+                logger.error("Article sink %s failed: %s", type(self.sink).__name__, e)
+                self._error = e
+                if item is self._CLOSE:
+                    return
+            finally:
+                if flushed is not None:
+                    flushed.set()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, article: ParsedArticle):
+        self._raise_error()
+        self._queue.put(article)
+
+    def flush(self):
+        """
+        Block until every article written so far has been flushed by the wrapped sink.
+        """
+        self._raise_error()
+        if not self._thread.is_alive():
+            return
+        flushed = threading.Event()
+        self._queue.put((self._FLUSH, flushed))
+        flushed.wait()
+        self._raise_error()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(self._CLOSE)
+            self._thread.join()
+        self._raise_error()
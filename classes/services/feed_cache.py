@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from pydantic import ValidationError
+
+from classes.models.cache_stats import CacheStats
+from classes.models.cached_feed import CachedFeed
+from classes.models.entries import Entries
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+
+class FeedCache:
+    """
+    Persistent store of each feed's ETag, Last-Modified and last parsed entries, used for conditional GETs.
+
+    The store is SQLite, so any number of processes, such as several feed workers, can share
+    one path without losing each other's updates.
+    """
+
+    def __init__(self, path: Path | str, busy_timeout: float = 30.0):
+        """
+        Args:
+            busy_timeout (float): Seconds to wait for another process's write lock.
+        """
+        self.path = path
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(path), timeout=busy_timeout, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                feed TEXT NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT feed FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return CachedFeed.model_validate_json(row[0])
+        except ValidationError as e:
+            logger.warning("Discarding unreadable cached feed %s: %s", url, e)
+            return None
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """
+        Conditional request headers for the cached copy of the given feed, if any.
+        """
+        cached_feed = self.get(url)
+        headers = {}
+        if cached_feed is not None:
+            if cached_feed.etag:
+                headers["If-None-Match"] = cached_feed.etag
+            if cached_feed.modified:
+                headers["If-Modified-Since"] = cached_feed.modified
+        return headers
+
+    def not_modified(self, url: str) -> Entries:
+        """
+        Record a 304 response for the given feed and return its cached entries.
+        """
+        cached_feed = self.get(url)
+        if cached_feed is None:
+            raise KeyError(f"No cached copy of feed {url}")
+        with self._lock:
+            self.stats.hits += 1
+        get_metrics().increment("feed_cache_hits_total")
+        logger.info("Feed %s not modified, serving cached entries", url)
+        return cached_feed.entries
+
+    def update(
+        self,
+        url: str,
+        entries: Entries,
+        etag: Optional[str] = None,
+        modified: Optional[str] = None,
+    ):
+        """
+        Record a successfully parsed full download of the given feed.
+
+        A response without validators can't be revalidated, so it isn't stored, but it
+        doesn't evict the cached copy either: a CDN may drop validators from one response.
+        """
+        get_metrics().increment("feed_cache_misses_total")
+        with self._lock:
+            self.stats.misses += 1
+            if not etag and not modified:
+                return
+            cached_feed = CachedFeed(etag=etag, modified=modified, entries=entries)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO feeds (url, feed) VALUES (?, ?)",
+                (url, cached_feed.model_dump_json()),
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,246 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Iterator, List, Optional, Set
+
+from pydantic import AnyUrl
+
+from classes.models.entries import CategoryByBaseUrl, Entries, EntriesByCategory
+from classes.models.parsed_article import ParsedArticle
+from classes.services.feed_parsers import AsyncFeedParserInterface
+from classes.services.orchestrator import Orchestrator
+from classes.utils.logger import logger
+from classes.utils.run_coroutine import run_coroutine
+from classes.utils.url_normaliser import normalise_url
+
+
+@dataclass
+class FeedSchedule:
+    base_url: AnyUrl
+    category: str
+    path: str
+    interval: float
+    next_due: float = 0.0
+    max_seen: int = 500
+    polls: int = 0
+    new_entries: int = 0
+    # Set by the first successful poll, whose entries are all new and say nothing about churn.
+    has_baseline: bool = False
+    _seen: Set[str] = field(default_factory=set, repr=False)
+    _seen_order: Deque[str] = field(default_factory=deque, repr=False)
+
+    def take_new(self, entries: Entries) -> Entries:
+        """
+        Return the entries not seen on previous polls and remember them.
+        """
+        new_entries = []
+        for entry in entries.entries:
+            if entry is None:
+                continue
+            key = normalise_url(entry.link)
+            if key in self._seen:
+                continue
+            new_entries.append(entry)
+            self._seen.add(key)
+            self._seen_order.append(key)
+            if len(self._seen_order) > self.max_seen:
+                self._seen.discard(self._seen_order.popleft())
+        return Entries.model_construct(entries=new_entries, ttl=entries.ttl)
+
+
+class FeedScheduler:
+    """
+    Keeps an Orchestrator warm and polls each category feed on its own adaptive interval.
+
+    A feed that produced new entries is polled sooner, a quiet feed is backed off. The first
+    successful poll of a feed only records what it already holds and keeps its interval. The
+    interval never drops below the feed's own ttl / Cache-Control hint and is bounded by
+    min_interval and max_interval, with jitter so feeds don't synchronise. Only entries not
+    seen on earlier polls are passed to extraction.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Orchestrator,
+        min_interval: float = 60.0,
+        max_interval: float = 3600.0,
+        initial_interval: float = 300.0,
+        backoff: float = 1.5,
+        jitter: float = 0.1,
+        limit: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < min_interval <= initial_interval <= max_interval:
+            raise ValueError(
+                "Intervals must satisfy 0 < min_interval <= initial_interval <= max_interval"
+            )
+        if backoff <= 1:
+            raise ValueError("backoff must be greater than 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.orchestrator = orchestrator
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.limit = limit
+        self.clock = clock
+        self._stopped = threading.Event()
+        self.schedules: List[FeedSchedule] = [
+            FeedSchedule(
+                base_url=news_provider.base_url,
+                category=category.name,
+                path=category.value,
+                interval=initial_interval,
+            )
+            for news_provider in orchestrator.news_providers.providers
+            for category in news_provider.categories
+        ]
+
+    def _next_interval(
+        self,
+        schedule: FeedSchedule,
+        entries: Optional[Entries],
+        new_count: int,
+        baseline: bool = False,
+    ) -> float:
+        if entries is None:
+            interval = schedule.interval * self.backoff**2
+        elif baseline:
+            interval = schedule.interval
+        elif new_count:
+            churn = new_count / max(len(entries.entries), 1)
+            interval = schedule.interval * max(1 - churn, 1 / self.backoff**2)
+        else:
+            interval = schedule.interval * self.backoff
+
+        if entries is not None and entries.ttl:
+            interval = max(interval, entries.ttl)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _reschedule(
+        self,
+        schedule: FeedSchedule,
+        entries: Optional[Entries],
+        new_count: int,
+        now: float,
+        baseline: bool = False,
+    ):
+        schedule.interval = self._next_interval(schedule, entries, new_count, baseline)
+        spread = schedule.interval * self.jitter
+        schedule.next_due = now + schedule.interval + random.uniform(-spread, spread)
+
+    def _fetch(self, schedules: List[FeedSchedule]) -> List[Optional[Entries]]:
+        feed_service = self.orchestrator.feed_service
+        if isinstance(feed_service.parser, AsyncFeedParserInterface):
+
+            async def fetch_all():
+                return await asyncio.gather(
+                    *(
+                        feed_service.aparse_feed(
+                            base_url=schedule.base_url, path=schedule.path, limit=self.limit
+                        )
+                        for schedule in schedules
+                    ),
+                    return_exceptions=True,
+                )
+
+            results = run_coroutine(fetch_all())
+        else:
+            results = []
+            for schedule in schedules:
+                try:
+                    results.append(
+                        feed_service.parse_feed(
+                            base_url=schedule.base_url, path=schedule.path, limit=self.limit
+                        )
+                    )
+                except Exception as e:
+                    results.append(e)
+
+        entries_by_schedule = []
+        for schedule, result in zip(schedules, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error polling %s feed at %s: %s", schedule.category, schedule.base_url, result
+                )
+                result = None
+            entries_by_schedule.append(result)
+        return entries_by_schedule
+
+    def due(self, now: Optional[float] = None) -> List[FeedSchedule]:
+        now = self.clock() if now is None else now
+        return [schedule for schedule in self.schedules if schedule.next_due <= now]
+
+    def poll(self, now: Optional[float] = None) -> Iterator[ParsedArticle]:
+        """
+        Poll every due feed once and stream the articles extracted from newly seen entries.
+        """
+        now = self.clock() if now is None else now
+        due = self.due(now)
+        if not due:
+            return
+
+        new_by_provider = {}
+        for schedule, entries in zip(due, self._fetch(due)):
+            new_entries = schedule.take_new(entries) if entries is not None else None
+            new_count = len(new_entries.entries) if new_entries is not None else 0
+            baseline = entries is not None and not schedule.has_baseline
+            schedule.has_baseline = schedule.has_baseline or entries is not None
+            schedule.polls += 1
+            schedule.new_entries += new_count
+            self._reschedule(schedule, entries, new_count, now, baseline)
+            logger.info(
+                "Polled %s feed at %s: %s new entries, next poll in %.0fs",
+                schedule.category,
+                schedule.base_url,
+                new_count,
+                schedule.interval,
+            )
+            if new_count:
+                new_by_provider.setdefault(schedule.base_url, {})[schedule.category] = (
+                    new_entries
+                )
+
+        if new_by_provider:
+            yield from self.orchestrator.iter_entries(
+                CategoryByBaseUrl.model_construct(
+                    provider={
+                        base_url: EntriesByCategory.model_construct(category=categories)
+                        for base_url, categories in new_by_provider.items()
+                    }
+                )
+            )
+
+    def seconds_until_due(self) -> float:
+        next_due = min(schedule.next_due for schedule in self.schedules)
+        return max(next_due - self.clock(), 0.0)
+
+    def run(
+        self,
+        on_article: Callable[[ParsedArticle], None],
+        max_polls: Optional[int] = None,
+    ):
+        """
+        Poll feeds until stop() is called, or until max_polls polling rounds have run.
+        """
+        if not self.schedules:
+            logger.warning("No feeds to schedule")
+            return
+
+        self._stopped.clear()
+        polls = 0
+        while not self._stopped.is_set():
+            for parsed_article in self.poll():
+                on_article(parsed_article)
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            self._stopped.wait(self.seconds_until_due())
+
+    def stop(self):
+        self._stopped.set()
@@ -1,10 +1,15 @@
+import asyncio
 from enum import Enum
 from typing import List, Optional, Type
 
+import requests
 from pydantic import AnyUrl
 from classes.utils.logger import logger
-from classes.services.feed_parsers import FeedParserInterface
-from classes.models.entries import Entries, EntriesByCategory
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import host_of
+from classes.services.feed_parsers import AsyncFeedParserInterface, FeedParserInterface
+from classes.services.news_providers import NewsProviders
+from classes.models.entries import CategoryByBaseUrl, Entries, EntriesByCategory
 from classes.models.news_provider import NewsProvider
 
 
@@ -27,11 +32,60 @@ class FeedService:
 
         url = self.build_url(base_url=base_url, path=path)
         logger.info("Fetching feed from %s", url)
-        return self.parser.parse(url=url, limit=limit)
+        with get_metrics().timer("feed_fetch_seconds", host=host_of(url)):
+            return self.parser.parse(url=url, limit=limit)
+
+    async def aparse_feed(
+        self,
+        base_url: str,
+        path: str,
+        limit: Optional[int] = None,
+    ) -> Entries:
+        """
+        Asynchronous variant of parse_feed. Parsers without native async support run in a worker thread.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("Limit must be greater than 0")
+
+        url = self.build_url(base_url=base_url, path=path)
+        logger.info("Fetching feed from %s", url)
+        with get_metrics().timer("feed_fetch_seconds", host=host_of(url)):
+            if isinstance(self.parser, AsyncFeedParserInterface):
+                return await self.parser.aparse(url=url, limit=limit)
+            return await asyncio.to_thread(self.parser.parse, url=url, limit=limit)
 
     def build_url(self, base_url: AnyUrl, path: str) -> str:
         return f"{base_url}{path}"
 
+    @staticmethod
+    def _skip_feed(news_provider: NewsProvider, category: Enum, error: Exception) -> Entries:
+        get_metrics().increment("feeds_skipped_total", host=host_of(str(news_provider.base_url)))
+        logger.warning(
+            "Skipping %s feed of %s: %s", category.name, news_provider.base_url, error
+        )
+        return Entries(entries=[])
+
+    def _parse_category(
+        self, news_provider: NewsProvider, category: Enum, limit: Optional[int]
+    ) -> Entries:
+        # A feed that can't be fetched is skipped, so one sick host doesn't fail the run.
+        try:
+            return self.parse_feed(
+                base_url=news_provider.base_url, path=category.value, limit=limit
+            )
+        except requests.RequestException as e:
+            return self._skip_feed(news_provider, category, e)
+
+    async def _aparse_category(
+        self, news_provider: NewsProvider, category: Enum, limit: Optional[int]
+    ) -> Entries:
+        try:
+            return await self.aparse_feed(
+                base_url=news_provider.base_url, path=category.value, limit=limit
+            )
+        except requests.RequestException as e:
+            return self._skip_feed(news_provider, category, e)
+
     def parse_all_categories(
         self, news_provider: NewsProvider, limit: Optional[int] = None
     ) -> List[Entries]:
@@ -39,11 +93,54 @@ class FeedService:
         Parse feeds from all categories and return a dictionary of entries by category name.
         """
 
-        return EntriesByCategory(
+        # The Entries are already validated, so the tree is assembled without re-validating them.
+        return EntriesByCategory.model_construct(
             category={
-                category.name: self.parse_feed(
-                    base_url=news_provider.base_url, path=category.value, limit=limit
-                )
+                category.name: self._parse_category(news_provider, category, limit)
                 for category in news_provider.categories
             }
         )
+
+    async def aparse_all_categories(
+        self, news_provider: NewsProvider, limit: Optional[int] = None
+    ) -> EntriesByCategory:
+        """
+        Fetch the feeds of all categories concurrently and return the entries by category name.
+        """
+        categories = list(news_provider.categories)
+        results = await asyncio.gather(
+            *(
+                self._aparse_category(news_provider, category, limit)
+                for category in categories
+            ),
+            return_exceptions=True,
+        )
+        entries_by_category = {}
+        for category, result in zip(categories, results):
+            # Any feed that fails is skipped, so one bad feed doesn't fail the whole fetch.
+            if isinstance(result, Exception):
+                result = self._skip_feed(news_provider, category, result)
+            elif isinstance(result, BaseException):
+                raise result
+            entries_by_category[category.name] = result
+        return EntriesByCategory.model_construct(category=entries_by_category)
+
+    async def aparse_all_providers(
+        self, news_providers: NewsProviders, limit: Optional[int] = None
+    ) -> CategoryByBaseUrl:
+        """
+        Fetch the feeds of every category of every provider at once.
+        """
+        providers = news_providers.providers
+        results = await asyncio.gather(
+            *(
+                self.aparse_all_categories(news_provider=news_provider, limit=limit)
+                for news_provider in providers
+            )
+        )
+        return CategoryByBaseUrl.model_construct(
+            provider={
+                news_provider.base_url: entries_by_category
+                for news_provider, entries_by_category in zip(providers, results)
+            }
+        )
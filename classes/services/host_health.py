@@ -0,0 +1,251 @@
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+from classes.models.host_state import HostState
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Statuses that ask the client to slow down.
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class HostUnavailable(requests.ConnectionError):
+    """
+    Raised before any request is made, when a host's circuit is open or it has asked for a
+    longer pause than the caller is willing to wait.
+    """
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait according to a Retry-After header, given as seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+@dataclass
+class _HostHealth:
+    rate: float
+    tokens: float
+    updated: float
+    cooldown: float
+    circuit: str = CLOSED
+    failures: int = 0
+    open_until: float = 0.0
+    paused_until: float = 0.0
+    probing: bool = False
+
+
+class HostHealth:
+    """
+    Per-host rate limiting and circuit breaking, shared by every request of an HttpTransport.
+
+    Each host gets a token bucket. Its rate is halved whenever the host answers 429 or 503,
+    and no request is sent until any Retry-After has passed. Every other successful response
+    raises the rate again, back up to the configured rate, so a healthy host keeps its full
+    throughput.
+
+    After failure_threshold consecutive failures (connection errors, timeouts and 5xx) the
+    host's circuit opens and requests fail fast with HostUnavailable. Once the cooldown has
+    passed a single probe request is let through: success closes the circuit, failure opens
+    it again for twice as long, up to max_cooldown.
+    """
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        burst: Optional[float] = None,
+        min_rate: float = 0.5,
+        decrease: float = 0.5,
+        increase: float = 0.5,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+        max_wait: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate (float): Requests per second allowed to a host that isn't throttling us.
+            burst (Optional[float]): Requests that may be sent at once. Defaults to rate.
+            decrease (float): Factor applied to the rate on every 429 or 503.
+            increase (float): Requests per second added back on every other success.
+            max_wait (float): Longest a request waits for its host. A host that asks for a
+                longer pause is failed fast with HostUnavailable instead.
+        """
+        if not 0 < min_rate <= rate:
+            raise ValueError("Rates must satisfy 0 < min_rate <= rate")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst or rate
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._hosts: Dict[str, _HostHealth] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str, now: float) -> _HostHealth:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostHealth(
+                rate=self.rate, tokens=self.burst, updated=now, cooldown=self.cooldown
+            )
+            self._hosts[host] = state
+        return state
+
+    def _transition(self, host: str, state: _HostHealth, circuit: str):
+        state.circuit = circuit
+        get_metrics().increment("host_circuit_transitions_total", host=host, state=circuit)
+        if circuit == OPEN:
+            logger.warning(
+                "Circuit for %s opened after %s failures, retrying in %.0fs",
+                host,
+                state.failures,
+                state.cooldown,
+            )
+        else:
+            logger.info("Circuit for %s is %s", host, circuit)
+
+    def _reject(self, host: str, reason: str, message: str):
+        get_metrics().increment("host_requests_rejected_total", host=host, reason=reason)
+        raise HostUnavailable(message)
+
+    def acquire(self, host: str):
+        """
+        Block until a request to the host is allowed.
+
+        Raises:
+            HostUnavailable: If the host's circuit is open, or it can't be reached within
+                max_wait seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                state = self._host(host, now)
+
+                if state.circuit == OPEN and now >= state.open_until:
+                    self._transition(host, state, HALF_OPEN)
+                if state.circuit == OPEN:
+                    self._reject(
+                        host,
+                        "circuit_open",
+                        f"Circuit for {host} is open for another {state.open_until - now:.1f}s",
+                    )
+                if state.circuit == HALF_OPEN and state.probing:
+                    self._reject(host, "circuit_open", f"Circuit for {host} is being probed")
+
+                state.tokens = min(
+                    self.burst, state.tokens + (now - state.updated) * state.rate
+                )
+                state.updated = now
+                wait = state.paused_until - now
+                if wait <= 0 and state.tokens >= 1:
+                    state.tokens -= 1
+                    state.probing = state.circuit == HALF_OPEN
+                    break
+                wait = max(wait, (1 - state.tokens) / state.rate)
+                if wait > self.max_wait:
+                    self._reject(
+                        host, "rate_limited", f"{host} is rate limited for {wait:.1f}s"
+                    )
+            waited += wait
+            self.sleep(wait)
+
+        if waited:
+            get_metrics().observe("host_wait_seconds", waited, host=host)
+
+    def record(self, host: str, status: Optional[int], retry_after: Optional[float] = None):
+        """
+        Record the outcome of a request to the host.
+
+        Args:
+            status (Optional[int]): Response status, or None if no response was received.
+            retry_after (Optional[float]): Seconds the host asked us to wait.
+        """
+        with self._lock:
+            now = self.clock()
+            state = self._host(host, now)
+            state.probing = False
+
+            if status in THROTTLE_STATUSES:
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                state.tokens = min(state.tokens, 0.0)
+                if retry_after:
+                    state.paused_until = max(state.paused_until, now + retry_after)
+                get_metrics().increment("host_throttled_total", host=host)
+                logger.warning(
+                    "%s answered %s, slowing to %.2f requests/s", host, status, state.rate
+                )
+            elif status is not None and status < 500:
+                state.rate = min(self.rate, state.rate + self.increase)
+
+            if status is None or status >= 500:
+                state.failures += 1
+                if state.circuit == HALF_OPEN:
+                    state.cooldown = min(state.cooldown * 2, self.max_cooldown)
+                elif state.circuit == CLOSED and state.failures >= self.failure_threshold:
+                    state.cooldown = self.cooldown
+                else:
+                    return
+                state.open_until = now + state.cooldown
+                self._transition(host, state, OPEN)
+                return
+
+            state.failures = 0
+            if state.circuit != CLOSED:
+                state.cooldown = self.cooldown
+                self._transition(host, state, CLOSED)
+
+    def state(self, host: str) -> HostState:
+        with self._lock:
+            now = self.clock()
+            state = self._host(host, now)
+            circuit = state.circuit
+            if circuit == OPEN and now >= state.open_until:
+                circuit = HALF_OPEN
+            available_at = state.open_until if circuit == OPEN else state.paused_until
+            return HostState(
+                host=host,
+                circuit=circuit,
+                consecutive_failures=state.failures,
+                rate=state.rate,
+                available_in=max(0.0, available_at - now),
+            )
+
+    def states(self) -> Dict[str, HostState]:
+        """
+        The health of every host seen so far, for monitoring.
+        """
+        with self._lock:
+            hosts = list(self._hosts)
+        return {host: self.state(host) for host in hosts}
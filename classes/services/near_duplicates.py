@@ -0,0 +1,264 @@
+import hashlib
+import sqlite3
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from classes.models.parsed_article import ParsedArticle
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.tokeniser import tokenise
+from classes.utils.url_normaliser import normalise_url
+
+FINGERPRINT_BITS = 64
+BIT_POSITIONS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+# Odd 64-bit constants from splitmix64, used to mix token hashes into shingle hashes.
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+# Tokens are hashed from their first TOKEN_WIDTH characters as UTF-32 code units.
+TOKEN_WIDTH = 16
+WORD_WEIGHTS = GOLDEN ** np.arange(1, TOKEN_WIDTH // 2 + 1, dtype=np.uint64)
+
+
+def mix(values: np.ndarray) -> np.ndarray:
+    values = values ^ (values >> np.uint64(30))
+    values = values * MIX_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+def token_hashes(tokens: List[str]) -> np.ndarray:
+    """
+    64-bit hashes of all tokens at once, from a fixed-width array of their characters.
+    """
+    words = np.array(tokens, dtype=f"<U{TOKEN_WIDTH}").view(np.uint64)
+    words = words.reshape(len(tokens), TOKEN_WIDTH // 2)
+    return mix((words * WORD_WEIGHTS).sum(axis=1, dtype=np.uint64))
+
+
+def shingle_hashes(tokens: List[str], shingle_size: int = 3) -> np.ndarray:
+    """
+    A 64-bit hash for every run of shingle_size consecutive tokens, computed column-wise.
+    """
+    hashes = token_hashes(tokens)
+    count = len(tokens) - shingle_size + 1
+    if count < 1:
+        return mix(hashes)
+
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(shingle_size):
+        shingles = mix(shingles * GOLDEN + hashes[offset : offset + count])
+    return shingles
+
+
+def simhash(hashes: np.ndarray) -> int:
+    """
+    Charikar's SimHash: each bit is set when most of the shingle hashes have it set.
+    """
+    if not len(hashes):
+        return 0
+    bit_counts = ((hashes[:, None] >> BIT_POSITIONS) & np.uint64(1)).sum(axis=0)
+    bits = (bit_counts * 2 > len(hashes)).astype(np.uint8)
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def fingerprint(text: str, shingle_size: int = 3) -> int:
+    return simhash(shingle_hashes(tokenise(text), shingle_size))
+
+
+class NearDuplicateDetector:
+    """
+    Clusters articles whose bodies are near-identical, such as syndicated copies or
+    updated stories under a new URL.
+
+    Each body gets a 64-bit SimHash over word shingles. Two articles are near-duplicates
+    when their fingerprints differ in at most max_distance bits. Candidates are found with
+    an LSH index that splits fingerprints into max_distance + 1 bands: by the pigeonhole
+    principle any match agrees exactly on at least one band, so only articles sharing a
+    band bucket are compared.
+
+    Only the most recent max_fingerprints fingerprints are kept, which bounds memory
+    however long the service runs. Assigning an article whose URL is still remembered gives
+    the same answer as the first time, so retrying an article never makes it a
+    near-duplicate of itself.
+
+    With a path, the remembered fingerprints are also kept in SQLite and loaded again on
+    start, so a copy syndicated after the original's run still joins its cluster.
+    """
+
+    def __init__(
+        self,
+        max_distance: int = 6,
+        shingle_size: int = 3,
+        min_tokens: int = 25,
+        max_fingerprints: int = 100_000,
+        drop_duplicates: bool = False,
+        path: Optional[Path | str] = None,
+    ):
+        """
+        Args:
+            max_distance (int): Largest Hamming distance between near-duplicate fingerprints.
+                Unrelated bodies differ in about 32 bits, while a sentence added to a
+                few hundred words usually flips 2 to 4.
+            min_tokens (int): Bodies with fewer tokens are too short to fingerprint reliably
+                and always start their own cluster.
+            drop_duplicates (bool): Whether the Orchestrator should drop near-duplicates
+                instead of only tagging them.
+            path (Optional[Path | str]): SQLite database to persist fingerprints in between
+                runs. They are only kept in memory if omitted.
+        """
+        if not 0 <= max_distance < FINGERPRINT_BITS // 2:
+            raise ValueError("max_distance must be between 0 and 31")
+        if max_fingerprints < 1:
+            raise ValueError("max_fingerprints must be greater than 0")
+
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self.max_fingerprints = max_fingerprints
+        self.drop_duplicates = drop_duplicates
+
+        band_count = max_distance + 1
+        widths = [FINGERPRINT_BITS // band_count] * band_count
+        for index in range(FINGERPRINT_BITS % band_count):
+            widths[index] += 1
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for width in widths:
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+
+        self._buckets: List[Dict[int, List[Tuple[int, str]]]] = [
+            {} for _ in self._bands
+        ]
+        self._recent: Deque[Tuple[int, str, str]] = deque()
+        # The cluster each remembered URL was assigned, and whether it was a duplicate.
+        self._urls: Dict[str, Tuple[str, bool]] = {}
+        self._lock = threading.Lock()
+
+        self._connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: Path | str):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                fingerprint TEXT NOT NULL,
+                cluster_id TEXT NOT NULL,
+                duplicate INTEGER NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+        # The bands are rebuilt from the stored fingerprints, oldest first.
+        rows = self._connection.execute(
+            "SELECT url, fingerprint, cluster_id, duplicate FROM ("
+            "SELECT * FROM fingerprints ORDER BY seq DESC LIMIT ?) ORDER BY seq",
+            (self.max_fingerprints,),
+        ).fetchall()
+        for url, value, cluster_id, duplicate in rows:
+            self._remember(int(value, 16), cluster_id, url, bool(duplicate), store=False)
+        self._connection.execute(
+            "DELETE FROM fingerprints WHERE seq NOT IN ("
+            "SELECT seq FROM fingerprints ORDER BY seq DESC LIMIT ?)",
+            (self.max_fingerprints,),
+        )
+        self._connection.commit()
+
+    def _band_keys(self, value: int) -> List[int]:
+        return [(value >> shift) & mask for shift, mask in self._bands]
+
+    def _nearest(self, value: int) -> Optional[Tuple[int, str]]:
+        best = None
+        for bucket, key in zip(self._buckets, self._band_keys(value)):
+            for candidate, cluster_id in bucket.get(key, ()):
+                distance = (candidate ^ value).bit_count()
+                if distance > self.max_distance:
+                    continue
+                if best is None or distance < best[0]:
+                    best = (distance, cluster_id)
+        return best
+
+    def _remember(
+        self, value: int, cluster_id: str, url: str, duplicate: bool, store: bool = True
+    ):
+        entry = (value, cluster_id)
+        for bucket, key in zip(self._buckets, self._band_keys(value)):
+            bucket.setdefault(key, []).append(entry)
+        self._recent.append((value, cluster_id, url))
+        self._urls[url] = (cluster_id, duplicate)
+        if store and self._connection is not None:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, fingerprint, cluster_id, duplicate) "
+                "VALUES (?, ?, ?, ?)",
+                (url, f"{value:016x}", cluster_id, int(duplicate)),
+            )
+
+        if len(self._recent) > self.max_fingerprints:
+            value, cluster_id, url = self._recent.popleft()
+            expired = (value, cluster_id)
+            for bucket, key in zip(self._buckets, self._band_keys(value)):
+                entries = bucket[key]
+                entries.remove(expired)
+                if not entries:
+                    del bucket[key]
+            del self._urls[url]
+            if store and self._connection is not None:
+                self._connection.execute("DELETE FROM fingerprints WHERE url = ?", (url,))
+
+        if store and self._connection is not None:
+            self._connection.commit()
+
+    def assign(self, article: ParsedArticle) -> bool:
+        """
+        Set the article's cluster_id and return whether it's a near-duplicate of an
+        earlier article.
+        """
+        tokens = tokenise(article.body or "")
+        value = simhash(shingle_hashes(tokens, self.shingle_size))
+        with self._lock:
+            if len(tokens) < self.min_tokens:
+                article.cluster_id = hashlib.blake2b(
+                    article.url.encode("utf-8"), digest_size=8
+                ).hexdigest()
+                return False
+
+            url = normalise_url(article.url)
+            if url in self._urls:
+                article.cluster_id, duplicate = self._urls[url]
+                return duplicate
+
+            nearest = self._nearest(value)
+            duplicate = nearest is not None
+            article.cluster_id = nearest[1] if duplicate else f"{value:016x}"
+            # Duplicates are remembered too, so a story that keeps being updated stays in
+            # one cluster even once it has drifted from the first version.
+            self._remember(value, article.cluster_id, url, duplicate)
+
+        if duplicate:
+            get_metrics().increment("near_duplicates_total")
+            logger.info(
+                "%s is a near-duplicate in cluster %s", article.url, article.cluster_id
+            )
+        return duplicate
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
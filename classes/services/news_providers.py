@@ -36,3 +36,12 @@ class NewsProviders:
         A property that returns a list of all registered NewsProvider instances.
         """
         return list(self.news_providers.values())
+
+    def names_by_base_url(self) -> Dict[str, str]:
+        """
+        The key each provider is registered under, by the base URL articles are tagged with.
+        """
+        return {
+            str(news_provider.base_url): key
+            for key, news_provider in self.news_providers.items()
+        }
@@ -1,14 +1,42 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List, Type
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
+from classes.models.article_job import ArticleJob
 from classes.models.entries import CategoryByBaseUrl
+from classes.models.news_provider import NewsProvider
 from classes.models.parsed_article import ParsedArticle
-from classes.services.article_parsers import NewspaperArticleParser
+from classes.models.run_report import RunReport
+from classes.services.article_deduplicator import ArticleDeduplicator
+from classes.services.article_parsers import NewsArticleParserInterface
+from classes.services.article_sinks import ArticleSinkInterface
 
-from classes.services.feed_parsers import FeedParser
+from classes.services.feed_parsers import AsyncFeedParserInterface, FeedParser
 from classes.services.feed_service import FeedService
 from classes.services.news_providers import NewsProviders
+from classes.services.seen_entry_store import SeenEntryStore
+from classes.utils.host_limiter import HostLimiter
 from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.run_coroutine import run_coroutine
+from classes.utils.url_normaliser import host_of
+
+if TYPE_CHECKING:
+    # numpy is only worth importing when near-duplicate detection is used.
+    from classes.services.near_duplicates import NearDuplicateDetector
 
 
 class OrchestratorInterface(ABC):
@@ -21,17 +49,47 @@ class Orchestrator:
 
     def __init__(
         self,
-        article_parser: NewspaperArticleParser,
+        article_parser: NewsArticleParserInterface,
         feed_service: FeedService,
         news_providers: NewsProviders,
+        max_workers: int = 1,
+        max_per_host: Optional[int] = None,
+        seen_store: Optional[SeenEntryStore] = None,
+        near_duplicates: Optional["NearDuplicateDetector"] = None,
+        clock: Callable[[], float] = time.monotonic,
     ):
+        """
+        Args:
+            max_workers (int): Number of articles extracted concurrently. 1 keeps extraction sequential.
+            max_per_host (Optional[int]): Maximum number of concurrent extractions against a single host.
+            seen_store (Optional[SeenEntryStore]): When set, articles delivered on earlier runs are
+                skipped. An article is only recorded once its consumer has taken it, or once
+                it has been dropped as a near-duplicate.
+            near_duplicates (Optional[NearDuplicateDetector]): When set, every article is tagged
+                with a cluster_id, and near-duplicates are dropped if the detector says so.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+
         self.article_parser = article_parser
         self.news_providers = news_providers
         self.feed_service = feed_service
+        self.max_workers = max_workers
+        self.host_limiter = HostLimiter(max_per_host=max_per_host)
+        self.deduplicator = ArticleDeduplicator()
+        self.seen_store = seen_store
+        self.skipped_articles = 0
+        self.near_duplicates = near_duplicates
+        self.dropped_near_duplicates = 0
+        self.clock = clock
+        self.report = RunReport()
         self.providers_by_categories: CategoryByBaseUrl | None = None
         self.parsed_articles: List[ParsedArticle] | None = None
 
     def _fetch_categories_by_provider(self) -> CategoryByBaseUrl:
+        if isinstance(self.feed_service.parser, AsyncFeedParserInterface):
+            return run_coroutine(self._afetch_categories_by_provider())
+
         categories_by_provider = {}
         for news_provider in self.news_providers.providers:
 
@@ -39,32 +97,366 @@ class Orchestrator:
                 self.feed_service.parse_all_categories(news_provider=news_provider)
             )
 
-        return CategoryByBaseUrl(provider=categories_by_provider)
+        return CategoryByBaseUrl.model_construct(provider=categories_by_provider)
+
+    async def _afetch_categories_by_provider(self) -> CategoryByBaseUrl:
+        return await self.feed_service.aparse_all_providers(
+            news_providers=self.news_providers
+        )
+
+    def _unseen(self, jobs: List[ArticleJob]) -> List[ArticleJob]:
+        if self.seen_store is None:
+            self.skipped_articles = 0
+            return jobs
+        unseen_jobs = self.seen_store.unseen(jobs)
+        self.skipped_articles = len(jobs) - len(unseen_jobs)
+        return unseen_jobs
+
+    def _priority(self, base_url: str, category: str) -> float:
+        providers: Dict[str, NewsProvider] = {
+            str(news_provider.base_url): news_provider
+            for news_provider in self.news_providers.providers
+        }
+        news_provider = providers.get(base_url)
+        if news_provider is None:
+            return 1.0
+        return news_provider.category_priority(category)
+
+    def _deduplicate(
+        self, providers_by_categories: CategoryByBaseUrl, limit: Optional[int] = None
+    ) -> List[ArticleJob]:
+        return self.deduplicator.deduplicate(
+            providers_by_categories, limit=limit, priority=self._priority
+        )
+
+    def _article_jobs(self, limit) -> List[ArticleJob]:
+        return self._unseen(self._deduplicate(self.providers_by_categories, limit=limit))
+
+    def parse_article(self, job: ArticleJob) -> Optional[ParsedArticle]:
+        """
+        Extract one job's article, tagged with its provider and categories, or return None if
+        extraction failed.
+        """
+        metrics = get_metrics()
+        host = host_of(job.link)
+        try:
+            with self.host_limiter.limit(job.link):
+                with metrics.timer("article_seconds", host=host):
+                    parsed_article = self.article_parser.article_parse(job.link)
+        except Exception as e:
+            metrics.increment("articles_total", host=host, status="error")
+            logger.error("Error parsing article %s: %s", job.link, e)
+            return None
+
+        metrics.increment("articles_total", host=host, status="ok")
+        parsed_article.provider = job.provider
+        parsed_article.providers = list(job.providers)
+        parsed_article.categories = list(job.categories)
+        return parsed_article
+
+    def mark_delivered(self, job: ArticleJob):
+        """
+        Record that the job's article reached its consumer, so later runs skip it.
+        """
+        if self.seen_store is not None:
+            for provider in job.providers:
+                self.seen_store.mark_seen(provider, job.url)
+
+    def keep(self, parsed_article: ParsedArticle) -> bool:
+        """
+        Assign the article's near-duplicate cluster and return whether it should be kept.
+        """
+        if self.near_duplicates is None:
+            return True
+        if self.near_duplicates.assign(parsed_article) and self.near_duplicates.drop_duplicates:
+            self.dropped_near_duplicates += 1
+            return False
+        return True
+
+    def _window_size(self, max_in_flight: Optional[int]) -> int:
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be greater than 0")
+        return max_in_flight or self.max_workers * 2
+
+    def _finished(self, job: ArticleJob, parsed_article: Optional[ParsedArticle]) -> bool:
+        """
+        Count a finished extraction and return whether its article should be yielded.
+        """
+        if parsed_article is None:
+            self.report.failed += 1
+            return False
+        if not self.keep(parsed_article):
+            # A dropped near-duplicate is settled, so later runs don't extract it again.
+            self.mark_delivered(job)
+            return False
+        self.report.completed += 1
+        return True
+
+    def _wait_timeout(
+        self,
+        in_flight: Dict[Future, Tuple[ArticleJob, List[float]]],
+        deadline: Optional[float],
+        article_timeout: Optional[float],
+    ) -> Optional[float]:
+        now = self.clock()
+        limits = []
+        if deadline is not None:
+            limits.append(deadline)
+        if article_timeout is not None:
+            starts = [started[0] for _, started in in_flight.values() if started]
+            if starts:
+                limits.append(min(starts) + article_timeout)
+            if len(starts) < len(in_flight):
+                # Queued jobs start whenever a thread frees up, so look again soon to
+                # start timing them.
+                limits.append(now + article_timeout / 10)
+        if not limits:
+            return None
+        return max(0.0, min(limits) - now)
+
+    def _iter_parsed_articles(
+        self,
+        jobs: Iterable[ArticleJob],
+        max_in_flight: Optional[int] = None,
+        deadline: Optional[float] = None,
+        article_timeout: Optional[float] = None,
+    ) -> Iterator[ParsedArticle]:
+        """
+        Yield articles in completion order, never holding more than max_in_flight jobs at once.
+
+        Once the clock passes deadline no more jobs are started, and articles still being
+        extracted, or taking longer than article_timeout, are abandoned and reported as
+        skipped in self.report. An article's time starts when a worker picks it up, not
+        while it waits in the executor's queue.
+        """
+        window = self._window_size(max_in_flight)
+        self.dropped_near_duplicates = 0
+
+        if self.max_workers == 1 and deadline is None and article_timeout is None:
+            for job in jobs:
+                parsed_article = self.parse_article(job)
+                if self._finished(job, parsed_article):
+                    yield parsed_article
+                    self.mark_delivered(job)
+            return
+
+        jobs = iter(jobs)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Each job's start time, stamped by the worker once it picks the job up.
+        in_flight: Dict[Future, Tuple[ArticleJob, List[float]]] = {}
+        abandoned = False
+
+        def submit(job: ArticleJob):
+            started: List[float] = []
+
+            def run() -> Optional[ParsedArticle]:
+                started.append(self.clock())
+                return self.parse_article(job)
+
+            in_flight[executor.submit(run)] = (job, started)
+
+        try:
+            while True:
+                now = self.clock()
+                if deadline is not None and now >= deadline:
+                    self.report.budget_exhausted = True
+                    for job, _ in in_flight.values():
+                        self.report.skip(job, "budget")
+                    for job in jobs:
+                        self.report.skip(job, "budget")
+                    abandoned = bool(in_flight)
+                    break
+                if article_timeout is not None:
+                    for future, (job, started) in list(in_flight.items()):
+                        if started and now - started[0] >= article_timeout:
+                            # The thread can't be interrupted, but its result is ignored.
+                            del in_flight[future]
+                            future.cancel()
+                            self.report.skip(job, "deadline")
+                            abandoned = True
+                # The deadline is checked first, so nothing is started once it has passed,
+                # and the window is only topped up once results have been consumed.
+                for job in islice(jobs, window - len(in_flight)):
+                    submit(job)
+                if not in_flight:
+                    break
+
+                done, _ = wait(
+                    in_flight,
+                    timeout=self._wait_timeout(in_flight, deadline, article_timeout),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    job, _ = in_flight.pop(future)
+                    parsed_article = future.result()
+                    if self._finished(job, parsed_article):
+                        yield parsed_article
+                        self.mark_delivered(job)
+        finally:
+            # Don't wait for abandoned extractions, they finish in the background.
+            executor.shutdown(wait=not abandoned, cancel_futures=True)
 
     def _parse_articles(self, limit):
-        parsed_articles = []
-
-        for provider in self.providers_by_categories.provider.values():
-            for category in provider.category.values():
-                entries = category.entries
-                for entry in entries[:limit] if limit else entries:
-                    try:
-                        parsed_article = self.article_parser.article_parse(entry.link)
-                        parsed_articles.append(parsed_article)
-                    except Exception as e:
-                        logger.error("Error parsing article %s: %s", entry.link, e)
-        return parsed_articles
+        return list(self._iter_parsed_articles(self._article_jobs(limit)))
+
+    def _log_report(self, started: float):
+        report = self.report
+        report.elapsed_seconds = self.clock() - started
+        metrics = get_metrics()
+        for skipped in report.skipped:
+            metrics.increment("articles_skipped_total", reason=skipped.reason)
+        logger.info(
+            "Run finished in %.1fs: %s articles extracted, %s failed, %s skipped",
+            report.elapsed_seconds,
+            report.completed,
+            report.failed,
+            len(report.skipped),
+        )
+
+    def iter_process(
+        self,
+        limit: int = None,
+        max_in_flight: Optional[int] = None,
+        budget: Optional[float] = None,
+        article_timeout: Optional[float] = None,
+    ) -> Iterator[ParsedArticle]:
+        """
+        Stream parsed articles, tagged with their provider and categories, as soon as each is extracted.
+
+        Extraction only runs ahead of the consumer by max_in_flight articles, so memory stays
+        bounded however large the run is. Articles are extracted in priority order, so when
+        the budget runs out the articles left over are the least important ones. What was
+        extracted, failed or skipped is recorded in self.report.
+
+        Args:
+            limit (Optional[int]): Maximum number of articles to process per category.
+            max_in_flight (Optional[int]): Maximum number of articles being extracted or waiting
+                to be consumed. Defaults to twice max_workers.
+            budget (Optional[float]): Seconds the whole run may take, feed fetching included.
+            article_timeout (Optional[float]): Seconds a single article may take before it's
+                abandoned.
+        """
+        started = self.clock()
+        self.report = RunReport()
+        deadline = None if budget is None else started + budget
+
+        with get_metrics().timer("orchestrator_stage_seconds", stage="fetch_feeds"):
+            self.providers_by_categories = self._fetch_categories_by_provider()
+        with get_metrics().timer("orchestrator_stage_seconds", stage="deduplicate"):
+            jobs = self._article_jobs(limit)
+        yield from self._iter_parsed_articles(
+            jobs,
+            max_in_flight=max_in_flight,
+            deadline=deadline,
+            article_timeout=article_timeout,
+        )
+        self._log_report(started)
+
+    def iter_entries(
+        self,
+        providers_by_categories: CategoryByBaseUrl,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[ParsedArticle]:
+        """
+        Deduplicate and extract the given entries, without fetching any feeds.
+        """
+        self.report = RunReport()
+        jobs = self._unseen(self._deduplicate(providers_by_categories))
+        yield from self._iter_parsed_articles(jobs, max_in_flight=max_in_flight)
 
-    def process(self, limit: int = None) -> List[ParsedArticle]:
+    async def aiter_process(
+        self, limit: int = None, max_in_flight: Optional[int] = None
+    ) -> AsyncIterator[ParsedArticle]:
+        """
+        Asynchronous variant of iter_process. Extraction runs on a thread pool so the event loop stays free.
+        """
+        window = self._window_size(max_in_flight)
+        self.dropped_near_duplicates = 0
+        self.report = RunReport()
+
+        if isinstance(self.feed_service.parser, AsyncFeedParserInterface):
+            self.providers_by_categories = await self._afetch_categories_by_provider()
+        else:
+            self.providers_by_categories = await asyncio.to_thread(
+                self._fetch_categories_by_provider
+            )
+        jobs = iter(self._article_jobs(limit))
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight: Dict[asyncio.Future, ArticleJob] = {}
+
+        def submit(job: ArticleJob):
+            in_flight[loop.run_in_executor(executor, self.parse_article, job)] = job
+
+        try:
+            for job in islice(jobs, window):
+                submit(job)
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    parsed_article = future.result()
+                    if self._finished(job, parsed_article):
+                        yield parsed_article
+                        self.mark_delivered(job)
+                    for job in islice(jobs, 1):
+                        submit(job)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def write_to(
+        self,
+        sink: ArticleSinkInterface,
+        limit: int = None,
+        max_in_flight: Optional[int] = None,
+        budget: Optional[float] = None,
+        article_timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Stream parsed articles into the given sink instead of keeping them in memory.
+
+        The sink is flushed but not closed, so one sink can collect several runs.
+
+        Returns:
+            int: The number of articles written.
+        """
+        written = 0
+        for parsed_article in self.iter_process(
+            limit,
+            max_in_flight=max_in_flight,
+            budget=budget,
+            article_timeout=article_timeout,
+        ):
+            sink.write(parsed_article)
+            written += 1
+        sink.flush()
+        return written
+
+    def process(
+        self,
+        limit: int = None,
+        budget: Optional[float] = None,
+        article_timeout: Optional[float] = None,
+    ) -> List[ParsedArticle]:
         """
         Process all categories for each news provider and parse articles.
 
+        When budget or article_timeout run out, whatever completed is returned and
+        self.report lists the articles that were skipped.
+
         Args:
             limit (Optional[int]): Maximum number of articles to process per category.
+            budget (Optional[float]): Seconds the whole run may take.
+            article_timeout (Optional[float]): Seconds a single article may take.
 
         Returns:
             List[ParsedArticle]: A list of parsed articles.
         """
-        self.providers_by_categories = self._fetch_categories_by_provider()
-        parsed_articles = self._parse_articles(limit)
+        parsed_articles = list(
+            self.iter_process(limit, budget=budget, article_timeout=article_timeout)
+        )
         self.parsed_articles = parsed_articles
+        return parsed_articles
@@ -0,0 +1,274 @@
+import gzip
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional
+
+from classes.models.archive_record import ArchiveRecord
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import normalise_url
+
+RECORD_COLUMNS = "url, link, final_url, fetched_at, segment, offset, length"
+
+
+def encode_record(link: str, html: str, fetched_at: float, compression_level: int = 6) -> bytes:
+    """
+    A WARC resource record holding the page, compressed as its own gzip member so it can be
+    read back from its offset alone. link is the URL the page was served from.
+    """
+    body = html.encode("utf-8")
+    date = datetime.fromtimestamp(fetched_at, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    header = (
+        "WARC/1.1\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Target-URI: {link}\r\n"
+        f"WARC-Date: {date}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    ).encode("utf-8")
+    return gzip.compress(header + body + b"\r\n\r\n", compresslevel=compression_level)
+
+
+def decode_record(data: bytes) -> str:
+    """
+    The page held by one compressed record.
+    """
+    record = gzip.decompress(data)
+    header, _, block = record.partition(b"\r\n\r\n")
+    for line in header.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            block = block[: int(value)]
+            break
+    return block.decode("utf-8")
+
+
+def read_record(segment_path: Path | str, offset: int, length: int) -> str:
+    with open(segment_path, "rb") as segment:
+        segment.seek(offset)
+        return decode_record(segment.read(length))
+
+
+class PageArchive:
+    """
+    Append-only archive of fetched article pages, so articles can be re-extracted later
+    without the network.
+
+    Pages are written as WARC resource records to rotating pages-NNNNN.warc.gz segments.
+    Each record is its own gzip member, so the files are valid multi-member gzip and any
+    record can be decompressed on its own. A SQLite index maps every normalised URL and
+    fetch time to the segment, offset and length of its record, so a lookup is one index
+    query and one read, never a scan.
+
+    Only one process should write to an archive at a time. Any number may read it.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        max_segment_bytes: int = 256 * 1024 * 1024,
+        compression_level: int = 6,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_segment_bytes (int): A new segment is started once the current one reaches
+                this size.
+        """
+        if max_segment_bytes < 1:
+            raise ValueError("max_segment_bytes must be greater than 0")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.compression_level = compression_level
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._segment: Optional[BinaryIO] = None
+        self._segment_name: Optional[str] = None
+
+        self._connection = sqlite3.connect(
+            str(self.directory / "index.sqlite3"), check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                link TEXT NOT NULL,
+                final_url TEXT,
+                fetched_at REAL NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(pages)")}
+        if "final_url" not in columns:
+            # Archives written before redirects were recorded.
+            self._connection.execute("ALTER TABLE pages ADD COLUMN final_url TEXT")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at)"
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def segment_path(self, segment: str) -> Path:
+        return self.directory / segment
+
+    def _open_segment(self) -> BinaryIO:
+        if self._segment is not None and self._segment.tell() < self.max_segment_bytes:
+            return self._segment
+        if self._segment is not None:
+            self._segment.close()
+
+        segments = sorted(self.directory.glob("pages-*.warc.gz"))
+        if segments and segments[-1].stat().st_size < self.max_segment_bytes:
+            path = segments[-1]
+        else:
+            path = self.directory / f"pages-{len(segments):05d}.warc.gz"
+        self._segment = open(path, "ab")
+        self._segment_name = path.name
+        return self._segment
+
+    def append(
+        self,
+        link: str,
+        html: str,
+        fetched_at: Optional[float] = None,
+        final_url: Optional[str] = None,
+    ) -> ArchiveRecord:
+        """
+        Store a fetched page and index it under link.
+
+        Args:
+            final_url (Optional[str]): URL the page was served from after redirects. It is
+                the record's WARC-Target-URI, and replays extract against it.
+        """
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        if final_url == link:
+            final_url = None
+        data = encode_record(final_url or link, html, fetched_at, self.compression_level)
+        with self._lock:
+            segment = self._open_segment()
+            record = ArchiveRecord(
+                url=normalise_url(link),
+                link=link,
+                final_url=final_url,
+                fetched_at=fetched_at,
+                segment=self._segment_name,
+                offset=segment.tell(),
+                length=len(data),
+            )
+            segment.write(data)
+            segment.flush()
+            # The index only ever points at records that are completely written.
+            self._connection.execute(
+                f"INSERT INTO pages ({RECORD_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.url,
+                    record.link,
+                    record.final_url,
+                    record.fetched_at,
+                    record.segment,
+                    record.offset,
+                    record.length,
+                ),
+            )
+            self._connection.commit()
+
+        get_metrics().increment("archive_pages_total")
+        get_metrics().increment("archive_bytes_total", len(data))
+        return record
+
+    def _query(self, query: str, parameters: tuple = ()) -> List[ArchiveRecord]:
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [ArchiveRecord(**dict(zip(RECORD_COLUMNS.split(", "), row))) for row in rows]
+
+    def history(self, url: str) -> List[ArchiveRecord]:
+        """
+        Every archived fetch of the URL, oldest first.
+        """
+        return self._query(
+            f"SELECT {RECORD_COLUMNS} FROM pages WHERE url = ? ORDER BY fetched_at",
+            (normalise_url(url),),
+        )
+
+    def latest(self, url: str, before: Optional[float] = None) -> Optional[ArchiveRecord]:
+        """
+        The most recent fetch of the URL, or the most recent one made before the given time.
+        """
+        records = self._query(
+            f"SELECT {RECORD_COLUMNS} FROM pages WHERE url = ? AND fetched_at <= ? "
+            "ORDER BY fetched_at DESC LIMIT 1",
+            (normalise_url(url), float("inf") if before is None else before),
+        )
+        return records[0] if records else None
+
+    def records(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        latest_only: bool = True,
+    ) -> List[ArchiveRecord]:
+        """
+        Records fetched within [since, until), in file order so they can be read sequentially.
+
+        Args:
+            latest_only (bool): Keep only the last fetch of each URL within the range.
+        """
+        since = float("-inf") if since is None else since
+        until = float("inf") if until is None else until
+        if latest_only:
+            # SQLite takes the other columns from the row holding MAX(fetched_at).
+            query = (
+                f"SELECT {RECORD_COLUMNS} FROM ("
+                "SELECT url, link, final_url, MAX(fetched_at) AS fetched_at, segment, offset, "
+                "length "
+                "FROM pages WHERE fetched_at >= ? AND fetched_at < ? GROUP BY url"
+                ") ORDER BY segment, offset"
+            )
+        else:
+            query = (
+                f"SELECT {RECORD_COLUMNS} FROM pages "
+                "WHERE fetched_at >= ? AND fetched_at < ? ORDER BY segment, offset"
+            )
+        return self._query(query, (since, until))
+
+    def read(self, record: ArchiveRecord) -> str:
+        with self._lock:
+            if self._segment is not None:
+                self._segment.flush()
+        return read_record(self.segment_path(record.segment), record.offset, record.length)
+
+    def get(self, url: str, before: Optional[float] = None) -> Optional[str]:
+        """
+        The HTML of the most recent fetch of the URL, if it was archived.
+        """
+        record = self.latest(url, before=before)
+        if record is None:
+            logger.info("%s is not in the archive", url)
+            return None
+        return self.read(record)
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            self._connection.close()
@@ -0,0 +1,271 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from classes.models.article_job import ArticleJob
+from classes.models.entries import CategoryByBaseUrl, EntriesByCategory
+from classes.models.queue_lease import QueueLease
+from classes.services.article_deduplicator import ArticleDeduplicator
+from classes.services.article_sinks import ArticleSinkInterface
+from classes.services.feed_service import FeedService
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.seen_entry_store import entry_key
+from classes.services.work_queue import Payload, WorkQueueInterface
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+FEED_QUEUE = "feeds"
+ARTICLE_QUEUE = "articles"
+
+
+class JobFailed(Exception):
+    """Raised by a worker when a job should be retried later."""
+
+
+def polling_round(interval: float, clock: Callable[[], float] = time.time) -> str:
+    """
+    The id of the current polling round, the same for every producer within one interval.
+    """
+    return str(int(clock() // interval))
+
+
+def enqueue_feeds(
+    queue: WorkQueueInterface,
+    news_providers: NewsProviders,
+    run_id: str,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Queue one feed job per category of every provider and return how many were new.
+
+    Feed jobs are keyed by run_id, so producers that agree on it, for instance through
+    polling_round, fetch every feed once per round however many of them run.
+    """
+    return queue.put_many(
+        FEED_QUEUE,
+        (
+            (
+                f"{run_id}:{news_provider.base_url}{category.value}",
+                {
+                    "provider": str(news_provider.base_url),
+                    "category": category.name,
+                    "path": category.value,
+                    "limit": limit,
+                },
+            )
+            for news_provider in news_providers.providers
+            for category in news_provider.categories
+        ),
+    )
+
+
+def merge_categories(queued: Payload, new: Payload) -> Payload:
+    """
+    Combine two article jobs for the same link, found in different category feeds.
+    """
+    categories = list(queued["categories"])
+    categories += [name for name in new["categories"] if name not in categories]
+    return {**queued, "categories": categories}
+
+
+class QueueWorker(ABC):
+    """
+    Leases jobs from one queue and handles them, acknowledging each once it's done.
+
+    A job whose handler raises is released with exponential backoff and retried until the
+    queue gives up on it. Any number of workers, in any number of processes, can consume
+    the same queue.
+    """
+
+    queue_name: str
+
+    def __init__(
+        self,
+        queue: WorkQueueInterface,
+        max_workers: int = 1,
+        poll_interval: float = 1.0,
+        retry_delay: float = 5.0,
+    ):
+        """
+        Args:
+            max_workers (int): Jobs handled concurrently. Each lease batch holds this many.
+            poll_interval (float): Seconds to wait before polling an empty queue again.
+            retry_delay (float): Delay before the first retry of a failed job, doubled on each
+                further attempt.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+
+        self.queue = queue
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.processed = 0
+        self.failed = 0
+        self._counter_lock = threading.Lock()
+
+    @abstractmethod
+    def handle(self, lease: QueueLease) -> Optional[Payload]:
+        """Do the work for one job and return the result to store with it."""
+
+    def _handle_lease(self, lease: QueueLease):
+        metrics = get_metrics()
+        try:
+            with metrics.timer("queue_job_seconds", queue=self.queue_name):
+                result = self.handle(lease)
+        except Exception as e:
+            metrics.increment("queue_jobs_total", queue=self.queue_name, status="error")
+            logger.error(
+                "%s job %s failed on attempt %s: %s",
+                self.queue_name,
+                lease.key,
+                lease.attempts,
+                e,
+            )
+            self.queue.release(lease, delay=self.retry_delay * 2 ** (lease.attempts - 1))
+            with self._counter_lock:
+                self.failed += 1
+            return
+
+        self.queue.ack(lease, result)
+        metrics.increment("queue_jobs_total", queue=self.queue_name, status="ok")
+        with self._counter_lock:
+            self.processed += 1
+
+    def run_once(self, executor: Optional[ThreadPoolExecutor] = None) -> int:
+        """
+        Lease and handle one batch of jobs, returning how many were leased.
+        """
+        leases = self.queue.lease(self.queue_name, max_jobs=self.max_workers)
+        if executor is None or len(leases) < 2:
+            for lease in leases:
+                self._handle_lease(lease)
+        else:
+            list(executor.map(self._handle_lease, leases))
+        return len(leases)
+
+    def run(
+        self,
+        stop_when_idle: bool = False,
+        stop_event: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Handle jobs until stop_event is set, or until the queue is empty if stop_when_idle.
+
+        Returns:
+            int: The number of jobs handled successfully.
+        """
+        stop_event = stop_event or threading.Event()
+        executor = (
+            ThreadPoolExecutor(max_workers=self.max_workers)
+            if self.max_workers > 1
+            else None
+        )
+        try:
+            while not stop_event.is_set():
+                if self.run_once(executor):
+                    continue
+                if stop_when_idle:
+                    break
+                stop_event.wait(self.poll_interval)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return self.processed
+
+
+class FeedWorker(QueueWorker):
+    """
+    Fetches feeds and queues a job for every article they link to.
+
+    Article jobs are keyed by provider and normalised link, so an article listed in several
+    feeds, or on several polling rounds, is only extracted once while its job is retained.
+    """
+
+    queue_name = FEED_QUEUE
+
+    def __init__(self, queue: WorkQueueInterface, feed_service: FeedService, **kwargs):
+        super().__init__(queue, **kwargs)
+        self.feed_service = feed_service
+
+    def handle(self, lease: QueueLease) -> Payload:
+        job = lease.payload
+        entries = self.feed_service.parse_feed(
+            base_url=job["provider"], path=job["path"], limit=job["limit"]
+        )
+        tree = CategoryByBaseUrl.model_construct(
+            provider={
+                job["provider"]: EntriesByCategory.model_construct(
+                    category={job["category"]: entries}
+                )
+            }
+        )
+        article_jobs = ArticleDeduplicator().deduplicate(tree)
+        queued = self.queue.put_many(
+            ARTICLE_QUEUE,
+            (
+                (str(entry_key(article_job.provider, article_job.url)), article_job.model_dump())
+                for article_job in article_jobs
+            ),
+            merge=merge_categories,
+        )
+        logger.info(
+            "Queued %s new articles from %s%s", queued, job["provider"], job["path"]
+        )
+        return {"articles": len(article_jobs), "queued": queued}
+
+
+class ArticleWorker(QueueWorker):
+    """
+    Extracts queued articles with an Orchestrator's parser, host limits and near-duplicate
+    detection, and writes them to sink, if given.
+
+    Only each article's url and cluster_id are stored as its job's result, so the queue
+    doesn't keep a copy of every body. Redelivered jobs overwrite nothing but their own
+    result, so at-least-once delivery still gives one result per article; a sink sees an
+    article twice only when a lease expires mid-extraction.
+    """
+
+    queue_name = ARTICLE_QUEUE
+
+    def __init__(
+        self,
+        queue: WorkQueueInterface,
+        orchestrator: Orchestrator,
+        sink: Optional[ArticleSinkInterface] = None,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            max_workers (Optional[int]): Defaults to the orchestrator's max_workers.
+        """
+        super().__init__(queue, max_workers=max_workers or orchestrator.max_workers, **kwargs)
+        self.orchestrator = orchestrator
+        self.sink = sink
+        self._sink_lock = threading.Lock()
+
+    def handle(self, lease: QueueLease) -> Optional[Payload]:
+        job = ArticleJob.model_validate(lease.payload)
+        parsed_article = self.orchestrator.parse_article(job)
+        if parsed_article is None:
+            raise JobFailed(f"Could not extract {job.link}")
+        # The near-duplicate check gives the same answer when a failed job is retried.
+        if not self.orchestrator.keep(parsed_article):
+            return None
+
+        if self.sink is not None:
+            with self._sink_lock:
+                self.sink.write(parsed_article)
+        self.orchestrator.mark_delivered(job)
+        return {"url": parsed_article.url, "cluster_id": parsed_article.cluster_id}
+
+    def run(self, *args, **kwargs) -> int:
+        try:
+            return super().run(*args, **kwargs)
+        finally:
+            if self.sink is not None:
+                self.sink.flush()
@@ -0,0 +1,551 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from classes.models.index_manifest import IndexManifest
+from classes.models.parsed_article import ParsedArticle
+from classes.models.search_hit import SearchHit
+from classes.services.article_sinks import ArticleSinkInterface
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.tokeniser import tokenise
+from classes.utils.url_normaliser import host_of, normalise_url
+
+# Postings are stored as little-endian uint32, so segment files can be mapped as-is.
+POSTING_DTYPE = np.dtype("<u4")
+
+
+def filter_term(field: str, value: str) -> str:
+    """
+    The indexed term for a filterable field. tokenise never produces ":", so these can't
+    collide with words.
+    """
+    return f"{field}:{value.strip().lower()}"
+
+
+def provider_value(provider: str) -> str:
+    """
+    Providers given as a feed URL are filtered on by host, so either side can use the URL.
+    """
+    return host_of(provider) if "://" in provider else provider
+
+
+def field_terms(
+    article: ParsedArticle, provider_names: Optional[Dict[str, str]] = None
+) -> List[str]:
+    terms = [filter_term("category", category) for category in article.categories]
+    terms.extend(filter_term("author", author) for author in article.authors)
+    providers = article.providers or ([article.provider] if article.provider else [])
+    for provider in providers:
+        terms.append(filter_term("provider", provider_value(provider)))
+        name = (provider_names or {}).get(provider)
+        if name:
+            terms.append(filter_term("provider", name))
+    return list(dict.fromkeys(terms))
+
+
+class SegmentBuffer:
+    """
+    Postings for the documents added since the last commit, held in memory.
+    """
+
+    def __init__(self, base_doc_id: int):
+        self.base_doc_id = base_doc_id
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.lengths: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, tokens: List[str], terms: Iterable[str]):
+        local_id = len(self.lengths)
+        postings = self.postings
+        for term, frequency in Counter(tokens).items():
+            postings[term] += (local_id, frequency)
+        for term in set(terms):
+            postings[term] += (local_id, 1)
+        self.lengths.append(len(tokens))
+
+    def write(self, directory: Path, name: str):
+        write_segment(
+            directory,
+            name,
+            self.base_doc_id,
+            np.asarray(self.lengths, dtype=POSTING_DTYPE),
+            (
+                (term, flat[0::2], flat[1::2])
+                for term, flat in sorted(self.postings.items())
+            ),
+        )
+
+
+def write_segment(
+    directory: Path,
+    name: str,
+    base_doc_id: int,
+    lengths: np.ndarray,
+    postings: Iterable[Tuple[str, Iterable[int], Iterable[int]]],
+):
+    """
+    Write a segment as three files:
+
+    - <name>.postings: for each term, its document ids followed by its term frequencies
+    - <name>.lengths: the token count of each document
+    - <name>.json: the base document id and each term's offset and count in .postings
+    """
+    terms = {}
+    offset = 0
+    with open(directory / f"{name}.postings", "wb") as postings_file:
+        for term, doc_ids, frequencies in postings:
+            doc_ids = np.asarray(doc_ids, dtype=POSTING_DTYPE)
+            postings_file.write(doc_ids.tobytes())
+            postings_file.write(np.asarray(frequencies, dtype=POSTING_DTYPE).tobytes())
+            terms[term] = (offset, len(doc_ids))
+            offset += 2 * len(doc_ids)
+    lengths.astype(POSTING_DTYPE).tofile(directory / f"{name}.lengths")
+    (directory / f"{name}.json").write_text(
+        json.dumps(
+            {"base_doc_id": base_doc_id, "doc_count": len(lengths), "terms": terms}
+        ),
+        encoding="utf-8",
+    )
+
+
+def map_array(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=POSTING_DTYPE)
+    return np.memmap(path, dtype=POSTING_DTYPE, mode="r")
+
+
+class Segment:
+    """
+    A committed, immutable segment, with its postings and lengths memory-mapped.
+    """
+
+    def __init__(self, directory: Path, name: str):
+        self.name = name
+        meta = json.loads((directory / f"{name}.json").read_text(encoding="utf-8"))
+        self.base_doc_id: int = meta["base_doc_id"]
+        self.doc_count: int = meta["doc_count"]
+        self.terms: Dict[str, List[int]] = meta["terms"]
+        self.postings = map_array(directory / f"{name}.postings")
+        self.lengths = map_array(directory / f"{name}.lengths")
+        self.live = np.ones(self.doc_count, dtype=bool)
+
+    def contains(self, doc_id: int) -> bool:
+        return self.base_doc_id <= doc_id < self.base_doc_id + self.doc_count
+
+    def term_postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, count = entry
+        return (
+            self.postings[offset : offset + count],
+            self.postings[offset + count : offset + 2 * count],
+        )
+
+    def files(self, directory: Path) -> List[Path]:
+        return [
+            directory / f"{self.name}{suffix}"
+            for suffix in (".postings", ".lengths", ".json")
+        ]
+
+
+class SearchIndex(ArticleSinkInterface):
+    """
+    An incremental inverted index over article titles and bodies, ranked with BM25.
+
+    Added articles are buffered in memory and written as a new immutable segment on commit,
+    so the index grows without being rebuilt. Postings and document lengths are flat
+    little-endian uint32 files that are memory-mapped at query time. Provider, category and
+    author are indexed as filter terms; a provider can be filtered on by its configured name
+    or the host of its feeds. Titles, URLs and other stored fields live in SQLite
+    next to the segments.
+
+    Re-adding a URL replaces the earlier document, which stays in its segment but is masked
+    out of results. Once there are more than max_segments segments they are merged into one.
+
+    The index is also an ArticleSinkInterface, so Orchestrator.write_to can feed it directly.
+    """
+
+    MANIFEST = "index.json"
+
+    def __init__(
+        self,
+        directory: Path | str,
+        segment_size: int = 10_000,
+        max_segments: int = 16,
+        k1: float = 1.2,
+        b: float = 0.75,
+        provider_names: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            segment_size (int): Buffered documents that trigger a commit.
+            max_segments (int): Segment count above which a commit merges every segment.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 document-length normalisation.
+            provider_names (Optional[Dict[str, str]]): Configured provider names by base URL,
+                as returned by NewsProviders.names_by_base_url.
+        """
+        if segment_size < 1:
+            raise ValueError("segment_size must be greater than 0")
+        if max_segments < 1:
+            raise ValueError("max_segments must be greater than 0")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.k1 = k1
+        self.b = b
+        self.provider_names = provider_names or {}
+        self._lock = threading.RLock()
+
+        self.manifest = self._load_manifest()
+        self._connection = sqlite3.connect(
+            str(self.directory / "documents.sqlite3"), check_same_thread=False
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                provider TEXT,
+                authors TEXT NOT NULL,
+                categories TEXT NOT NULL,
+                live INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS documents_url ON documents (url)"
+        )
+        # Documents stored after the last committed segment belonged to a lost buffer.
+        self._connection.execute(
+            "DELETE FROM documents WHERE doc_id >= ?", (self.manifest.next_doc_id,)
+        )
+        self._connection.commit()
+
+        self.segments = [Segment(self.directory, name) for name in self.manifest.segments]
+        for (doc_id,) in self._connection.execute(
+            "SELECT doc_id FROM documents WHERE live = 0"
+        ):
+            self._mask(doc_id)
+        self._buffer = SegmentBuffer(self.manifest.next_doc_id)
+        self._collection_stats: Optional[Tuple[int, float]] = None
+
+    def _load_manifest(self) -> IndexManifest:
+        path = self.directory / self.MANIFEST
+        if not path.exists():
+            return IndexManifest()
+        try:
+            return IndexManifest.model_validate_json(path.read_bytes())
+        except ValidationError as e:
+            raise ValueError(f"Unreadable search index manifest {path}: {e}") from e
+
+    def _save_manifest(self):
+        path = self.directory / self.MANIFEST
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        temporary_path.write_text(self.manifest.model_dump_json(), encoding="utf-8")
+        os.replace(temporary_path, path)
+
+    def __len__(self) -> int:
+        """The number of searchable documents."""
+        with self._lock:
+            return int(sum(segment.live.sum() for segment in self.segments))
+
+    def _mask(self, doc_id: int):
+        for segment in self.segments:
+            if segment.contains(doc_id):
+                segment.live[doc_id - segment.base_doc_id] = False
+                self._collection_stats = None
+                return
+
+    def add(self, article: ParsedArticle) -> int:
+        """
+        Buffer an article for the next commit and return its document id.
+        """
+        url = normalise_url(article.url)
+        tokens = tokenise(article.title) + tokenise(article.body)
+        with self._lock:
+            doc_id = self._buffer.base_doc_id + len(self._buffer)
+            for (previous_id,) in self._connection.execute(
+                "SELECT doc_id FROM documents WHERE url = ? AND live = 1", (url,)
+            ).fetchall():
+                self._connection.execute(
+                    "UPDATE documents SET live = 0 WHERE doc_id = ?", (previous_id,)
+                )
+                self._mask(previous_id)
+
+            self._buffer.add(tokens, field_terms(article, self.provider_names))
+            self._connection.execute(
+                "INSERT INTO documents (doc_id, url, title, provider, authors, categories) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    doc_id,
+                    url,
+                    article.title,
+                    article.provider,
+                    json.dumps(article.authors),
+                    json.dumps(article.categories),
+                ),
+            )
+            if len(self._buffer) >= self.segment_size:
+                self.commit()
+        return doc_id
+
+    def commit(self):
+        """
+        Write buffered articles as a new segment and make them searchable.
+        """
+        with self._lock:
+            if not len(self._buffer):
+                self._connection.commit()
+                return
+
+            name = f"segment-{self.manifest.next_segment:06d}"
+            with get_metrics().timer("search_index_commit_seconds"):
+                self._buffer.write(self.directory, name)
+            segment = Segment(self.directory, name)
+            self.segments.append(segment)
+            # Stored fields first, so a crash before the manifest is written only leaves
+            # orphaned rows, which are dropped on the next open.
+            self._connection.commit()
+            for (doc_id,) in self._connection.execute(
+                "SELECT doc_id FROM documents WHERE live = 0 AND doc_id >= ? AND doc_id < ?",
+                (segment.base_doc_id, segment.base_doc_id + segment.doc_count),
+            ):
+                self._mask(doc_id)
+
+            self.manifest = IndexManifest(
+                segments=[segment.name for segment in self.segments],
+                next_doc_id=segment.base_doc_id + segment.doc_count,
+                next_segment=self.manifest.next_segment + 1,
+            )
+            self._save_manifest()
+            self._buffer = SegmentBuffer(self.manifest.next_doc_id)
+            self._collection_stats = None
+            logger.info("Committed %s with %s documents", name, segment.doc_count)
+
+            if len(self.segments) > self.max_segments:
+                self.merge()
+
+    def merge(self):
+        """
+        Merge every committed segment into one, so queries visit a single segment.
+
+        Replaced documents are kept, masked, so document ids stay stable.
+        """
+        with self._lock:
+            if len(self.segments) < 2:
+                return
+
+            segments = self.segments
+            base_doc_id = segments[0].base_doc_id
+            terms = sorted(set().union(*(segment.terms for segment in segments)))
+
+            def merged_postings():
+                for term in terms:
+                    doc_ids, frequencies = [], []
+                    for segment in segments:
+                        postings = segment.term_postings(term)
+                        if postings is not None:
+                            shift = segment.base_doc_id - base_doc_id
+                            doc_ids.append(postings[0] + np.uint32(shift))
+                            frequencies.append(postings[1])
+                    yield term, np.concatenate(doc_ids), np.concatenate(frequencies)
+
+            name = f"segment-{self.manifest.next_segment:06d}"
+            with get_metrics().timer("search_index_merge_seconds"):
+                write_segment(
+                    self.directory,
+                    name,
+                    base_doc_id,
+                    np.concatenate([segment.lengths for segment in segments]),
+                    merged_postings(),
+                )
+            merged = Segment(self.directory, name)
+            merged.live = np.concatenate([segment.live for segment in segments])
+
+            self.segments = [merged]
+            self.manifest = IndexManifest(
+                segments=[name],
+                next_doc_id=self.manifest.next_doc_id,
+                next_segment=self.manifest.next_segment + 1,
+            )
+            self._save_manifest()
+            for segment in segments:
+                for path in segment.files(self.directory):
+                    path.unlink(missing_ok=True)
+            logger.info("Merged %s segments into %s", len(segments), name)
+
+    def _stats(self) -> Tuple[int, float]:
+        """The live document count and their average length, for BM25."""
+        if self._collection_stats is None:
+            documents = 0
+            total_length = 0
+            for segment in self.segments:
+                documents += int(segment.live.sum())
+                total_length += int(segment.lengths[segment.live].sum())
+            self._collection_stats = (
+                documents,
+                total_length / documents if documents else 0.0,
+            )
+        return self._collection_stats
+
+    def _segment_candidates(
+        self,
+        segment: Segment,
+        weights: Dict[str, float],
+        filters: List[str],
+        average_length: float,
+        limit: int,
+    ) -> List[Tuple[float, int]]:
+        scores = np.zeros(segment.doc_count, dtype=np.float32)
+        matched = np.zeros(segment.doc_count, dtype=bool)
+        for term, idf in weights.items():
+            postings = segment.term_postings(term)
+            if postings is None:
+                continue
+            doc_ids, frequencies = postings
+            frequencies = frequencies.astype(np.float32)
+            norm = self.k1 * (
+                1 - self.b + self.b * segment.lengths[doc_ids] / average_length
+            )
+            scores[doc_ids] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+            matched[doc_ids] = True
+
+        matched &= segment.live
+        for term in filters:
+            postings = segment.term_postings(term)
+            if postings is None:
+                return []
+            allowed = np.zeros(segment.doc_count, dtype=bool)
+            allowed[postings[0]] = True
+            matched &= allowed
+
+        candidates = np.flatnonzero(matched)
+        if len(candidates) > limit:
+            top = np.argpartition(scores[candidates], -limit)[-limit:]
+            candidates = candidates[top]
+        return [
+            (float(scores[local_id]), segment.base_doc_id + int(local_id))
+            for local_id in candidates
+        ]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        provider: Optional[str] = None,
+        category: Optional[str] = None,
+        author: Optional[str] = None,
+    ) -> List[SearchHit]:
+        """
+        Rank committed articles against the query with BM25, best first.
+
+        Any query term may match. Filters must all match exactly, ignoring case.
+        """
+        if limit < 1:
+            raise ValueError("Limit must be greater than 0")
+
+        query_terms = list(dict.fromkeys(tokenise(query)))
+        filters = [
+            filter_term(field, value)
+            for field, value in (
+                ("provider", provider and provider_value(provider)),
+                ("category", category),
+                ("author", author),
+            )
+            if value
+        ]
+
+        with self._lock, get_metrics().timer("search_query_seconds"):
+            documents, average_length = self._stats()
+            if not query_terms or not documents:
+                return []
+
+            weights = {}
+            for term in query_terms:
+                document_frequency = sum(
+                    segment.terms[term][1]
+                    for segment in self.segments
+                    if term in segment.terms
+                )
+                if document_frequency:
+                    weights[term] = math.log(
+                        1
+                        + (documents - document_frequency + 0.5)
+                        / (document_frequency + 0.5)
+                    )
+
+            candidates = []
+            for segment in self.segments:
+                candidates.extend(
+                    self._segment_candidates(
+                        segment, weights, filters, average_length, limit
+                    )
+                )
+            candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+            candidates = candidates[:limit]
+            return self._hits(candidates)
+
+    def _hits(self, candidates: List[Tuple[float, int]]) -> List[SearchHit]:
+        if not candidates:
+            return []
+        doc_ids = [doc_id for _, doc_id in candidates]
+        rows = {
+            row[0]: row
+            for row in self._connection.execute(
+                "SELECT doc_id, url, title, provider, authors, categories FROM documents "
+                f"WHERE doc_id IN ({', '.join('?' * len(doc_ids))})",
+                doc_ids,
+            )
+        }
+        hits = []
+        for score, doc_id in candidates:
+            row = rows.get(doc_id)
+            if row is None:
+                continue
+            hits.append(
+                SearchHit(
+                    doc_id=doc_id,
+                    score=score,
+                    url=row[1],
+                    title=row[2],
+                    provider=row[3],
+                    authors=json.loads(row[4]),
+                    categories=json.loads(row[5]),
+                )
+            )
+        return hits
+
+    def write(self, article: ParsedArticle):
+        self.add(article)
+
+    def flush(self):
+        self.commit()
+
+    def close(self):
+        with self._lock:
+            self.commit()
+            self._connection.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    index = SearchIndex(sys.argv[1])
+    for hit in index.search(" ".join(sys.argv[2:])):
+        print(f"{hit.score:7.3f}  {hit.title}  {hit.url}")
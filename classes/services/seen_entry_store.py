@@ -0,0 +1,137 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from classes.models.article_job import ArticleJob
+from classes.models.cache_stats import CacheStats
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import normalise_url
+
+
+def entry_key(provider: str, url: str) -> int:
+    """
+    A signed 64-bit hash of the provider and normalised link, stored instead of the text.
+    """
+    digest = hashlib.blake2b(
+        f"{provider}\n{normalise_url(url)}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SeenEntryStore:
+    """
+    Persistent record of the feed entries already extracted, per provider.
+
+    Only a 64-bit hash of each provider and normalised link is kept, next to the time it was
+    seen, and entries older than ttl_seconds are purged. Storage therefore stays bounded by
+    how many entries the feeds publish within the TTL, however long the service runs.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl_seconds: Optional[float] = 30 * 24 * 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_entries (
+                key INTEGER PRIMARY KEY,
+                seen_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS seen_entries_seen_at ON seen_entries (seen_at)"
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM seen_entries"
+            ).fetchone()[0]
+
+    def purge(self) -> int:
+        """
+        Forget entries seen longer than ttl_seconds ago and return how many were removed.
+        """
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            removed = self._connection.execute(
+                "DELETE FROM seen_entries WHERE seen_at < ?",
+                (self.clock() - self.ttl_seconds,),
+            ).rowcount
+            self._connection.commit()
+        return removed
+
+    def is_seen(self, provider: str, url: str) -> bool:
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM seen_entries WHERE key = ?", (entry_key(provider, url),)
+                ).fetchone()
+                is not None
+            )
+
+    def mark_seen(self, provider: str, url: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO seen_entries (key, seen_at) VALUES (?, ?)",
+                (entry_key(provider, url), self.clock()),
+            )
+            self._connection.commit()
+
+    def unseen(self, jobs: List[ArticleJob]) -> List[ArticleJob]:
+        """
+        Drop the jobs whose article was already extracted for every provider it appeared in.
+
+        Expired entries are purged first, so this is also where storage is reclaimed.
+        """
+        self.purge()
+        job_keys = [[entry_key(provider, job.url) for provider in job.providers] for job in jobs]
+        keys = [key for keys in job_keys for key in keys]
+        seen = set()
+        with self._lock:
+            # Stay well below SQLite's limit on bound parameters.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                seen.update(
+                    key
+                    for (key,) in self._connection.execute(
+                        "SELECT key FROM seen_entries "
+                        f"WHERE key IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                )
+
+        unseen_jobs = [
+            job for job, keys in zip(jobs, job_keys) if not seen.issuperset(keys)
+        ]
+        skipped = len(jobs) - len(unseen_jobs)
+        self.stats.hits += skipped
+        self.stats.misses += len(unseen_jobs)
+        get_metrics().increment("seen_entries_skipped_total", skipped)
+        logger.info(
+            "Skipping %s already extracted articles, %s are new",
+            skipped,
+            len(unseen_jobs),
+        )
+        return unseen_jobs
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,214 @@
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from classes.services.host_health import HostHealth, parse_retry_after
+from classes.utils.metrics import get_metrics
+from classes.utils.url_normaliser import host_of
+
+DEFAULT_USER_AGENT = "my-py-feeds/0.0.1"
+
+# gzip and deflate always, plus br and zstd when brotli or zstandard is installed.
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class BoundedRetry(Retry):
+    """
+    A urllib3 Retry that caps how long a Retry-After header can make it wait.
+    """
+
+    max_retry_after = 30.0
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+class HttpTransport:
+    """
+    A shared HTTP client for feeds and articles.
+
+    Connections are kept alive and pooled per host, responses are negotiated compressed,
+    and failed GETs are retried a bounded number of times with exponential backoff. With a
+    HostHealth, requests are rate limited per host and fail fast while a host is down, and
+    only connection and read errors are retried: error responses go straight to the
+    HostHealth, which does the backing off, instead of urllib3 sleeping on them.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 32,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff_factor: float = 0.2,
+        user_agent: str = DEFAULT_USER_AGENT,
+        health: Optional[HostHealth] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            pool_maxsize (int): Connections kept alive per host.
+            connect_timeout (float): Seconds to wait for a connection to be established.
+            read_timeout (float): Seconds to wait between bytes of the response.
+            retries (int): Retries for connection errors, read errors and, without a health,
+                429/5xx responses.
+            backoff_factor (float): Base of the exponential delay between retries, in seconds.
+            health (Optional[HostHealth]): Per-host rate limiter and circuit breaker.
+            timeout (Optional[float]): Deprecated, sets both connect_timeout and read_timeout.
+        """
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        if timeout is not None:
+            warnings.warn(
+                "HttpTransport(timeout=...) is deprecated, use connect_timeout and read_timeout",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            connect_timeout = read_timeout = timeout
+
+        self.timeout = (connect_timeout, read_timeout)
+        self.health = health
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        retry = BoundedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES if health is None else (),
+            respect_retry_after_header=health is None,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            # Hand the last response back so raise_for_status reports its status.
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def _record_transfer(response: requests.Response, host: str):
+        """
+        Count the bytes received for a finished response, both on the wire and decoded.
+        """
+        metrics = get_metrics()
+        raw = response.raw
+        retries = getattr(raw, "retries", None)
+        if retries is not None and retries.history:
+            metrics.increment("http_retries_total", len(retries.history), host=host)
+
+        wire_bytes = raw.tell() if hasattr(raw, "tell") else None
+        if isinstance(wire_bytes, int):
+            metrics.increment("http_wire_bytes_total", wire_bytes, host=host)
+            metrics.observe("http_response_wire_bytes", wire_bytes, host=host)
+
+    def _record_health(self, host: str, response: Optional[requests.Response]):
+        if self.health is None:
+            return
+        if response is None:
+            self.health.record(host, None)
+            return
+        self.health.record(
+            host,
+            response.status_code,
+            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+        )
+
+    def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """
+        Fetch the given URL, raising requests.HTTPError for error responses.
+
+        Raises host_health.HostUnavailable, without making a request, while the host is
+        known to be down.
+        """
+        metrics = get_metrics()
+        host = host_of(url)
+        if self.health is not None:
+            self.health.acquire(host)
+
+        response = None
+        try:
+            with metrics.timer("http_request_seconds", host=host):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+        except requests.HTTPError as e:
+            metrics.increment(
+                "http_errors_total", host=host, status=str(e.response.status_code)
+            )
+            self._record_transfer(e.response, host)
+            raise
+        except requests.RequestException as e:
+            metrics.increment("http_errors_total", host=host, status=type(e).__name__)
+            raise
+        finally:
+            self._record_health(host, response)
+
+        metrics.increment("http_response_bytes_total", len(response.content), host=host)
+        self._record_transfer(response, host)
+        return response
+
+    @contextmanager
+    def stream(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Iterator[requests.Response]:
+        """
+        Open the given URL without reading the body, so callers can stop reading early.
+
+        The response is closed when the block exits.
+        """
+        host = host_of(url)
+        if self.health is not None:
+            self.health.acquire(host)
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            )
+        except requests.RequestException:
+            self._record_health(host, None)
+            raise
+        self._record_health(host, response)
+        try:
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                get_metrics().increment(
+                    "http_errors_total", host=host, status=str(response.status_code)
+                )
+                raise
+            yield response
+            self._record_transfer(response, host)
+        finally:
+            response.close()
+
+    def get_page(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, str]:
+        """
+        Fetch the given URL and return the URL it ended up at after redirects, with the
+        decoded body. UTF-8 is assumed when the server names no charset.
+        """
+        response = self.get(url, headers=headers)
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        return response.url or url, response.text
+
+    def get_text(self, url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        Fetch the given URL and decode the body, assuming UTF-8 when the server names no charset.
+        """
+        return self.get_page(url, headers=headers)[1]
+
+    def close(self):
+        self.session.close()
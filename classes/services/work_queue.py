@@ -0,0 +1,316 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from classes.models.queue_lease import QueueLease
+from classes.utils.logger import logger
+from classes.utils.metrics import get_metrics
+
+Payload = Dict[str, Any]
+MergePayloads = Callable[[Payload, Payload], Payload]
+
+JOB_STATES = ("pending", "leased", "done", "dead")
+
+
+class WorkQueueInterface(ABC):
+    """
+    A queue of keyed jobs with at-least-once delivery.
+
+    A leased job is hidden from other workers until it is acknowledged, released or its
+    visibility timeout passes, after which it is handed out again. A job is only queued once
+    per key, so re-queuing finished work is a no-op and results stay idempotent.
+    """
+
+    @abstractmethod
+    def put_many(
+        self,
+        queue: str,
+        jobs: Iterable[Tuple[str, Payload]],
+        merge: Optional[MergePayloads] = None,
+    ) -> int:
+        """
+        Queue (key, payload) pairs and return how many were new.
+
+        When a key is already waiting, merge, if given, combines the queued payload with the
+        new one. Keys that are being worked on or are finished are left alone.
+        """
+
+    def put(self, queue: str, key: str, payload: Payload) -> bool:
+        return self.put_many(queue, [(key, payload)]) == 1
+
+    @abstractmethod
+    def lease(self, queue: str, max_jobs: int = 1) -> List[QueueLease]:
+        """Hand out up to max_jobs visible jobs, hiding them until the visibility timeout."""
+
+    @abstractmethod
+    def ack(self, lease: QueueLease, result: Optional[Payload] = None) -> bool:
+        """
+        Mark the job done and store its result. Returns False if the lease was lost to
+        another worker, in which case that worker's result is kept.
+        """
+
+    @abstractmethod
+    def release(self, lease: QueueLease, delay: float = 0.0) -> bool:
+        """Give the job back to be retried after delay seconds."""
+
+    @abstractmethod
+    def counts(self, queue: str) -> Dict[str, int]:
+        """Number of jobs in each of JOB_STATES."""
+
+    def close(self):
+        pass
+
+
+class SQLiteWorkQueue(WorkQueueInterface):
+    """
+    Work queue in a SQLite file, shared by every process that opens the same path.
+
+    Leases are taken inside an immediate transaction, so two workers never hold the same job
+    at once. The database runs in WAL mode so readers don't block the single writer; this
+    needs the file on a local disk, so nodes on separate machines should share a networked
+    WorkQueueInterface instead.
+
+    Jobs leased max_attempts times without being acknowledged are marked dead rather than
+    retried forever.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        busy_timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            visibility_timeout (float): Seconds a leased job stays hidden. It should comfortably
+                exceed the time a worker needs for one job.
+            busy_timeout (float): Seconds to wait for another process's write lock.
+        """
+        if visibility_timeout <= 0:
+            raise ValueError("visibility_timeout must be greater than 0")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be greater than 0")
+
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(path),
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                queue TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                visible_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                token TEXT,
+                result TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (queue, key)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_visible ON jobs (queue, state, visible_at)"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            # Take the write lock up front so concurrent leases serialise instead of deadlocking.
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def put_many(
+        self,
+        queue: str,
+        jobs: Iterable[Tuple[str, Payload]],
+        merge: Optional[MergePayloads] = None,
+    ) -> int:
+        inserted = 0
+        now = self.clock()
+        with self._transaction() as connection:
+            for key, payload in jobs:
+                if connection.execute(
+                    "INSERT INTO jobs (queue, key, payload, visible_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (queue, key) DO NOTHING",
+                    (queue, key, json.dumps(payload), now, now),
+                ).rowcount:
+                    inserted += 1
+                    continue
+                if merge is None:
+                    continue
+
+                row = connection.execute(
+                    "SELECT id, payload FROM jobs WHERE queue = ? AND key = ? "
+                    "AND state = 'pending' AND token IS NULL",
+                    (queue, key),
+                ).fetchone()
+                if row is None:
+                    continue
+                queued = json.loads(row[1])
+                merged = merge(queued, payload)
+                if merged != queued:
+                    connection.execute(
+                        "UPDATE jobs SET payload = ? WHERE id = ?",
+                        (json.dumps(merged), row[0]),
+                    )
+
+        get_metrics().increment("queue_jobs_enqueued_total", inserted, queue=queue)
+        return inserted
+
+    def lease(self, queue: str, max_jobs: int = 1) -> List[QueueLease]:
+        if max_jobs < 1:
+            raise ValueError("max_jobs must be greater than 0")
+
+        leases = []
+        now = self.clock()
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, key, payload, attempts FROM jobs "
+                "WHERE queue = ? AND state = 'pending' AND visible_at <= ? "
+                "ORDER BY visible_at, id LIMIT ?",
+                (queue, now, max_jobs),
+            ).fetchall()
+            for job_id, key, payload, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # Its last lease expired without an acknowledgement.
+                    connection.execute(
+                        "UPDATE jobs SET state = 'dead', token = NULL, updated_at = ? "
+                        "WHERE id = ?",
+                        (now, job_id),
+                    )
+                    logger.error("Giving up on %s job %s after %s attempts", queue, key, attempts)
+                    get_metrics().increment("queue_jobs_dead_total", queue=queue)
+                    continue
+
+                token = uuid.uuid4().hex
+                connection.execute(
+                    "UPDATE jobs SET visible_at = ?, attempts = attempts + 1, token = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (now + self.visibility_timeout, token, now, job_id),
+                )
+                leases.append(
+                    QueueLease(
+                        id=job_id,
+                        queue=queue,
+                        key=key,
+                        payload=json.loads(payload),
+                        token=token,
+                        attempts=attempts + 1,
+                    )
+                )
+        return leases
+
+    def ack(self, lease: QueueLease, result: Optional[Payload] = None) -> bool:
+        with self._transaction() as connection:
+            acknowledged = connection.execute(
+                "UPDATE jobs SET state = 'done', token = NULL, result = ?, updated_at = ? "
+                "WHERE id = ? AND token = ?",
+                (
+                    None if result is None else json.dumps(result),
+                    self.clock(),
+                    lease.id,
+                    lease.token,
+                ),
+            ).rowcount
+        if not acknowledged:
+            logger.warning("Lease on %s job %s was lost before it finished", lease.queue, lease.key)
+        return bool(acknowledged)
+
+    def release(self, lease: QueueLease, delay: float = 0.0) -> bool:
+        now = self.clock()
+        with self._transaction() as connection:
+            state = "dead" if lease.attempts >= self.max_attempts else "pending"
+            released = connection.execute(
+                "UPDATE jobs SET state = ?, token = NULL, visible_at = ?, updated_at = ? "
+                "WHERE id = ? AND token = ?",
+                (state, now + delay, now, lease.id, lease.token),
+            ).rowcount
+        if released and state == "dead":
+            logger.error(
+                "Giving up on %s job %s after %s attempts",
+                lease.queue,
+                lease.key,
+                lease.attempts,
+            )
+            get_metrics().increment("queue_jobs_dead_total", queue=lease.queue)
+        return bool(released)
+
+    def extend(self, lease: QueueLease, seconds: Optional[float] = None) -> bool:
+        """
+        Keep a slow job hidden for another visibility timeout, or the given number of seconds.
+        """
+        now = self.clock()
+        with self._transaction() as connection:
+            return bool(
+                connection.execute(
+                    "UPDATE jobs SET visible_at = ?, updated_at = ? WHERE id = ? AND token = ?",
+                    (now + (seconds or self.visibility_timeout), now, lease.id, lease.token),
+                ).rowcount
+            )
+
+    def counts(self, queue: str) -> Dict[str, int]:
+        counts = dict.fromkeys(JOB_STATES, 0)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT CASE WHEN state = 'pending' AND visible_at > ? AND token IS NOT NULL "
+                "THEN 'leased' ELSE state END, COUNT(*) FROM jobs WHERE queue = ? GROUP BY 1",
+                (self.clock(), queue),
+            ).fetchall()
+        counts.update(rows)
+        return counts
+
+    def results(self, queue: str) -> Iterator[Tuple[str, Payload]]:
+        """
+        The (key, result) of every finished job that stored a result.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, result FROM jobs "
+                "WHERE queue = ? AND state = 'done' AND result IS NOT NULL ORDER BY id",
+                (queue,),
+            ).fetchall()
+        for key, result in rows:
+            yield key, json.loads(result)
+
+    def purge(self, older_than: float) -> int:
+        """
+        Forget done and dead jobs last updated more than older_than seconds ago. Their keys
+        can then be queued again.
+        """
+        with self._transaction() as connection:
+            return connection.execute(
+                "DELETE FROM jobs WHERE state IN ('done', 'dead') AND updated_at < ?",
+                (self.clock() - older_than,),
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
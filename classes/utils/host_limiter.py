@@ -0,0 +1,40 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from classes.utils.url_normaliser import host_of
+
+
+class HostLimiter:
+    """
+    Caps the number of concurrent operations made against any single host.
+    """
+
+    def __init__(self, max_per_host: Optional[int] = None):
+        if max_per_host is not None and max_per_host < 1:
+            raise ValueError("max_per_host must be greater than 0")
+        self.max_per_host = max_per_host
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    host_of = staticmethod(host_of)
+
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """
+        Block until a slot for the host of the given URL is free and hold it for the duration of the block.
+        """
+        if self.max_per_host is None:
+            yield
+            return
+
+        with self._semaphore_for(self.host_of(url)):
+            yield
@@ -0,0 +1,189 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsInterface(ABC):
+    @abstractmethod
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """Adds value to the counter with the given name and labels."""
+
+    @abstractmethod
+    def observe(self, name: str, value: float, **labels: str):
+        """Records a value in the histogram with the given name and labels."""
+
+    @abstractmethod
+    def timer(self, name: str, **labels: str) -> ContextManager:
+        """Observes the duration of the block, in seconds, in the named histogram."""
+
+
+class NullMetrics(MetricsInterface):
+    """
+    The default recorder. Every call is a no-op so uninstrumented runs pay almost nothing.
+    """
+
+    _null_timer = nullcontext()
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        pass
+
+    def observe(self, name: str, value: float, **labels: str):
+        pass
+
+    def timer(self, name: str, **labels: str) -> ContextManager:
+        return self._null_timer
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        cumulative, running = [], 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+class InMemoryMetrics(MetricsInterface):
+    """
+    Thread-safe in-process recorder that can be exported as Prometheus text or a JSON snapshot.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(self._labels(labels), 0)
+
+    def histogram_count(self, name: str, **labels: str) -> int:
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(self._labels(labels))
+            return histogram.count if histogram else 0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for name, series in sorted(self._counters.items())
+                    for labels, value in series.items()
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(
+                            zip(
+                                [str(bound) for bound in self.buckets] + ["+Inf"],
+                                histogram.cumulative_counts(),
+                            )
+                        ),
+                    }
+                    for name, series in sorted(self._histograms.items())
+                    for labels, histogram in series.items()
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in pairs
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series.items():
+                    bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.cumulative_counts()):
+                        lines.append(
+                            f"{name}_bucket{self._format_labels(labels, (('le', bound),))} {count}"
+                        )
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics: MetricsInterface = NullMetrics()
+
+
+def get_metrics() -> MetricsInterface:
+    return _metrics
+
+
+def set_metrics(metrics: MetricsInterface) -> MetricsInterface:
+    """
+    Install the recorder used by every instrumented stage and return the previous one.
+    """
+    global _metrics
+    previous, _metrics = _metrics, metrics
+    return previous
@@ -0,0 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+def run_coroutine(coroutine: Coroutine[object, object, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    asyncio.run refuses to start inside a running event loop, e.g. when a sync method is
+    called from a notebook or an async application, so there the coroutine gets a loop of
+    its own in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
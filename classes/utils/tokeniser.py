@@ -0,0 +1,18 @@
+import re
+from typing import List
+
+# Single characters are never kept.
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have he her his in is it its of on or
+    said she that the their they this to was were which will with would
+    """.split()
+)
+
+
+def tokenise(text: str) -> List[str]:
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS
+    ]
@@ -0,0 +1,39 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMETERS = frozenset(
+    {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ocid", "cmpid", "ito"}
+)
+TRACKING_PREFIXES = ("utm_", "at_", "ns_")
+
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def is_tracking_parameter(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMETERS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalise_url(url: str) -> str:
+    """
+    Normalise an article link so that the same story always maps to the same key.
+
+    Lowercases the scheme and host, drops default ports, fragments, tracking query
+    parameters and trailing slashes, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{parts.port}"
+
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not is_tracking_parameter(name)
+        )
+    )
+    return urlunsplit((scheme, netloc, path, query, ""))
@@ -1,24 +1,272 @@
+import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 
-from classes.services.article_parsers import NewspaperArticleParser
-from classes.services.feed_parsers import FeedParser
+from classes.services.archive_replay import ArchiveReplay
+from classes.services.article_cache import ArticleCache, CachedArticleParser
+from classes.services.article_parsers import ARTICLE_PARSERS, get_article_parser
+from classes.services.article_sinks import (
+    ArticleSinkInterface,
+    BackgroundSink,
+    JsonlArticleSink,
+    MultiSink,
+    ParquetArticleSink,
+)
+from classes.services.feed_cache import FeedCache
+from classes.services.feed_parsers import AsyncFeedParser
+from classes.services.feed_scheduler import FeedScheduler
 from classes.services.feed_service import FeedService
+from classes.services.host_health import CLOSED, HostHealth
 from classes.services.news_providers import NewsProviders
 from classes.services.orchestrator import Orchestrator
+from classes.services.page_archive import PageArchive
+from classes.services.queue_workers import (
+    ArticleWorker,
+    FeedWorker,
+    enqueue_feeds,
+    polling_round,
+)
+from classes.services.seen_entry_store import SeenEntryStore
+from classes.services.transport import HttpTransport
+from classes.services.work_queue import SQLiteWorkQueue
+from classes.utils.logger import logger
+from classes.utils.metrics import InMemoryMetrics, set_metrics
+
+if TYPE_CHECKING:
+    from classes.services.near_duplicates import NearDuplicateDetector
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fetch and parse news feeds.")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and poll each feed on its own adaptive interval.",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=sorted(ARTICLE_PARSERS),
+        default="newspaper",
+        help="Article extraction backend.",
+    )
+    parser.add_argument(
+        "--drop-near-duplicates",
+        action="store_true",
+        help="Drop articles whose body nearly matches an earlier one instead of only tagging them.",
+    )
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        help="Directory of a compressed archive to store every downloaded article page in.",
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        help="Re-extract the pages of this archive with --parser, in parallel and offline, "
+        "instead of crawling.",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        help="SQLite work queue shared with other processes. Requires --role.",
+    )
+    parser.add_argument(
+        "--role",
+        choices=["producer", "feed-worker", "article-worker"],
+        help="With --queue: queue this round's feeds, fetch queued feeds, or extract queued "
+        "articles. A round lasts --min-interval seconds. Workers stop once the queue is "
+        "empty unless --daemon is set.",
+    )
+    parser.add_argument(
+        "--queue-retention",
+        type=float,
+        default=7 * 24 * 60 * 60,
+        help="With --queue: seconds finished and dead jobs are kept before the producer "
+        "purges them. Links are not queued again while their job is kept.",
+    )
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Seconds a run may take. Whatever completed is kept and the rest is reported as skipped.",
+    )
+    parser.add_argument(
+        "--article-timeout",
+        type=float,
+        help="Seconds a single article may take before it's abandoned.",
+    )
+    parser.add_argument("--min-interval", type=float, default=60.0)
+    parser.add_argument("--max-interval", type=float, default=3600.0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Directory to write parsed articles to, in rotating batched files.",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help="Directory of a search index to add parsed articles to.",
+    )
+    parser.add_argument("--output-format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--compression", choices=["gzip", "zstd", "none"], default="gzip")
+    parser.add_argument(
+        "--metrics-output",
+        type=Path,
+        help="Write stage metrics on exit, as JSON for a .json path and Prometheus text otherwise.",
+    )
+    args = parser.parse_args()
+    if (args.queue is None) != (args.role is None):
+        parser.error("--queue and --role must be used together")
+    if args.replay is not None and args.output is None and args.index is None:
+        parser.error("--replay needs --output or --index to keep the re-extracted articles")
+    return args
+
+
+def write_metrics(metrics: InMemoryMetrics, path: Path):
+    if path.suffix == ".json":
+        path.write_text(metrics.to_json(), encoding="utf-8")
+    else:
+        path.write_text(metrics.to_prometheus(), encoding="utf-8")
+
+
+def build_sink(args, news_providers: NewsProviders) -> Optional[ArticleSinkInterface]:
+    sinks = []
+    if args.output is not None:
+        compression = None if args.compression == "none" else args.compression
+        if args.output_format == "parquet":
+            sink = ParquetArticleSink(args.output, compression=compression)
+        else:
+            sink = JsonlArticleSink(args.output, compression=compression)
+        sinks.append(BackgroundSink(sink))
+    if args.index is not None:
+        # numpy is only worth importing when the index is used.
+        from classes.services.search_index import SearchIndex
+
+        sinks.append(
+            BackgroundSink(
+                SearchIndex(args.index, provider_names=news_providers.names_by_base_url())
+            )
+        )
+
+    if not sinks:
+        return None
+    return sinks[0] if len(sinks) == 1 else MultiSink(*sinks)
+
+
+def build_near_duplicates(args, cache_directory: Path) -> Optional["NearDuplicateDetector"]:
+    # Replays and the producer and feed-worker roles extract nothing, and numpy is only
+    # worth importing when articles are.
+    if args.replay is not None or args.role in ("producer", "feed-worker"):
+        return None
+    from classes.services.near_duplicates import NearDuplicateDetector
+
+    return NearDuplicateDetector(
+        drop_duplicates=args.drop_near_duplicates,
+        path=cache_directory / "near_duplicates.sqlite3",
+    )
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    metrics = InMemoryMetrics()
+    if args.metrics_output:
+        set_metrics(metrics)
+
     config_directory = Path(__file__).parent / "config" / "news_providers.json"
+    cache_directory = Path(__file__).parent / ".cache"
     news_providers = NewsProviders.init_from_config(path=config_directory)
 
-    feed_service = FeedService(FeedParser())
+    # One keep-alive connection pool, rate limiter and circuit breaker for feeds and articles.
+    transport = HttpTransport(pool_maxsize=16, health=HostHealth())
+    feed_service = FeedService(
+        AsyncFeedParser(
+            transport=transport, cache=FeedCache(cache_directory / "feeds.sqlite3")
+        )
+    )
 
+    archive = PageArchive(args.archive) if args.archive is not None else None
     orchestrator = Orchestrator(
-        article_parser=NewspaperArticleParser(),
+        article_parser=CachedArticleParser(
+            get_article_parser(args.parser, transport=transport, archive=archive),
+            ArticleCache(cache_directory / "articles.sqlite3"),
+        ),
         feed_service=feed_service,
         news_providers=news_providers,
+        max_workers=8,
+        max_per_host=4,
+        seen_store=SeenEntryStore(cache_directory / "seen.sqlite3"),
+        near_duplicates=build_near_duplicates(args, cache_directory),
     )
-    orchestrator.process(limit=5)
 
-    pass
+    sink = build_sink(args, news_providers)
+    try:
+        if args.replay is not None:
+            replay_archive = PageArchive(args.replay)
+            try:
+                replay = ArchiveReplay(replay_archive, parser_name=args.parser)
+                for article in replay.run():
+                    sink.write(article)
+            finally:
+                replay_archive.close()
+            logger.info(
+                "Re-extracted %s archived articles, %s failed", replay.extracted, replay.failed
+            )
+        elif args.queue is not None:
+            queue = SQLiteWorkQueue(args.queue)
+            if args.role == "producer":
+                queue.purge(older_than=args.queue_retention)
+                enqueue_feeds(
+                    queue,
+                    news_providers,
+                    run_id=polling_round(args.min_interval),
+                    limit=args.limit,
+                )
+            else:
+                if args.role == "feed-worker":
+                    worker = FeedWorker(queue, feed_service, max_workers=4)
+                else:
+                    worker = ArticleWorker(queue, orchestrator, sink=sink)
+                try:
+                    worker.run(stop_when_idle=not args.daemon)
+                except KeyboardInterrupt:
+                    pass
+            queue.close()
+        elif args.daemon:
+            scheduler = FeedScheduler(
+                orchestrator,
+                min_interval=args.min_interval,
+                max_interval=args.max_interval,
+                initial_interval=args.min_interval,
+                limit=args.limit,
+            )
+            def on_article(article):
+                logger.info("Parsed article %s", article.url)
+                if sink is not None:
+                    sink.write(article)
+
+            try:
+                scheduler.run(on_article=on_article)
+            except KeyboardInterrupt:
+                scheduler.stop()
+        elif sink is not None:
+            orchestrator.write_to(
+                sink,
+                limit=args.limit,
+                budget=args.budget,
+                article_timeout=args.article_timeout,
+            )
+        else:
+            orchestrator.process(
+                limit=args.limit, budget=args.budget, article_timeout=args.article_timeout
+            )
+    finally:
+        if sink is not None:
+            sink.close()
+        if archive is not None:
+            archive.close()
+        for state in transport.health.states().values():
+            if state.circuit != CLOSED or state.rate < transport.health.rate:
+                logger.warning("Unhealthy host: %s", state.model_dump_json())
+        if args.metrics_output:
+            write_metrics(metrics, args.metrics_output)
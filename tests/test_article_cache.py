@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_cache import ArticleCache, CachedArticleParser
+
+
+def article(url: str) -> ParsedArticle:
+    return ParsedArticle(title="Title", url=url, authors=["Author"], body="Body")
+
+
+class TestArticleCache(unittest.TestCase):
+    def setUp(self):
+        self.parser = MagicMock()
+        self.parser.article_parse.side_effect = article
+
+    def test_repeat_urls_are_served_from_cache(self):
+        cache = ArticleCache(":memory:")
+        cached_parser = CachedArticleParser(self.parser, cache)
+
+        first = cached_parser.article_parse("https://news.sky.com/story/a?utm_source=rss")
+        second = cached_parser.article_parse("https://news.sky.com/story/a")
+
+        self.assertEqual(first, second)
+        self.parser.article_parse.assert_called_once()
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_expired_entries_are_refetched(self):
+        cache = ArticleCache(":memory:", ttl_seconds=60)
+        cached_parser = CachedArticleParser(self.parser, cache)
+
+        with patch("classes.services.article_cache.time.time", return_value=1000.0):
+            cached_parser.article_parse("https://news.sky.com/story/a")
+        with patch("classes.services.article_cache.time.time", return_value=1061.0):
+            cached_parser.article_parse("https://news.sky.com/story/a")
+
+        self.assertEqual(self.parser.article_parse.call_count, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ArticleCache(":memory:", ttl_seconds=None, max_entries=2)
+
+        with patch("classes.services.article_cache.time.time") as clock:
+            clock.return_value = 1.0
+            cache.put("https://example.com/a", article("https://example.com/a"))
+            clock.return_value = 2.0
+            cache.put("https://example.com/b", article("https://example.com/b"))
+            clock.return_value = 3.0
+            cache.get("https://example.com/a")
+            clock.return_value = 4.0
+            cache.put("https://example.com/c", article("https://example.com/c"))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("https://example.com/b"))
+        self.assertIsNotNone(cache.get("https://example.com/a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
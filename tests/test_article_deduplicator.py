@@ -0,0 +1,138 @@
+import unittest
+
+from classes.models.entries import CategoryByBaseUrl, Entries, EntriesByCategory
+from classes.services.article_deduplicator import ArticleDeduplicator
+from classes.utils.url_normaliser import normalise_url
+
+
+class TestNormaliseUrl(unittest.TestCase):
+    def test_strips_tracking_parameters_and_fragment(self):
+        self.assertEqual(
+            normalise_url(
+                "https://www.bbc.co.uk/news/articles/c5ypgjg2jrpo?at_medium=RSS&at_campaign=rss#comments"
+            ),
+            "https://www.bbc.co.uk/news/articles/c5ypgjg2jrpo",
+        )
+
+    def test_strips_trailing_slash_and_default_port(self):
+        self.assertEqual(
+            normalise_url("HTTPS://News.Sky.com:443/story/some-story-1/"),
+            "https://news.sky.com/story/some-story-1",
+        )
+
+    def test_keeps_meaningful_query_parameters_sorted(self):
+        self.assertEqual(
+            normalise_url("http://example.com/a?b=2&utm_source=x&a=1"),
+            "http://example.com/a?a=1&b=2",
+        )
+
+
+class TestArticleDeduplicator(unittest.TestCase):
+    def test_deduplicates_across_categories(self):
+        story = "https://news.sky.com/story/shared-1"
+        tree = CategoryByBaseUrl(
+            provider={
+                "https://feeds.skynews.com/feeds/rss": EntriesByCategory(
+                    category={
+                        "HOME": Entries(
+                            entries=[
+                                {"title": "Shared", "link": story},
+                                {"title": "Other", "link": "https://news.sky.com/story/other-2"},
+                            ]
+                        ),
+                        "UK": Entries(entries=[{"title": "Shared", "link": f"{story}/"}]),
+                        "POLITICS": Entries(
+                            entries=[{"title": "Shared", "link": f"{story}?utm_source=rss"}]
+                        ),
+                    }
+                )
+            }
+        )
+        deduplicator = ArticleDeduplicator()
+
+        jobs = deduplicator.deduplicate(tree)
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(jobs[0].link, story)
+        self.assertEqual(jobs[0].categories, ["HOME", "UK", "POLITICS"])
+        self.assertEqual(deduplicator.stats.entries, 4)
+        self.assertEqual(deduplicator.stats.fetches_avoided, 2)
+
+    def test_records_every_provider_of_a_shared_link(self):
+        story = "https://www.example.com/shared"
+        tree = CategoryByBaseUrl(
+            provider={
+                base_url: EntriesByCategory(
+                    category={category: Entries(entries=[{"title": "Shared", "link": story}])}
+                )
+                for base_url, category in [
+                    ("https://feeds.bbci.co.uk/news", "WORLD"),
+                    ("https://feeds.skynews.com/feeds/rss", "HOME"),
+                ]
+            }
+        )
+
+        (job,) = ArticleDeduplicator().deduplicate(tree)
+
+        self.assertEqual(job.provider, "https://feeds.bbci.co.uk/news")
+        self.assertEqual(
+            job.providers,
+            ["https://feeds.bbci.co.uk/news", "https://feeds.skynews.com/feeds/rss"],
+        )
+        self.assertEqual(job.categories, ["WORLD", "HOME"])
+
+    def test_limit_applies_per_category(self):
+        tree = CategoryByBaseUrl(
+            provider={
+                "https://feeds.bbci.co.uk/news": EntriesByCategory(
+                    category={
+                        "TOP_STORIES": Entries(
+                            entries=[
+                                {"title": str(i), "link": f"https://www.bbc.co.uk/news/{i}"}
+                                for i in range(5)
+                            ]
+                        )
+                    }
+                )
+            }
+        )
+        self.assertEqual(len(ArticleDeduplicator().deduplicate(tree, limit=2)), 2)
+
+    def test_priority_orders_top_stories_first(self):
+        def feed(prefix, count):
+            return Entries(
+                entries=[
+                    {"title": str(i), "link": f"https://{prefix}.test/{i}"}
+                    for i in range(count)
+                ]
+            )
+
+        tree = CategoryByBaseUrl(
+            provider={
+                "https://bbc.test": EntriesByCategory(
+                    category={"WORLD": feed("world", 2), "TOP_STORIES": feed("top", 2)}
+                ),
+                "https://sky.test": EntriesByCategory(category={"HOME": feed("home", 2)}),
+            }
+        )
+        weights = {"TOP_STORIES": 10.0, "HOME": 10.0}
+
+        jobs = ArticleDeduplicator().deduplicate(
+            tree, priority=lambda provider, category: weights.get(category, 1.0)
+        )
+
+        self.assertEqual(
+            [job.url for job in jobs],
+            [
+                "https://top.test/0",
+                "https://home.test/0",
+                "https://top.test/1",
+                "https://home.test/1",
+                "https://world.test/0",
+                "https://world.test/1",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
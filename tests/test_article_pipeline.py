@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+
+from benchmarks.stand_in_server import StandInServer
+from classes.services.article_parsers import GooseArticleParser, NewspaperArticleParser
+from classes.services.article_pipeline import PipelinedArticleParser
+from classes.services.page_archive import PageArchive
+
+
+class TestPipelinedArticleParser(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+        self.url = f"{self.server.base_url}/articles/story-1"
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_extracts_in_worker_process(self):
+        for parser_class in (NewspaperArticleParser, GooseArticleParser):
+            with self.subTest(parser_class=parser_class.__name__):
+                parser = PipelinedArticleParser(parser_class, max_processes=1)
+                try:
+                    article = parser.article_parse(self.url)
+                finally:
+                    parser.close()
+
+                self.assertEqual(article.title, "Stand-in story story-1")
+                self.assertEqual(article.url, self.url)
+                self.assertIn("Paragraph 0 of story story-1", article.body)
+
+    def test_downloads_are_archived(self):
+        with tempfile.TemporaryDirectory() as directory:
+            archive = PageArchive(directory)
+            parser = PipelinedArticleParser(max_processes=1, archive=archive)
+            try:
+                parser.article_parse(self.url)
+                start_method = parser.executor._mp_context.get_start_method()
+            finally:
+                parser.close()
+
+            self.assertIn("Paragraph 0 of story story-1", archive.get(self.url))
+            self.assertEqual(start_method, "spawn")
+            archive.close()
+
+    def test_rejects_invalid_process_count(self):
+        with self.assertRaises(ValueError):
+            PipelinedArticleParser(max_processes=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+import gzip
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_sinks import (
+    ArticleSinkInterface,
+    BackgroundSink,
+    JsonlArticleSink,
+    ParquetArticleSink,
+)
+from classes.services.orchestrator import Orchestrator
+from classes.services.news_providers import NewsProviders
+from tests.test_orchestrator import build_tree
+
+
+def article(index: int) -> ParsedArticle:
+    return ParsedArticle(
+        title=f"Story {index}",
+        url=f"https://example.com/{index}",
+        authors=["Reporter"],
+        body="Body " * 20,
+        provider="https://example.com/",
+        categories=["HOME"],
+    )
+
+
+def read_jsonl(paths):
+    return [json.loads(line) for path in paths for line in gzip.open(path, "rt")]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestJsonlArticleSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_batches_and_rotates_files(self):
+        with JsonlArticleSink(self.path, batch_size=3, max_file_records=4, run_id="run") as sink:
+            for index in range(2):
+                sink.write(article(index))
+            self.assertEqual(sink.paths, [])
+            for index in range(2, 10):
+                sink.write(article(index))
+
+        self.assertEqual(
+            [path.name for path in sink.paths],
+            [
+                "articles-run-00000.jsonl.gz",
+                "articles-run-00001.jsonl.gz",
+                "articles-run-00002.jsonl.gz",
+            ],
+        )
+        records = read_jsonl(sink.paths)
+        self.assertEqual(
+            [record["title"] for record in records], [f"Story {i}" for i in range(10)]
+        )
+        self.assertEqual(ParsedArticle(**records[0]), article(0))
+
+    def test_flushes_on_size_and_time(self):
+        clock = FakeClock()
+        sink = JsonlArticleSink(
+            self.path, batch_size=100, batch_bytes=400, flush_interval=5.0, clock=clock
+        )
+        sink.write(article(0))
+        sink.write(article(1))
+        self.assertEqual(len(sink.paths), 1)
+
+        sink.write(article(2))
+        sink.poll()
+        self.assertEqual(sink._buffer, [sink._record(article(2))])
+        clock.now = 5.0
+        sink.poll()
+        self.assertEqual(sink._buffer, [])
+        sink.close()
+
+        self.assertEqual(len(read_jsonl(sink.paths)), 3)
+
+    def test_uncompressed(self):
+        with JsonlArticleSink(self.path, compression=None, run_id="run") as sink:
+            sink.write(article(0))
+
+        self.assertEqual(sink.paths[0].name, "articles-run-00000.jsonl")
+        self.assertEqual(json.loads(sink.paths[0].read_text())["url"], "https://example.com/0")
+
+    def test_later_runs_never_overwrite_earlier_files(self):
+        for index in range(2):
+            # The same run_id stands in for two processes started in the same second.
+            with JsonlArticleSink(self.path, run_id="run") as sink:
+                sink.write(article(index))
+
+        paths = sorted(self.path.iterdir())
+        self.assertEqual(
+            [path.name for path in paths],
+            ["articles-run-00000.jsonl.gz", "articles-run-00001.jsonl.gz"],
+        )
+        self.assertEqual(
+            [record["title"] for record in read_jsonl(paths)], ["Story 0", "Story 1"]
+        )
+
+    def test_run_id_defaults_to_time_and_process(self):
+        with JsonlArticleSink(self.path) as sink:
+            sink.write(article(0))
+
+        self.assertIn(f"-{os.getpid()}-00000.jsonl.gz", sink.paths[0].name)
+
+    @unittest.skipUnless(importlib.util.find_spec("zstandard"), "zstandard not installed")
+    def test_zstd(self):
+        import zstandard
+
+        with JsonlArticleSink(self.path, compression="zstd") as sink:
+            sink.write(article(0))
+
+        with zstandard.open(sink.paths[0], "rt") as lines:
+            self.assertEqual(json.loads(next(lines))["title"], "Story 0")
+
+    def test_rejects_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            JsonlArticleSink(self.path, compression="lz4")
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+class TestParquetArticleSink(unittest.TestCase):
+    def test_writes_row_groups(self):
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            with ParquetArticleSink(directory, batch_size=2) as sink:
+                for index in range(5):
+                    sink.write(article(index))
+
+            parquet_file = pyarrow.parquet.ParquetFile(sink.paths[0])
+            self.assertEqual(parquet_file.metadata.num_rows, 5)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+            self.assertEqual(parquet_file.read(columns=["title"])["title"][4].as_py(), "Story 4")
+
+    def test_keeps_every_article_field(self):
+        import pyarrow.parquet
+
+        shared = article(0)
+        shared.providers = ["https://bbc.test/", "https://sky.test/"]
+        with tempfile.TemporaryDirectory() as directory:
+            with ParquetArticleSink(directory) as sink:
+                sink.write(shared)
+
+            (row,) = pyarrow.parquet.read_table(sink.paths[0]).to_pylist()
+            self.assertEqual(ParsedArticle(**row), shared)
+
+
+class FailingSink(ArticleSinkInterface):
+    def write(self, article: ParsedArticle):
+        raise OSError("disk full")
+
+
+class TestBackgroundSink(unittest.TestCase):
+    def test_writes_everything_before_closing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            inner = JsonlArticleSink(directory, batch_size=10)
+            with BackgroundSink(inner, max_queue=2) as sink:
+                for index in range(25):
+                    sink.write(article(index))
+
+            self.assertEqual(len(read_jsonl(inner.paths)), 25)
+
+    def test_flush_waits_for_the_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            inner = JsonlArticleSink(
+                directory, compression=None, batch_size=100, flush_interval=None
+            )
+            sink = BackgroundSink(inner)
+            for index in range(5):
+                sink.write(article(index))
+            sink.flush()
+
+            self.assertEqual(len(inner.paths[0].read_text().splitlines()), 5)
+            sink.close()
+
+    def test_writer_errors_are_raised(self):
+        sink = BackgroundSink(FailingSink())
+        sink.write(article(0))
+        with self.assertRaises(OSError):
+            sink.close()
+
+
+class TestOrchestratorWriteTo(unittest.TestCase):
+    def test_streams_articles_into_sink(self):
+        article_parser = MagicMock()
+        article_parser.article_parse.side_effect = lambda url: ParsedArticle(
+            title="t", url=url, authors=[], body="b"
+        )
+        orchestrator = Orchestrator(article_parser, MagicMock(), NewsProviders())
+        orchestrator._fetch_categories_by_provider = lambda: build_tree(
+            ["a.test", "b.test"], per_category=3
+        )
+        sink = MagicMock(spec=ArticleSinkInterface)
+
+        written = orchestrator.write_to(sink)
+
+        self.assertEqual(written, sink.write.call_count)
+        self.assertGreater(written, 0)
+        sink.flush.assert_called_once()
+        sink.close.assert_not_called()
+        self.assertIsNone(orchestrator.parsed_articles)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import requests
+
+from benchmarks.run_benchmarks import percentile, regressions
+from benchmarks.stand_in_server import StandInServer
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_percentile(self):
+        samples = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(samples, 0.50), 50.0)
+        self.assertEqual(percentile(samples, 0.95), 95.0)
+        self.assertEqual(percentile(samples, 0.99), 99.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_regressions(self):
+        baseline = {"stages": {"feed_parser": {"p95_ms": 10.0, "throughput": 100.0}}}
+        report = {"stages": {"feed_parser": {"p95_ms": 13.0, "throughput": 70.0}}}
+
+        self.assertEqual(len(regressions(report, baseline, tolerance=0.2)), 2)
+        self.assertEqual(regressions(report, baseline, tolerance=0.5), [])
+
+    def test_stand_in_replays_recorded_feed_and_injects_errors(self):
+        with StandInServer() as server:
+            feed = requests.get(f"{server.base_url}/feeds/sky_news/home.xml", timeout=5)
+            self.assertIn("Home News - Sky News", feed.text)
+            self.assertIn(f"{server.base_url}/articles/sky/story/", feed.text)
+
+        with StandInServer(error_rate=1.0) as server:
+            response = requests.get(f"{server.base_url}/articles/sky/story/1", timeout=5)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual((server.requests, server.errors), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
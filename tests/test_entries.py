@@ -0,0 +1,33 @@
+import unittest
+
+import feedparser
+from pydantic import ValidationError
+
+from classes.models.entries import CompactEntry, Entries, Entry
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>Article 1</title><link>http://example.com/1</link><description>Body</description></item>
+<item><title>Article 2</title><link>http://example.com/2</link></item>
+</channel></rss>"""
+
+
+class TestEntriesConstruction(unittest.TestCase):
+    def test_from_feed_entries_matches_full_validation(self):
+        feed_entries = feedparser.parse(RSS)["entries"]
+        self.assertEqual(
+            Entries.from_feed_entries(feed_entries, ttl=60),
+            Entries(entries=feed_entries, ttl=60),
+        )
+
+    def test_from_feed_entries_still_validates(self):
+        with self.assertRaises(ValidationError):
+            Entries.from_feed_entries([{"title": "No link"}])
+
+    def test_from_compact(self):
+        entries = Entries.from_compact([CompactEntry("Article", "http://example.com/1")])
+        self.assertEqual(entries.entries, [Entry(title="Article", link="http://example.com/1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from benchmarks.stand_in_server import StandInServer
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import (
+    ArticleExtractionError,
+    FallbackArticleParser,
+    HttpArticleParser,
+    NewsArticleParserInterface,
+)
+
+
+class RecordingParser(HttpArticleParser):
+    def __init__(self, body: str = "", error: Exception = None):
+        self.body = body
+        self.error = error
+        self.calls = []
+
+    def article_parse(self, article_url: str) -> ParsedArticle:
+        raise AssertionError("The fallback parser must not download articles again")
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        self.calls.append(article_url)
+        if self.error is not None:
+            raise self.error
+        return ParsedArticle(title="Title", url=article_url, authors=[], body=self.body)
+
+
+class TestFallbackArticleParser(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_downloads_once_and_remembers_the_winning_backend(self):
+        empty = RecordingParser(body="too short")
+        failing = RecordingParser(error=RuntimeError("boom"))
+        full = RecordingParser(body="x" * 500)
+        parser = FallbackArticleParser(backends=[empty, failing, full], min_body_length=100)
+
+        first = parser.article_parse(f"{self.server.base_url}/articles/story-1")
+        second = parser.article_parse(f"{self.server.base_url}/articles/story-2")
+
+        self.assertEqual(first.body, "x" * 500)
+        self.assertEqual(second.url, f"{self.server.base_url}/articles/story-2")
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(empty.calls), 1)
+        self.assertEqual(len(failing.calls), 1)
+        self.assertEqual(len(full.calls), 2)
+        self.assertEqual(parser.preferred_backends, {"127.0.0.1": 2})
+
+    def test_raises_when_no_backend_is_acceptable(self):
+        parser = FallbackArticleParser(backends=[RecordingParser(body="")])
+
+        with self.assertRaises(ArticleExtractionError):
+            parser.article_parse_html("https://example.com/story", "<html></html>")
+
+    def test_real_backends_extract_stand_in_article(self):
+        parser = FallbackArticleParser()
+        article = parser.article_parse(f"{self.server.base_url}/articles/story-1")
+
+        self.assertEqual(article.title, "Stand-in story story-1")
+        self.assertEqual(self.server.requests, 1)
+
+    def test_requires_a_backend(self):
+        with self.assertRaises(ValueError):
+            FallbackArticleParser(backends=[])
+
+    def test_backends_must_extract_from_html(self):
+        class DownloadOnlyParser(NewsArticleParserInterface):
+            def article_parse(self, article_url: str) -> ParsedArticle:
+                raise AssertionError("not called")
+
+        with self.assertRaises(ValueError):
+            FallbackArticleParser(backends=[DownloadOnlyParser()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import feedparser
+
+from benchmarks.stand_in_server import FIXTURES_DIRECTORY, StandInServer
+from classes.services.feed_parsers import FastFeedParser, FeedParser
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<title>Example</title>
+<entry><title>A &amp; B</title><link rel="alternate" href="http://example.com/1"/></entry>
+<entry><title>C</title><link rel="self" href="http://example.com/self"/><link href="http://example.com/2"/></entry>
+</feed>"""
+
+
+class TestFastFeedParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = FastFeedParser()
+        self.document = (
+            (FIXTURES_DIRECTORY / "feeds" / "sky_news" / "home.xml")
+            .read_bytes()
+            .replace(b"{base_url}", b"http://127.0.0.1")
+        )
+
+    def tearDown(self):
+        self.parser.close()
+
+    def test_matches_feedparser(self):
+        expected = FeedParser._to_entries(feedparser.parse(self.document), None)
+        self.assertEqual(self.parser.parse_chunks([self.document]), expected)
+
+    def test_stops_reading_at_limit(self):
+        chunks = iter([self.document[i : i + 1024] for i in range(0, len(self.document), 1024)])
+        entries = self.parser.parse_chunks(chunks, limit=2)
+
+        self.assertEqual(len(entries.entries), 2)
+        self.assertGreater(len(list(chunks)), 0)
+
+    def test_atom(self):
+        entries = self.parser.parse_chunks([ATOM])
+        self.assertEqual(
+            [(entry.title, entry.link) for entry in entries.entries],
+            [("A & B", "http://example.com/1"), ("C", "http://example.com/2")],
+        )
+
+    def test_falls_back_to_feedparser_on_malformed_xml(self):
+        malformed = b"<rss><channel><item><title>T&nbsp;</title><link>http://example.com/1</link></item></channel></rss>"
+        entries = self.parser.parse_chunks([malformed])
+        self.assertEqual(entries.entries[0].link, "http://example.com/1")
+
+    def test_parse_from_server(self):
+        with StandInServer() as server:
+            entries = self.parser.parse(f"{server.base_url}/feeds/bbc_news/top_stories.xml", limit=3)
+        self.assertEqual(len(entries.entries), 3)
+        self.assertEqual(entries.ttl, 900)
+
+
+if __name__ == "__main__":
+    unittest.main()
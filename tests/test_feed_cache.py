@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from benchmarks.stand_in_server import StandInServer
+from classes.services.feed_cache import FeedCache
+from classes.services.feed_parsers import AsyncFeedParser, FeedParser
+
+
+class TestFeedCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.directory.name) / "feeds.sqlite3"
+        self.server = StandInServer(feed_items=5).__enter__()
+        self.url = f"{self.server.base_url}/feeds/home.xml"
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.directory.cleanup()
+
+    def test_not_modified_feed_served_from_cache(self):
+        parser = FeedParser(cache=FeedCache(self.cache_path))
+        first = parser.parse(self.url)
+
+        with patch.object(FeedParser, "_to_entries") as to_entries:
+            second = parser.parse(self.url, limit=2)
+            to_entries.assert_not_called()
+
+        self.assertEqual(len(first.entries), 5)
+        self.assertEqual(second.entries, first.entries[:2])
+        self.assertEqual(parser.cache.stats.hits, 1)
+        self.assertEqual(parser.cache.stats.misses, 1)
+
+    def test_cache_persists_between_instances(self):
+        FeedParser(cache=FeedCache(self.cache_path)).parse(self.url)
+
+        cache = FeedCache(self.cache_path)
+        entries = AsyncFeedParser(cache=cache).parse(self.url)
+
+        self.assertEqual(len(entries.entries), 5)
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 0)
+
+    def test_feed_without_validators_is_not_stored(self):
+        cache = FeedCache(self.cache_path)
+        transport = MagicMock()
+        transport.get.return_value.status_code = 200
+        transport.get.return_value.headers = {}
+        with patch("classes.services.feed_parsers.feedparser.parse") as mock_parse:
+            mock_parse.return_value = {
+                "entries": [{"title": "Article", "link": "http://example.com"}]
+            }
+            FeedParser(cache=cache, transport=transport).parse("http://example.com/rss.xml")
+
+        self.assertIsNone(cache.get("http://example.com/rss.xml"))
+        self.assertIsNone(FeedCache(self.cache_path).get("http://example.com/rss.xml"))
+
+    def test_cached_feed_survives_responses_that_cant_replace_it(self):
+        cache = FeedCache(self.cache_path)
+        parser = FeedParser(cache=cache)
+        parser.parse(self.url)
+        cached = cache.get(self.url)
+
+        transport = MagicMock()
+        transport.get.return_value.status_code = 200
+        valid_feed = (
+            b"<rss><channel><item><title>t</title><link>http://a.test/1</link></item>"
+            b"</channel></rss>"
+        )
+        for headers, body in [
+            ({}, valid_feed),
+            ({"ETag": '"error"'}, b"<html><body>Service unavailable</body></html>"),
+        ]:
+            transport.get.return_value.headers = headers
+            transport.get.return_value.content = body
+            FeedParser(cache=cache, transport=transport).parse(self.url)
+
+        self.assertEqual(cache.get(self.url), cached)
+        self.assertEqual(FeedCache(self.cache_path).get(self.url), cached)
+
+    def test_processes_sharing_a_path_keep_each_others_feeds(self):
+        first, second = FeedCache(self.cache_path), FeedCache(self.cache_path)
+        FeedParser(cache=first).parse(self.url)
+        other_url = f"{self.server.base_url}/feeds/world.xml"
+        FeedParser(cache=second).parse(other_url)
+
+        reopened = FeedCache(self.cache_path)
+        self.assertIsNotNone(reopened.get(self.url))
+        self.assertIsNotNone(reopened.get(other_url))
+        self.assertIsNotNone(second.get(self.url))
+
+
+if __name__ == "__main__":
+    unittest.main()
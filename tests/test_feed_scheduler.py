@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import MagicMock
+
+from classes.models.entries import Entries
+from classes.models.news_provider import NewsProvider
+from classes.models.parsed_article import ParsedArticle
+from classes.services.feed_scheduler import FeedScheduler
+from classes.services.feed_service import FeedService
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+
+
+def entries(*stories, ttl=None):
+    return Entries(
+        entries=[{"title": story, "link": f"https://news.sky.com/story/{story}"} for story in stories],
+        ttl=ttl,
+    )
+
+
+class TestFeedScheduler(unittest.TestCase):
+    def setUp(self):
+        news_providers = NewsProviders()
+        news_providers.register_provider(
+            "sky_news",
+            NewsProvider(
+                base_url="https://feeds.skynews.com/feeds/rss",
+                categories={"HOME": "/home.xml", "STRANGE": "/strange.xml"},
+            ),
+        )
+        self.feeds = {"/home.xml": entries("a", "b"), "/strange.xml": entries("x")}
+        self.feed_service = FeedService(MagicMock())
+        self.feed_service.parse_feed = MagicMock(
+            side_effect=lambda base_url, path, limit: self.feeds[path]
+        )
+        article_parser = MagicMock()
+        article_parser.article_parse.side_effect = lambda url: ParsedArticle(
+            title="t", url=url, authors=[], body="b"
+        )
+        self.orchestrator = Orchestrator(article_parser, self.feed_service, news_providers)
+        self.scheduler = FeedScheduler(
+            self.orchestrator,
+            min_interval=10,
+            max_interval=1000,
+            initial_interval=100,
+            jitter=0,
+            clock=lambda: 0.0,
+        )
+        self.home, self.strange = self.scheduler.schedules
+
+    def test_only_new_entries_are_extracted(self):
+        first = [article.url for article in self.scheduler.poll(now=0)]
+        self.feeds["/home.xml"] = entries("c", "a", "b")
+        second = [article.url for article in self.scheduler.poll(now=10_000)]
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(second, ["https://news.sky.com/story/c"])
+
+    def test_busy_feeds_speed_up_and_quiet_feeds_back_off(self):
+        list(self.scheduler.poll(now=0))
+        self.feeds["/home.xml"] = entries("c", "d", "a", "b")
+        list(self.scheduler.poll(now=10_000))
+
+        self.assertAlmostEqual(self.home.interval, 100 / 2)
+        self.assertAlmostEqual(self.strange.interval, 100 * 1.5)
+
+    def test_interval_respects_ttl(self):
+        self.feeds["/strange.xml"] = entries("x", ttl=600)
+        list(self.scheduler.poll(now=0))
+
+        self.assertEqual(self.strange.interval, 600)
+        self.assertEqual(self.home.interval, 100)
+
+    def test_first_poll_is_a_baseline(self):
+        list(self.scheduler.poll(now=0))
+
+        # Every entry is new on the first poll, which says nothing about how busy a feed is.
+        self.assertEqual((self.home.interval, self.strange.interval), (100, 100))
+        self.assertTrue(self.home.has_baseline)
+
+    def test_interval_respects_bounds(self):
+        for poll in range(20):
+            list(self.scheduler.poll(now=poll * 10_000))
+        self.assertEqual(self.home.interval, 1000)
+
+        for poll in range(20):
+            self.feeds["/home.xml"] = entries(f"new-{poll}")
+            list(self.scheduler.poll(now=10**6 + poll * 10_000))
+        self.assertEqual(self.home.interval, 10)
+
+    def test_failed_poll_backs_off(self):
+        self.feed_service.parse_feed.side_effect = RuntimeError("boom")
+        self.assertEqual(list(self.scheduler.poll(now=0)), [])
+        self.assertEqual(self.home.interval, 225)
+
+    def test_run_stops_after_max_polls(self):
+        on_article = MagicMock()
+        self.scheduler.run(on_article=on_article, max_polls=1)
+        self.assertEqual(on_article.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from classes.models.entries import CategoryByBaseUrl, EntriesByCategory
+from classes.models.news_provider import NewsProvider
+from classes.services.feed_parsers import AsyncFeedParser, FeedParser
+from classes.services.feed_service import FeedService
+from classes.services.host_health import HostUnavailable
+from classes.services.news_providers import NewsProviders
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>Article 1</title><link>http://example.com/1</link></item>
+<item><title>Article 2</title><link>http://example.com/2</link></item>
+</channel></rss>"""
+
+
+def build_providers():
+    news_providers = NewsProviders()
+    news_providers.register_provider(
+        "sky_news",
+        NewsProvider(
+            base_url="https://feeds.skynews.com/feeds/rss",
+            categories={"HOME": "/home.xml", "UK": "/uk.xml"},
+        ),
+    )
+    news_providers.register_provider(
+        "bbc_news",
+        NewsProvider(
+            base_url="https://feeds.bbci.co.uk/news",
+            categories={"TOP_STORIES": "/rss.xml"},
+        ),
+    )
+    return news_providers
+
+
+class TestAsyncFeedService(unittest.TestCase):
+    def setUp(self):
+        self.transport = MagicMock()
+        self.transport.get.return_value.content = RSS
+        self.parser = AsyncFeedParser(transport=self.transport)
+        self.service = FeedService(self.parser)
+
+    def tearDown(self):
+        self.parser.close()
+
+    def test_aparse_all_providers(self):
+        result = asyncio.run(self.service.aparse_all_providers(build_providers(), limit=1))
+
+        self.assertIsInstance(result, CategoryByBaseUrl)
+        self.assertEqual(self.transport.get.call_count, 3)
+        sky, bbc = result.provider.values()
+        self.assertEqual(set(sky.category), {"HOME", "UK"})
+        self.assertEqual(set(bbc.category), {"TOP_STORIES"})
+        self.assertEqual(len(sky.category["HOME"].entries), 1)
+        self.assertEqual(sky.category["HOME"].entries[0].link, "http://example.com/1")
+
+    def test_sync_parse_matches_async(self):
+        url = "https://feeds.skynews.com/feeds/rss/home.xml"
+        self.assertEqual(
+            self.parser.parse(url), asyncio.run(self.parser.aparse(url))
+        )
+
+    def test_aparse_all_categories_with_sync_parser(self):
+        parser = MagicMock(spec=FeedParser)
+        parser.parse.return_value = FeedParser._to_entries({"entries": []}, None)
+        service = FeedService(parser)
+        news_provider = build_providers().providers[0]
+
+        result = asyncio.run(service.aparse_all_categories(news_provider))
+
+        self.assertIsInstance(result, EntriesByCategory)
+        self.assertEqual(parser.parse.call_count, 2)
+
+    def test_unreachable_feed_is_skipped(self):
+        parser = MagicMock(spec=FeedParser)
+        entries = FeedParser._to_entries({"entries": [{"title": "t", "link": "http://a/1"}]}, None)
+
+        def parse(url, limit=None):
+            if url.endswith("/uk.xml"):
+                raise HostUnavailable("Circuit for feeds.skynews.com is open")
+            return entries
+
+        parser.parse.side_effect = parse
+        service = FeedService(parser)
+        news_provider = build_providers().providers[0]
+
+        for result in (
+            service.parse_all_categories(news_provider),
+            asyncio.run(service.aparse_all_categories(news_provider)),
+        ):
+            self.assertEqual(len(result.category["HOME"].entries), 1)
+            self.assertEqual(result.category["UK"].entries, [])
+
+    def test_feed_that_fails_to_parse_is_skipped_by_the_async_fetch(self):
+        parser = MagicMock(spec=FeedParser)
+        entries = FeedParser._to_entries({"entries": [{"title": "t", "link": "http://a/1"}]}, None)
+
+        def parse(url, limit=None):
+            if url.endswith("/uk.xml"):
+                raise ValueError("not a feed")
+            return entries
+
+        parser.parse.side_effect = parse
+        service = FeedService(parser)
+
+        result = asyncio.run(service.aparse_all_providers(build_providers()))
+
+        sky, bbc = result.provider.values()
+        self.assertEqual(sky.category["UK"].entries, [])
+        self.assertEqual(len(sky.category["HOME"].entries), 1)
+        self.assertEqual(len(bbc.category["TOP_STORIES"].entries), 1)
+
+    def test_invalid_limit(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.parser.aparse("http://example.com/rss.xml", limit=-1))
+
+
+if __name__ == "__main__":
+    unittest.main()
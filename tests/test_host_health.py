@@ -0,0 +1,147 @@
+import time
+import unittest
+
+import requests
+
+from benchmarks.stand_in_server import StandInServer
+from classes.services.host_health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    HostHealth,
+    HostUnavailable,
+    parse_retry_after,
+)
+from classes.services.transport import HttpTransport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept += seconds
+        self.now += seconds
+
+
+class TestHostHealth(unittest.TestCase):
+    def build(self, **kwargs) -> HostHealth:
+        self.clock = FakeClock()
+        return HostHealth(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_circuit_opens_probes_once_and_closes(self):
+        health = self.build(failure_threshold=2, cooldown=10)
+        for _ in range(2):
+            health.acquire("a.test")
+            health.record("a.test", None)
+
+        self.assertEqual(health.state("a.test").circuit, OPEN)
+        with self.assertRaises(HostUnavailable):
+            health.acquire("a.test")
+        health.acquire("b.test")
+
+        self.clock.now += 10
+        health.acquire("a.test")
+        with self.assertRaises(HostUnavailable):
+            health.acquire("a.test")
+        health.record("a.test", 502)
+        state = health.state("a.test")
+        self.assertEqual((state.circuit, state.available_in), (OPEN, 20))
+
+        self.clock.now += 20
+        self.assertEqual(health.state("a.test").circuit, HALF_OPEN)
+        health.acquire("a.test")
+        health.record("a.test", 200)
+        self.assertEqual(health.state("a.test").circuit, CLOSED)
+        self.assertEqual(health.state("a.test").consecutive_failures, 0)
+
+    def test_throttling_slows_down_and_recovers(self):
+        health = self.build(rate=8, max_wait=5)
+        health.acquire("a.test")
+        health.record("a.test", 429, retry_after=2)
+
+        state = health.state("a.test")
+        self.assertEqual((state.rate, state.available_in), (4, 2))
+        self.assertEqual(state.circuit, CLOSED)
+        health.acquire("a.test")
+        self.assertEqual(self.clock.slept, 2)
+
+        health.record("a.test", 429, retry_after=30)
+        with self.assertRaises(HostUnavailable):
+            health.acquire("a.test")
+
+        # Additive increase: 0.5 requests/s per success, capped at the configured rate.
+        for _ in range(20):
+            health.record("a.test", 200)
+        self.assertEqual(health.state("a.test").rate, 8)
+
+    def test_bucket_spaces_requests(self):
+        health = self.build(rate=2, burst=1)
+        for _ in range(3):
+            health.acquire("a.test")
+        self.assertAlmostEqual(self.clock.slept, 1.0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(
+            parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=30.0), 30.0
+        )
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class TestTransportHostHealth(unittest.TestCase):
+    # The transports keep their default retries, as in main.py: error responses must
+    # still reach the HostHealth without being retried first.
+
+    def test_sick_host_is_isolated_from_healthy_one(self):
+        health = HostHealth(failure_threshold=3, cooldown=0.3)
+        transport = HttpTransport(health=health)
+        with StandInServer(error_rate=1.0) as sick, StandInServer() as healthy:
+            # Both stand-ins listen on 127.0.0.1, so the healthy one is reached by another name.
+            healthy_url = f"http://localhost:{healthy.server_address[1]}/articles/story"
+            errors = []
+            for _ in range(10):
+                try:
+                    transport.get(f"{sick.base_url}/articles/story")
+                except requests.RequestException as e:
+                    errors.append(type(e))
+                transport.get(healthy_url)
+
+            self.assertEqual(errors, [requests.HTTPError] * 3 + [HostUnavailable] * 7)
+            self.assertEqual(sick.requests, 3)
+            self.assertEqual(healthy.requests, 10)
+            states = health.states()
+            self.assertEqual(states["127.0.0.1"].circuit, OPEN)
+            self.assertEqual(states["localhost"].circuit, CLOSED)
+
+            time.sleep(0.35)
+            sick.error_rate = 0.0
+            transport.get(f"{sick.base_url}/articles/story")
+            self.assertEqual(health.state("127.0.0.1").circuit, CLOSED)
+        transport.close()
+
+    def test_retry_after_is_honoured_without_another_request(self):
+        health = HostHealth(max_wait=1)
+        transport = HttpTransport(health=health)
+        with StandInServer(error_rate=1.0, error_status=429, retry_after=5) as server:
+            url = f"{server.base_url}/articles/story"
+            with self.assertRaises(requests.HTTPError):
+                transport.get(url)
+            with self.assertRaises(HostUnavailable):
+                transport.get(url)
+            requests_made = server.requests
+        transport.close()
+
+        self.assertEqual(requests_made, 1)
+        state = health.state("127.0.0.1")
+        self.assertEqual(state.rate, health.rate / 2)
+        self.assertGreater(state.available_in, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
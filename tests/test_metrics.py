@@ -0,0 +1,96 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from classes.models.parsed_article import ParsedArticle
+from classes.services.feed_parsers import AsyncFeedParser
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.utils.metrics import InMemoryMetrics, NullMetrics, get_metrics, set_metrics
+from tests.test_orchestrator import build_tree
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>Article 1</title><link>http://example.com/1</link></item>
+</channel></rss>"""
+
+
+class TestInMemoryMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = InMemoryMetrics(buckets=(0.1, 1.0))
+
+    def test_prometheus_export(self):
+        self.metrics.increment("http_response_bytes_total", 512, host="news.sky.com")
+        self.metrics.increment("http_response_bytes_total", 256, host="news.sky.com")
+        self.metrics.observe("http_request_seconds", 0.05, host="news.sky.com")
+        self.metrics.observe("http_request_seconds", 0.5, host="news.sky.com")
+
+        exported = self.metrics.to_prometheus()
+
+        self.assertIn("# TYPE http_response_bytes_total counter", exported)
+        self.assertIn('http_response_bytes_total{host="news.sky.com"} 768', exported)
+        self.assertIn("# TYPE http_request_seconds histogram", exported)
+        self.assertIn('http_request_seconds_bucket{host="news.sky.com",le="0.1"} 1', exported)
+        self.assertIn('http_request_seconds_bucket{host="news.sky.com",le="+Inf"} 2', exported)
+        self.assertIn('http_request_seconds_count{host="news.sky.com"} 2', exported)
+
+    def test_json_snapshot(self):
+        with self.metrics.timer("feed_parse_seconds", host="feeds.bbci.co.uk"):
+            pass
+
+        snapshot = json.loads(self.metrics.to_json())
+
+        histogram = snapshot["histograms"][0]
+        self.assertEqual(histogram["name"], "feed_parse_seconds")
+        self.assertEqual(histogram["labels"], {"host": "feeds.bbci.co.uk"})
+        self.assertEqual(histogram["count"], 1)
+        self.assertEqual(histogram["buckets"]["+Inf"], 1)
+
+    def test_null_metrics_is_default(self):
+        self.assertIsInstance(get_metrics(), NullMetrics)
+        with get_metrics().timer("anything"):
+            get_metrics().increment("anything")
+
+
+class TestStageInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.metrics = InMemoryMetrics()
+        self.previous = set_metrics(self.metrics)
+
+    def tearDown(self):
+        set_metrics(self.previous)
+
+    def test_feed_stages_are_timed(self):
+        transport = MagicMock()
+        transport.get.return_value.content = RSS
+        parser = AsyncFeedParser(transport=transport)
+        parser.parse("http://feeds.example.com/rss.xml")
+        parser.close()
+
+        self.assertEqual(
+            self.metrics.histogram_count("feed_parse_seconds", host="feeds.example.com"), 1
+        )
+        self.assertEqual(self.metrics.histogram_count("entries_validation_seconds"), 1)
+
+    def test_orchestrator_counts_articles_by_status(self):
+        def article_parse(url):
+            if url.endswith("/0"):
+                raise RuntimeError("extraction failed")
+            return ParsedArticle(title="t", url=url, authors=[], body="b")
+
+        article_parser = MagicMock()
+        article_parser.article_parse.side_effect = article_parse
+        orchestrator = Orchestrator(article_parser, MagicMock(), NewsProviders())
+        orchestrator.providers_by_categories = build_tree(["a.test"], per_category=3)
+        orchestrator._parse_articles(limit=None)
+
+        self.assertEqual(
+            self.metrics.counter_value("articles_total", host="a.test", status="ok"), 2
+        )
+        self.assertEqual(
+            self.metrics.counter_value("articles_total", host="a.test", status="error"), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
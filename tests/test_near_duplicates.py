@@ -0,0 +1,126 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from classes.models.parsed_article import ParsedArticle
+from classes.services.near_duplicates import NearDuplicateDetector, fingerprint
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.seen_entry_store import SeenEntryStore
+from tests.test_orchestrator import build_tree
+
+WORDS = (
+    "minister council budget school hospital police court river storm election "
+    "energy prices housing rail strike league final weather market shares bank "
+    "report review plans figures country week officials inquiry funding water"
+).split()
+
+
+def story(seed: int, words: int = 400) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def article(url: str, body: str) -> ParsedArticle:
+    return ParsedArticle(title="t", url=url, authors=[], body=body)
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_small_edits_change_few_bits(self):
+        body = story(1)
+        edited = body + " Officials later confirmed the figures."
+
+        self.assertLessEqual((fingerprint(body) ^ fingerprint(edited)).bit_count(), 6)
+        self.assertGreater((fingerprint(body) ^ fingerprint(story(2))).bit_count(), 16)
+
+
+class TestNearDuplicateDetector(unittest.TestCase):
+    def test_clusters_near_duplicates(self):
+        detector = NearDuplicateDetector()
+        original = article("https://sky.test/1", story(1))
+        syndicated = article("https://bbc.test/9", story(1) + " Additional reporting.")
+        unrelated = article("https://sky.test/2", story(2))
+
+        self.assertFalse(detector.assign(original))
+        self.assertTrue(detector.assign(syndicated))
+        self.assertFalse(detector.assign(unrelated))
+        self.assertEqual(original.cluster_id, syndicated.cluster_id)
+        self.assertNotEqual(original.cluster_id, unrelated.cluster_id)
+
+    def test_short_bodies_get_their_own_cluster(self):
+        detector = NearDuplicateDetector()
+        first = article("https://sky.test/1", "Live updates")
+        second = article("https://sky.test/2", "Live updates")
+
+        self.assertFalse(detector.assign(first))
+        self.assertFalse(detector.assign(second))
+        self.assertNotEqual(first.cluster_id, second.cluster_id)
+
+    def test_forgets_old_fingerprints(self):
+        detector = NearDuplicateDetector(max_fingerprints=2)
+        for seed in range(3):
+            detector.assign(article(f"https://sky.test/{seed}", story(seed)))
+
+        self.assertFalse(detector.assign(article("https://bbc.test/0", story(0))))
+        self.assertTrue(detector.assign(article("https://bbc.test/2", story(2))))
+        self.assertTrue(all(len(bucket) <= 2 for bucket in detector._buckets))
+
+    def test_fingerprints_persist_between_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "near_duplicates.sqlite3"
+            first_run = NearDuplicateDetector(path=path, max_fingerprints=2)
+            for seed in range(3):
+                first_run.assign(article(f"https://sky.test/{seed}", story(seed)))
+            original = article("https://sky.test/2", story(2))
+            first_run.assign(original)
+            first_run.close()
+
+            second_run = NearDuplicateDetector(path=path, max_fingerprints=2)
+            syndicated = article("https://bbc.test/2", story(2) + " Additional reporting.")
+
+            self.assertTrue(second_run.assign(syndicated))
+            self.assertEqual(syndicated.cluster_id, original.cluster_id)
+            self.assertFalse(second_run.assign(article("https://bbc.test/0", story(0))))
+            second_run.close()
+
+
+class TestOrchestratorNearDuplicates(unittest.TestCase):
+    def build(self, drop_duplicates: bool, **kwargs) -> Orchestrator:
+        article_parser = MagicMock()
+        article_parser.article_parse.side_effect = lambda url: article(url, story(0))
+        orchestrator = Orchestrator(
+            article_parser,
+            MagicMock(),
+            NewsProviders(),
+            near_duplicates=NearDuplicateDetector(drop_duplicates=drop_duplicates),
+            **kwargs,
+        )
+        orchestrator.providers_by_categories = build_tree(["a.test"], per_category=3)
+        return orchestrator
+
+    def test_tags_clusters(self):
+        articles = self.build(drop_duplicates=False)._parse_articles(limit=None)
+
+        self.assertEqual(len(articles), 3)
+        self.assertEqual(len({parsed.cluster_id for parsed in articles}), 1)
+
+    def test_drops_near_duplicates(self):
+        orchestrator = self.build(drop_duplicates=True)
+        articles = orchestrator._parse_articles(limit=None)
+
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(orchestrator.dropped_near_duplicates, 2)
+
+    def test_dropped_near_duplicates_are_not_extracted_again(self):
+        store = SeenEntryStore(":memory:")
+        orchestrator = self.build(drop_duplicates=True, seen_store=store)
+        orchestrator._parse_articles(limit=None)
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(orchestrator._parse_articles(limit=None), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from classes.models.entries import CategoryByBaseUrl, Entries, EntriesByCategory
+from classes.models.news_provider import NewsProvider
+from classes.models.parsed_article import ParsedArticle
+from classes.services.article_parsers import NewsArticleParserInterface
+from classes.services.feed_parsers import AsyncFeedParserInterface
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.seen_entry_store import SeenEntryStore
+
+
+class SlowArticleParser(NewsArticleParserInterface):
+    """Records the peak number of concurrent calls made per host."""
+
+    def __init__(self, delay: float = 0.05, failing: str | None = None):
+        self.delay = delay
+        self.failing = failing
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def article_parse(self, article_url: str) -> ParsedArticle:
+        host = article_url.split("/")[2]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            time.sleep(self.delay)
+            if article_url == self.failing:
+                raise RuntimeError("extraction failed")
+            return ParsedArticle(title="t", url=article_url, authors=[], body="b")
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+
+def build_tree(hosts, per_category=6):
+    return CategoryByBaseUrl(
+        provider={
+            f"http://{host}/": EntriesByCategory(
+                category={
+                    "HOME": Entries(
+                        entries=[
+                            {"title": str(i), "link": f"http://{host}/{i}"}
+                            for i in range(per_category)
+                        ]
+                    )
+                }
+            )
+            for host in hosts
+        }
+    )
+
+
+class TestOrchestratorConcurrency(unittest.TestCase):
+    def build(self, parser, **kwargs):
+        orchestrator = Orchestrator(
+            article_parser=parser,
+            feed_service=MagicMock(),
+            news_providers=NewsProviders(),
+            **kwargs,
+        )
+        orchestrator.providers_by_categories = build_tree(["a.test", "b.test"])
+        return orchestrator
+
+    def test_sequential_by_default(self):
+        parser = SlowArticleParser(delay=0)
+        articles = self.build(parser)._parse_articles(limit=None)
+        self.assertEqual(len(articles), 12)
+        self.assertEqual(parser.peak, {"a.test": 1, "b.test": 1})
+
+    def test_respects_limit(self):
+        articles = self.build(SlowArticleParser(delay=0), max_workers=4)._parse_articles(
+            limit=2
+        )
+        self.assertEqual(len(articles), 4)
+
+    def test_per_host_cap(self):
+        parser = SlowArticleParser()
+        orchestrator = self.build(parser, max_workers=8, max_per_host=2)
+        articles = orchestrator._parse_articles(limit=None)
+        self.assertEqual(len(articles), 12)
+        self.assertLessEqual(parser.peak["a.test"], 2)
+        self.assertLessEqual(parser.peak["b.test"], 2)
+
+    def test_failed_article_is_isolated(self):
+        parser = SlowArticleParser(delay=0, failing="http://a.test/3")
+        articles = self.build(parser, max_workers=4)._parse_articles(limit=None)
+        self.assertEqual(len(articles), 11)
+        self.assertNotIn("http://a.test/3", [article.url for article in articles])
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            Orchestrator(MagicMock(), MagicMock(), NewsProviders(), max_workers=0)
+
+
+class TestOrchestratorFeeds(unittest.TestCase):
+    def test_async_feeds_are_fetched_inside_a_running_loop(self):
+        feed_service = MagicMock()
+        feed_service.parser = MagicMock(spec=AsyncFeedParserInterface)
+        feed_service.aparse_all_providers = AsyncMock(return_value=build_tree(["a.test"]))
+        orchestrator = Orchestrator(SlowArticleParser(delay=0), feed_service, NewsProviders())
+
+        async def process():
+            return orchestrator.process()
+
+        self.assertEqual(len(asyncio.run(process())), 6)
+
+
+class TestOrchestratorStreaming(unittest.TestCase):
+    def build(self, parser, **kwargs):
+        orchestrator = Orchestrator(
+            article_parser=parser,
+            feed_service=MagicMock(),
+            news_providers=NewsProviders(),
+            **kwargs,
+        )
+        patcher = patch.object(
+            orchestrator,
+            "_fetch_categories_by_provider",
+            return_value=build_tree(["a.test", "b.test"], per_category=10),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return orchestrator
+
+    def test_iter_process_bounds_work_in_flight(self):
+        started = []
+        parser = MagicMock()
+        parser.article_parse.side_effect = lambda url: started.append(url) or ParsedArticle(
+            title="t", url=url, authors=[], body="b"
+        )
+        orchestrator = self.build(parser, max_workers=2)
+
+        stream = orchestrator.iter_process(max_in_flight=3)
+        first = next(stream)
+        time.sleep(0.05)
+
+        # Equally weighted feeds are interleaved, so either provider may come first.
+        self.assertIn(first.provider, ["http://a.test/", "http://b.test/"])
+        self.assertEqual(first.categories, ["HOME"])
+        self.assertLessEqual(len(started), 3)
+        self.assertEqual(len(list(stream)) + 1, 20)
+
+    def test_process_returns_articles(self):
+        orchestrator = self.build(SlowArticleParser(delay=0), max_workers=4)
+        articles = orchestrator.process(limit=3)
+        self.assertEqual(len(articles), 6)
+        self.assertIs(orchestrator.parsed_articles, articles)
+
+    def test_aiter_process(self):
+        orchestrator = self.build(SlowArticleParser(delay=0.01), max_workers=4)
+
+        async def collect():
+            return [article async for article in orchestrator.aiter_process(max_in_flight=4)]
+
+        articles = asyncio.run(collect())
+        self.assertEqual(len(articles), 20)
+
+
+class TestOrchestratorScheduling(unittest.TestCase):
+    def build(self, parser, news_providers=None, **kwargs):
+        orchestrator = Orchestrator(
+            article_parser=parser,
+            feed_service=MagicMock(),
+            news_providers=news_providers or NewsProviders(),
+            **kwargs,
+        )
+        patcher = patch.object(
+            orchestrator,
+            "_fetch_categories_by_provider",
+            return_value=build_tree(["a.test", "b.test"]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return orchestrator
+
+    def test_higher_priority_feeds_are_extracted_first(self):
+        news_providers = NewsProviders()
+        news_providers.register_provider(
+            "b",
+            NewsProvider(
+                base_url="http://b.test/",
+                categories={"HOME": "/home.xml"},
+                priorities={"HOME": 5},
+            ),
+        )
+        orchestrator = self.build(SlowArticleParser(delay=0), news_providers)
+
+        articles = orchestrator.process()
+
+        self.assertEqual(
+            [article.provider for article in articles],
+            ["http://b.test/"] * 6 + ["http://a.test/"] * 6,
+        )
+
+    def test_budget_returns_what_completed(self):
+        orchestrator = self.build(SlowArticleParser(delay=0.1), max_workers=2)
+
+        start = time.monotonic()
+        articles = orchestrator.process(budget=0.25)
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        report = orchestrator.report
+        self.assertTrue(report.budget_exhausted)
+        self.assertEqual(report.completed, len(articles))
+        self.assertGreaterEqual(len(articles), 2)
+        self.assertEqual(len(articles) + len(report.skipped), 12)
+        self.assertEqual({skipped.reason for skipped in report.skipped}, {"budget"})
+
+    def test_slow_article_is_abandoned_at_its_deadline(self):
+        slow_url = "http://a.test/2"
+
+        class StuckArticleParser(SlowArticleParser):
+            def article_parse(self, article_url: str) -> ParsedArticle:
+                if article_url == slow_url:
+                    time.sleep(1)
+                return super().article_parse(article_url)
+
+        parser = StuckArticleParser(delay=0)
+        orchestrator = self.build(parser, max_workers=2)
+
+        start = time.monotonic()
+        articles = orchestrator.process(article_timeout=0.2)
+
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(len(articles), 11)
+        (skipped,) = orchestrator.report.skipped
+        self.assertEqual((skipped.job.link, skipped.reason), (slow_url, "deadline"))
+        self.assertFalse(orchestrator.report.budget_exhausted)
+
+    def test_queued_articles_are_timed_from_when_they_start(self):
+        orchestrator = self.build(SlowArticleParser(delay=0.15), max_workers=1)
+
+        # The window holds more jobs than there are workers, so some queue first.
+        articles = list(orchestrator.iter_process(max_in_flight=4, article_timeout=0.25))
+
+        self.assertEqual(len(articles), 12)
+        self.assertEqual(orchestrator.report.skipped, [])
+
+    def test_nothing_is_started_once_the_budget_is_spent(self):
+        parser = SlowArticleParser(delay=0)
+        orchestrator = self.build(parser, max_workers=2)
+
+        articles = orchestrator.process(budget=0)
+
+        self.assertEqual(articles, [])
+        self.assertEqual(parser.peak, {})
+        self.assertEqual(len(orchestrator.report.skipped), 12)
+
+    def test_abandoned_articles_are_not_recorded_as_seen(self):
+        store = SeenEntryStore(":memory:")
+        orchestrator = self.build(SlowArticleParser(delay=0.3), max_workers=2, seen_store=store)
+
+        orchestrator.process(limit=1, article_timeout=0.1)
+        # Let the abandoned extractions finish in the background.
+        time.sleep(0.4)
+
+        self.assertEqual(len(orchestrator.report.skipped), 2)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(len(orchestrator.process(limit=1)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import gzip
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from benchmarks.stand_in_server import render_article
+from classes.models.parsed_article import ParsedArticle
+from classes.services.archive_replay import ArchiveReplay
+from classes.services.article_parsers import HttpArticleParser, register_article_parser
+from classes.services.page_archive import PageArchive
+
+
+class TitleParser(HttpArticleParser):
+    name = "title"
+
+    def article_parse_html(self, article_url: str, html: str) -> ParsedArticle:
+        title = re.search(r"<title>(.*?)</title>", html).group(1)
+        return ParsedArticle(title=title, url=article_url, authors=[], body=html)
+
+
+register_article_parser("title", TitleParser)
+
+
+class TestPageArchive(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_lookup_by_url_and_fetch_time(self):
+        archive = PageArchive(self.directory)
+        archive.append("http://a.test/1?utm_source=rss", "<p>first</p>", fetched_at=100.0)
+        archive.append("http://a.test/1", "<p>second</p>", fetched_at=200.0)
+        archive.append("http://a.test/2", "<p>other</p>", fetched_at=150.0)
+
+        self.assertEqual(archive.get("http://a.test/1"), "<p>second</p>")
+        self.assertEqual(archive.get("http://a.test/1", before=199.0), "<p>first</p>")
+        self.assertIsNone(archive.get("http://a.test/1", before=50.0))
+        self.assertEqual(len(archive.history("http://a.test/1")), 2)
+        self.assertEqual(
+            [(record.url, record.fetched_at) for record in archive.records()],
+            [("http://a.test/1", 200.0), ("http://a.test/2", 150.0)],
+        )
+        self.assertEqual(len(archive.records(since=120.0, latest_only=False)), 2)
+
+    def test_segments_rotate_and_stay_readable_after_reopening(self):
+        archive = PageArchive(self.directory, max_segment_bytes=1024)
+        pages = {f"http://a.test/{i}": render_article(str(i)) for i in range(6)}
+        for link, html in pages.items():
+            archive.append(link, html)
+        archive.close()
+
+        segments = sorted(self.directory.glob("pages-*.warc.gz"))
+        self.assertGreater(len(segments), 1)
+        # Each segment is plain multi-member gzip of WARC records.
+        with gzip.open(segments[0], "rb") as segment:
+            self.assertTrue(segment.read().startswith(b"WARC/1.1\r\nWARC-Type: resource"))
+
+        reopened = PageArchive(self.directory, max_segment_bytes=1024)
+        for link, html in pages.items():
+            self.assertEqual(reopened.get(link), html)
+
+    def test_parser_archives_downloads_and_replay_needs_no_network(self):
+        archive = PageArchive(self.directory)
+        transport = MagicMock()
+        transport.get_page.side_effect = lambda url: (
+            url,
+            render_article(url.rsplit("/", 1)[1]),
+        )
+        parser = TitleParser(transport=transport, archive=archive)
+        for i in range(5):
+            parser.article_parse(f"http://a.test/articles/{i}")
+        transport.get_page.reset_mock()
+
+        replay = ArchiveReplay(archive, parser_name="title", processes=1, chunk_size=2)
+        articles = sorted(replay.run(), key=lambda article: article.url)
+
+        self.assertEqual(len(articles), 5)
+        self.assertEqual(articles[0].title, "Stand-in story 0")
+        self.assertEqual((replay.extracted, replay.failed), (5, 0))
+        transport.get_page.assert_not_called()
+
+    def test_article_is_extracted_against_the_redirected_url(self):
+        archive = PageArchive(self.directory)
+        transport = MagicMock()
+        transport.get_page.return_value = ("http://a.test/articles/1", render_article("1"))
+        parser = TitleParser(transport=transport, archive=archive)
+
+        article = parser.article_parse("http://a.test/short/1")
+
+        self.assertEqual(article.url, "http://a.test/articles/1")
+        self.assertIsNotNone(archive.get("http://a.test/short/1"))
+        record = archive.latest("http://a.test/short/1")
+        self.assertEqual(record.final_url, "http://a.test/articles/1")
+        segment = gzip.open(archive.segment_path(record.segment)).read()
+        self.assertIn(b"WARC-Target-URI: http://a.test/articles/1\r\n", segment)
+
+        replay = ArchiveReplay(archive, parser_name="title", processes=1)
+        (replayed,) = replay.run()
+        self.assertEqual(replayed.url, article.url)
+
+    def test_replay_across_processes(self):
+        archive = PageArchive(self.directory)
+        for i in range(8):
+            archive.append(f"http://a.test/articles/{i}", render_article(str(i)))
+
+        replay = ArchiveReplay(archive, parser_name="newspaper", processes=2, chunk_size=3)
+        titles = sorted(article.title for article in replay.run())
+
+        self.assertEqual(titles, sorted(f"Stand-in story {i}" for i in range(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
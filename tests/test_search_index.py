@@ -0,0 +1,161 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from classes.models.news_provider import NewsProvider
+from classes.models.parsed_article import ParsedArticle
+from classes.services.news_providers import NewsProviders
+from classes.services.search_index import SearchIndex, tokenise
+
+
+def article(slug: str, title: str, body: str, **fields) -> ParsedArticle:
+    fields.setdefault("authors", [])
+    return ParsedArticle(
+        title=title, url=f"https://news.example.com/{slug}", body=body, **fields
+    )
+
+
+ARTICLES = [
+    article(
+        "budget",
+        "Chancellor sets out budget",
+        "The budget raises taxes on fuel. Budget measures take effect in April.",
+        provider="sky",
+        categories=["POLITICS"],
+        authors=["Jane Doe"],
+    ),
+    article(
+        "football",
+        "Cup final goes to penalties",
+        "The final was decided on penalties after extra time.",
+        provider="bbc",
+        categories=["SPORT"],
+        authors=["John Smith"],
+    ),
+    article(
+        "fuel",
+        "Fuel prices rise again",
+        "Drivers face higher fuel prices as the budget changes bite.",
+        provider="bbc",
+        categories=["BUSINESS"],
+        authors=["Jane Doe"],
+    ),
+]
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tokenise(self):
+        self.assertEqual(
+            tokenise("The Budget's 2024 plan, a U-turn"), ["budget", "2024", "plan", "turn"]
+        )
+
+    def test_ranks_with_bm25(self):
+        index = SearchIndex(self.path)
+        for parsed_article in ARTICLES:
+            index.add(parsed_article)
+        self.assertEqual(index.search("budget"), [])
+        index.commit()
+
+        hits = index.search("budget")
+        self.assertEqual(
+            [hit.url for hit in hits],
+            ["https://news.example.com/budget", "https://news.example.com/fuel"],
+        )
+        self.assertGreater(hits[0].score, hits[1].score)
+        self.assertEqual(hits[0].title, "Chancellor sets out budget")
+        self.assertEqual(hits[0].authors, ["Jane Doe"])
+        self.assertEqual(index.search("budget", limit=1)[0].url, hits[0].url)
+        self.assertEqual(index.search("cricket"), [])
+
+    def test_filters(self):
+        index = SearchIndex(self.path)
+        for parsed_article in ARTICLES:
+            index.add(parsed_article)
+        index.commit()
+
+        self.assertEqual(
+            [hit.url for hit in index.search("fuel budget", provider="bbc")],
+            ["https://news.example.com/fuel"],
+        )
+        self.assertEqual(
+            [hit.url for hit in index.search("fuel budget", category="politics")],
+            ["https://news.example.com/budget"],
+        )
+        self.assertEqual(len(index.search("fuel budget", author="jane doe")), 2)
+        self.assertEqual(index.search("fuel budget", author="nobody"), [])
+
+    def test_feed_urls_are_filtered_by_name_or_host(self):
+        news_providers = NewsProviders()
+        news_providers.register_provider(
+            "sky_news",
+            NewsProvider(
+                base_url="https://feeds.skynews.com/feeds/rss", categories={"HOME": "/home.xml"}
+            ),
+        )
+        index = SearchIndex(self.path, provider_names=news_providers.names_by_base_url())
+        index.add(
+            article(
+                "budget", "Budget", "The budget.", provider="https://feeds.skynews.com/feeds/rss"
+            )
+        )
+        index.commit()
+
+        for provider in ["sky_news", "feeds.skynews.com", "https://feeds.skynews.com/feeds/rss"]:
+            with self.subTest(provider=provider):
+                self.assertEqual(len(index.search("budget", provider=provider)), 1)
+        self.assertEqual(index.search("budget", provider="bbc_news"), [])
+
+    def test_incremental_segments_persist_and_merge(self):
+        index = SearchIndex(self.path, segment_size=1, max_segments=2)
+        for parsed_article in ARTICLES:
+            index.add(parsed_article)
+        self.assertEqual(len(index.segments), 1)
+        index.close()
+
+        reopened = SearchIndex(self.path)
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(
+            reopened.search("penalties")[0].url, "https://news.example.com/football"
+        )
+        reopened.add(article("late", "Late budget news", "budget"))
+        reopened.commit()
+        self.assertEqual(len(reopened.segments), 2)
+        self.assertEqual(len(reopened.search("budget")), 3)
+
+    def test_readding_a_url_replaces_it(self):
+        index = SearchIndex(self.path)
+        index.add(ARTICLES[0])
+        index.commit()
+        index.add(
+            ARTICLES[0].model_copy(update={"title": "Budget delayed", "body": "Delayed."})
+        )
+        index.commit()
+
+        hits = index.search("budget")
+        self.assertEqual(len(index), 1)
+        self.assertEqual([hit.title for hit in hits], ["Budget delayed"])
+        index.close()
+        self.assertEqual(len(SearchIndex(self.path)), 1)
+
+    def test_uncommitted_documents_are_dropped_on_reopen(self):
+        index = SearchIndex(self.path)
+        index.add(ARTICLES[0])
+        index._connection.commit()
+        index._connection.close()
+
+        reopened = SearchIndex(self.path)
+        self.assertEqual(len(reopened), 0)
+        reopened.add(ARTICLES[1])
+        reopened.commit()
+        self.assertEqual(reopened.search("penalties")[0].doc_id, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from classes.models.article_job import ArticleJob
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.seen_entry_store import SeenEntryStore
+from tests.test_orchestrator import SlowArticleParser, build_tree
+
+
+def job(provider: str, link: str) -> ArticleJob:
+    return ArticleJob(url=link, link=link, provider=provider, categories=["HOME"])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSeenEntryStore(unittest.TestCase):
+    def test_unseen_is_scoped_per_provider(self):
+        store = SeenEntryStore(":memory:")
+        store.mark_seen("http://a.test/", "http://a.test/1?utm_source=rss")
+
+        jobs = [
+            job("http://a.test/", "http://a.test/1"),
+            job("http://a.test/", "http://a.test/2"),
+            job("http://b.test/", "http://a.test/1"),
+        ]
+        unseen = store.unseen(jobs)
+
+        self.assertEqual(unseen, jobs[1:])
+        self.assertEqual(store.stats.hits, 1)
+        self.assertEqual(store.stats.misses, 2)
+
+    def test_shared_link_is_seen_once_every_provider_has_it(self):
+        store = SeenEntryStore(":memory:")
+        shared = job("http://a.test/", "http://c.test/1")
+        shared.providers.append("http://b.test/")
+        store.mark_seen("http://a.test/", "http://c.test/1")
+
+        self.assertEqual(store.unseen([shared]), [shared])
+        store.mark_seen("http://b.test/", "http://c.test/1")
+        self.assertEqual(store.unseen([shared]), [])
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        store = SeenEntryStore(":memory:", ttl_seconds=60, clock=clock)
+        store.mark_seen("http://a.test/", "http://a.test/1")
+        clock.now += 30
+        store.mark_seen("http://a.test/", "http://a.test/2")
+        clock.now += 45
+
+        self.assertEqual(store.purge(), 1)
+        self.assertEqual(len(store), 1)
+        self.assertFalse(store.is_seen("http://a.test/", "http://a.test/1"))
+        self.assertTrue(store.is_seen("http://a.test/", "http://a.test/2"))
+
+    def test_persists_across_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "seen.sqlite3"
+            store = SeenEntryStore(path)
+            store.mark_seen("http://a.test/", "http://a.test/1")
+            store.close()
+
+            self.assertTrue(SeenEntryStore(path).is_seen("http://a.test/", "http://a.test/1"))
+
+
+class TestOrchestratorSkipsSeenEntries(unittest.TestCase):
+    def test_second_run_only_extracts_new_entries(self):
+        store = SeenEntryStore(":memory:")
+        parser = SlowArticleParser(delay=0, failing="http://a.test/2")
+        orchestrator = Orchestrator(
+            parser, MagicMock(), NewsProviders(), max_workers=2, seen_store=store
+        )
+
+        orchestrator.providers_by_categories = build_tree(["a.test"], per_category=3)
+        self.assertEqual(len(orchestrator._parse_articles(limit=None)), 2)
+        self.assertEqual(orchestrator.skipped_articles, 0)
+
+        # The failed article was not recorded, so it is retried.
+        parser.failing = None
+        orchestrator.providers_by_categories = build_tree(["a.test"], per_category=5)
+        articles = orchestrator._parse_articles(limit=None)
+
+        self.assertEqual(
+            sorted(article.url for article in articles),
+            ["http://a.test/2", "http://a.test/3", "http://a.test/4"],
+        )
+        self.assertEqual(orchestrator.skipped_articles, 2)
+
+    def test_articles_the_consumer_never_took_are_not_recorded(self):
+        store = SeenEntryStore(":memory:")
+        parser = SlowArticleParser(delay=0)
+        orchestrator = Orchestrator(
+            parser, MagicMock(), NewsProviders(), max_workers=2, seen_store=store
+        )
+        tree = build_tree(["a.test"], per_category=2)
+
+        stream = orchestrator.iter_entries(tree)
+        next(stream)
+        stream.close()
+
+        self.assertEqual(len(store.unseen(orchestrator._deduplicate(tree))), 2)
+        self.assertEqual(len(list(orchestrator.iter_entries(tree))), 2)
+        self.assertEqual(store.unseen(orchestrator._deduplicate(tree)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from benchmarks.bench_startup import MODULES, heavy_modules, import_times
+
+
+class TestStartup(unittest.TestCase):
+    def test_services_do_not_import_extraction_libraries(self):
+        for module in MODULES:
+            with self.subTest(module=module):
+                times = import_times(f"import {module}")
+                self.assertIn(module, times)
+                self.assertEqual(heavy_modules(times), [])
+
+    def test_extraction_library_is_imported_on_first_use(self):
+        times = import_times(
+            "from classes.services.article_parsers import get_article_parser\n"
+            "get_article_parser('newspaper')._article('https://example.com/story')"
+        )
+        self.assertIn("newspaper", times)
+        self.assertNotIn("goose3", times)
+
+    def test_unknown_parser_name(self):
+        from classes.services.article_parsers import get_article_parser
+
+        with self.assertRaises(ValueError):
+            get_article_parser("missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import requests
+
+from benchmarks.stand_in_server import StandInServer
+from classes.services.transport import HttpTransport
+from classes.utils.metrics import InMemoryMetrics, set_metrics
+
+
+class TestHttpTransport(unittest.TestCase):
+    def setUp(self):
+        self.metrics = InMemoryMetrics()
+        self.previous = set_metrics(self.metrics)
+
+    def tearDown(self):
+        set_metrics(self.previous)
+
+    def test_negotiates_compression_and_counts_wire_bytes(self):
+        transport = HttpTransport()
+        with StandInServer(compress=True) as server:
+            response = transport.get(f"{server.base_url}/articles/story-1")
+        transport.close()
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Paragraph 0 of story story-1", response.text)
+        decoded = self.metrics.counter_value("http_response_bytes_total", host="127.0.0.1")
+        wire = self.metrics.counter_value("http_wire_bytes_total", host="127.0.0.1")
+        self.assertEqual(decoded, len(response.content))
+        self.assertGreater(wire, 0)
+        self.assertLess(wire, decoded)
+
+    def test_retries_are_bounded(self):
+        transport = HttpTransport(retries=2, backoff_factor=0)
+        with StandInServer(error_rate=1.0) as server:
+            with self.assertRaises(requests.HTTPError):
+                transport.get(f"{server.base_url}/articles/story-1")
+            requests_made = server.requests
+        transport.close()
+
+        self.assertEqual(requests_made, 3)
+        self.assertEqual(self.metrics.counter_value("http_retries_total", host="127.0.0.1"), 2)
+        self.assertEqual(
+            self.metrics.counter_value("http_errors_total", host="127.0.0.1", status="503"), 1
+        )
+
+    def test_connect_and_read_timeouts(self):
+        transport = HttpTransport(connect_timeout=1.0, read_timeout=5.0)
+        self.assertEqual(transport.timeout, (1.0, 5.0))
+        transport.close()
+
+        with self.assertRaises(ValueError):
+            HttpTransport(retries=-1)
+
+    def test_single_timeout_is_deprecated(self):
+        with self.assertWarns(DeprecationWarning):
+            transport = HttpTransport(timeout=4.0)
+        self.assertEqual(transport.timeout, (4.0, 4.0))
+        transport.close()
+
+    def test_page_reports_the_url_redirects_led_to(self):
+        transport = HttpTransport()
+        with StandInServer() as server:
+            final_url, html = transport.get_page(
+                f"{server.base_url}/redirect/articles/story-1"
+            )
+        transport.close()
+
+        self.assertEqual(final_url, f"{server.base_url}/articles/story-1")
+        self.assertIn("Paragraph 0 of story story-1", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from classes.models.article_job import ArticleJob
+from classes.models.entries import Entries
+from classes.models.news_provider import NewsProvider
+from classes.services.near_duplicates import NearDuplicateDetector
+from classes.services.news_providers import NewsProviders
+from classes.services.orchestrator import Orchestrator
+from classes.services.queue_workers import (
+    ARTICLE_QUEUE,
+    FEED_QUEUE,
+    ArticleWorker,
+    FeedWorker,
+    enqueue_feeds,
+    merge_categories,
+    polling_round,
+)
+from classes.services.work_queue import SQLiteWorkQueue
+from tests.test_near_duplicates import article, story
+from tests.test_orchestrator import SlowArticleParser
+from tests.test_seen_entry_store import FakeClock
+
+
+def lease_all(path: str, results):
+    queue = SQLiteWorkQueue(path)
+    keys = []
+    while True:
+        leases = queue.lease("jobs", max_jobs=3)
+        if not leases:
+            break
+        for lease in leases:
+            keys.append(lease.key)
+            queue.ack(lease)
+    results.put(keys)
+
+
+class TestSQLiteWorkQueue(unittest.TestCase):
+    def test_keys_are_queued_once_and_pending_payloads_merged(self):
+        queue = SQLiteWorkQueue(":memory:")
+        first = {"categories": ["HOME"]}
+
+        self.assertEqual(queue.put_many("jobs", [("a", first), ("b", first)]), 2)
+        self.assertEqual(
+            queue.put_many("jobs", [("a", {"categories": ["UK"]})], merge=merge_categories),
+            0,
+        )
+
+        leases = {lease.key: lease for lease in queue.lease("jobs", max_jobs=5)}
+        self.assertEqual(leases["a"].payload["categories"], ["HOME", "UK"])
+        queue.ack(leases["a"], {"ok": True})
+        self.assertFalse(queue.put("jobs", "a", first))
+        self.assertEqual(list(queue.results("jobs")), [("a", {"ok": True})])
+
+    def test_expired_lease_is_redelivered_and_stale_ack_rejected(self):
+        clock = FakeClock()
+        queue = SQLiteWorkQueue(":memory:", visibility_timeout=60, clock=clock)
+        queue.put("jobs", "a", {})
+
+        (first,) = queue.lease("jobs")
+        self.assertEqual(queue.lease("jobs"), [])
+        self.assertEqual(queue.counts("jobs")["leased"], 1)
+
+        clock.now += 61
+        (second,) = queue.lease("jobs")
+        self.assertEqual(second.attempts, 2)
+        self.assertFalse(queue.ack(first, {"worker": 1}))
+        self.assertTrue(queue.ack(second, {"worker": 2}))
+        self.assertEqual(list(queue.results("jobs")), [("a", {"worker": 2})])
+
+    def test_jobs_are_dead_after_max_attempts(self):
+        clock = FakeClock()
+        queue = SQLiteWorkQueue(":memory:", visibility_timeout=60, max_attempts=2, clock=clock)
+        queue.put("jobs", "a", {})
+
+        (lease,) = queue.lease("jobs")
+        queue.release(lease, delay=10)
+        self.assertEqual(queue.lease("jobs"), [])
+        clock.now += 10
+        (lease,) = queue.lease("jobs")
+        queue.release(lease)
+
+        self.assertEqual(queue.lease("jobs"), [])
+        self.assertEqual(queue.counts("jobs")["dead"], 1)
+        clock.now += 1
+        self.assertEqual(queue.purge(older_than=0), 1)
+
+    def test_processes_never_share_a_lease(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "queue.sqlite3")
+            queue = SQLiteWorkQueue(path)
+            queue.put_many("jobs", ((str(i), {}) for i in range(60)))
+
+            context = multiprocessing.get_context("spawn")
+            results = context.Queue()
+            processes = [
+                context.Process(target=lease_all, args=(path, results)) for _ in range(3)
+            ]
+            for process in processes:
+                process.start()
+            keys = [key for _ in processes for key in results.get(timeout=60)]
+            for process in processes:
+                process.join()
+
+            self.assertEqual(sorted(keys, key=int), [str(i) for i in range(60)])
+            self.assertEqual(queue.counts("jobs")["done"], 60)
+
+
+class TestQueueWorkers(unittest.TestCase):
+    def test_feeds_and_articles_flow_through_the_queue(self):
+        queue = SQLiteWorkQueue(":memory:")
+        providers = NewsProviders()
+        providers.register_provider(
+            "a",
+            NewsProvider(
+                base_url="http://a.test/",
+                categories={"HOME": "home.xml", "UK": "uk.xml"},
+            ),
+        )
+        feed_service = MagicMock()
+        feed_service.parse_feed.side_effect = lambda base_url, path, limit: Entries(
+            entries=[
+                {"title": "shared", "link": "http://a.test/shared?utm_source=rss"},
+                {"title": path, "link": f"http://a.test/{path}/1"},
+                {"title": "broken", "link": "http://a.test/broken"},
+            ]
+        )
+
+        self.assertEqual(enqueue_feeds(queue, providers, run_id="1"), 2)
+        self.assertEqual(enqueue_feeds(queue, providers, run_id="1"), 0)
+        FeedWorker(queue, feed_service).run(stop_when_idle=True)
+        self.assertEqual(queue.counts(FEED_QUEUE)["done"], 2)
+        self.assertEqual(queue.counts(ARTICLE_QUEUE)["pending"], 4)
+
+        parser = SlowArticleParser(delay=0, failing="http://a.test/broken")
+        orchestrator = Orchestrator(parser, MagicMock(), NewsProviders(), max_workers=2)
+        sink = MagicMock()
+        worker = ArticleWorker(queue, orchestrator, sink=sink, retry_delay=0)
+        self.assertEqual(worker.run(stop_when_idle=True), 3)
+
+        results = [result for _, result in queue.results(ARTICLE_QUEUE)]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0]), {"url", "cluster_id"})
+        written = {call.args[0].url: call.args[0] for call in sink.write.call_args_list}
+        self.assertEqual(len(written), 3)
+        self.assertEqual(
+            sorted(written["http://a.test/shared?utm_source=rss"].categories), ["HOME", "UK"]
+        )
+        self.assertEqual(queue.counts(ARTICLE_QUEUE)["dead"], 1)
+        self.assertEqual(worker.failed, 5)
+
+    def test_producers_in_one_round_share_feed_jobs(self):
+        clock = FakeClock()
+        clock.now = 120.0
+        first_round = polling_round(60, clock)
+        clock.now = 179.0
+        self.assertEqual(polling_round(60, clock), first_round)
+        clock.now = 180.0
+        self.assertNotEqual(polling_round(60, clock), first_round)
+
+    def test_article_retried_after_a_sink_failure_is_still_written(self):
+        queue = SQLiteWorkQueue(":memory:")
+        job = ArticleJob(url="http://a.test/1", link="http://a.test/1", provider="http://a.test/")
+        queue.put(ARTICLE_QUEUE, "1", job.model_dump())
+        parser = MagicMock()
+        parser.article_parse.side_effect = lambda url: article(url, story(0))
+        orchestrator = Orchestrator(
+            parser,
+            MagicMock(),
+            NewsProviders(),
+            near_duplicates=NearDuplicateDetector(drop_duplicates=True),
+        )
+        sink = MagicMock()
+        sink.write.side_effect = [OSError("disk full"), None]
+
+        worker = ArticleWorker(queue, orchestrator, sink=sink, retry_delay=0)
+        self.assertEqual(worker.run(stop_when_idle=True), 1)
+
+        self.assertEqual(sink.write.call_count, 2)
+        ((_, result),) = queue.results(ARTICLE_QUEUE)
+        self.assertEqual(result["url"], "http://a.test/1")
+
+
+if __name__ == "__main__":
+    unittest.main()